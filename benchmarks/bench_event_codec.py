@@ -0,0 +1,67 @@
+"""
+Сравнение сериализации событий: dataclasses_json (to_json/from_json) и кодеки реестра событий на orjson.
+
+python -m benchmarks.bench_event_codec --iterations 100000
+"""
+
+import argparse
+import time
+
+from dataclasses import asdict
+
+from dataclasses_json import dataclass_json
+
+from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
+from src.domain.schedules.events import OrderCancelledEvent, ScheduleCreatedEvent
+from src.logic.events.order_events import OrderPayedEvent, OrderPaymentCanceledEvent
+from src.logic.events.schedule_events import OrderCreatedEvent
+from src.logic.events.user_events import UserCreatedEvent
+
+EVENTS: list[BaseEvent] = [
+    ScheduleCreatedEvent(schedule_id=1),
+    OrderCancelledEvent(order_id=1, user_id=1),
+    OrderCreatedEvent(
+        order_id=1, user_id=1, schedule_id=1, slot_time_start="10:00", service_name="Маникюр", service_price=1500
+    ),
+    OrderPayedEvent(order_payment_id=1, user_point_id=1, point_uses=100),
+    OrderPaymentCanceledEvent(order_payment_id=1, user_point_id=1, point_uses=100),
+    UserCreatedEvent(user_id=1, email="bench@example.com", first_name="Иван", last_name="Иванов"),
+]
+
+
+def measure(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main(iterations: int) -> None:
+    for event in EVENTS:
+        event_cls = type(event)
+        # события больше не наследуют dataclasses_json, поэтому прежний путь воспроизводится на подклассе
+        legacy_cls = dataclass_json(type(f"Legacy{event_cls.__name__}", (event_cls,), {}))
+        legacy_event = legacy_cls(**asdict(event))
+        legacy_data = legacy_event.to_json()
+        codec = event_registry.get_codec(event_cls)
+        data = codec.encode(event)
+        assert codec.decode(data) == event
+
+        legacy_encode = measure(legacy_event.to_json, iterations)
+        legacy_decode = measure(lambda: legacy_cls.from_json(legacy_data), iterations)
+        encode = measure(lambda: codec.encode(event), iterations)
+        decode = measure(lambda: codec.decode(data), iterations)
+        print(f"{codec.type_name}")
+        print(f"  dataclasses_json: encode {legacy_encode:.2f}us, decode {legacy_decode:.2f}us")
+        print(
+            f"  registry:         encode {encode:.2f}us ({legacy_encode / encode:.1f}x), "
+            f"decode {decode:.2f}us ({legacy_decode / decode:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+    main(iterations=args.iterations)
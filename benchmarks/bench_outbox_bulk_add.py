@@ -0,0 +1,87 @@
+"""
+Сравнение записи событий в outbox: по одному сообщению с flush (как было) и одной многострочной вставкой.
+
+Наборы событий повторяют то, что пишут в outbox AddOrderCommandHandler, OrderPayCommandHandler и AddUserCommandHandler.
+Сериализация событий сравнивается отдельно в bench_event_codec.
+Каждая итерация выполняется в транзакции, которая откатывается, поэтому база не меняется.
+
+python -m benchmarks.bench_outbox_bulk_add --iterations 200 --events 1 10
+"""
+
+import argparse
+import asyncio
+import time
+
+from collections.abc import Callable
+
+from sqlalchemy import func, select
+
+from src.domain.base.events import BaseEvent
+from src.domain.outbox.entities import OutboxMessage as OutboxMessageEntity
+from src.infrastructure.db.config import get_async_engine, get_async_session_factory
+from src.infrastructure.db.models.outbox import OutboxMessage
+from src.infrastructure.db.repositories.outbox import (
+    OUTBOX_CHANNEL,
+    OutboxMessageRepository,
+    dump_event,
+    get_message_type,
+)
+from src.logic.events.order_events import OrderPayedEvent
+from src.logic.events.schedule_events import OrderCreatedEvent
+from src.logic.events.user_events import UserCreatedEvent
+from src.presentation.api.settings import Settings
+
+HANDLER_EVENTS: dict[str, Callable[[], BaseEvent]] = {
+    "AddOrderCommandHandler": lambda: OrderCreatedEvent(
+        order_id=1, user_id=1, schedule_id=1, slot_time_start="10:00", service_name="Маникюр", service_price=1500
+    ),
+    "OrderPayCommandHandler": lambda: OrderPayedEvent(order_payment_id=1, user_point_id=1, point_uses=100),
+    "AddUserCommandHandler": lambda: UserCreatedEvent(
+        user_id=1, email="bench@example.com", first_name="Иван", last_name="Иванов"
+    ),
+}
+
+
+async def per_event_path(session, events: list[BaseEvent]) -> None:
+    for event in events:
+        entity = OutboxMessageEntity(type=get_message_type(event), data=dump_event(event))
+        session.add(OutboxMessage.from_entity(entity))
+        await session.flush()
+        await session.execute(select(func.pg_notify(OUTBOX_CHANNEL, "")))
+
+
+async def bulk_path(session, events: list[BaseEvent]) -> None:
+    await OutboxMessageRepository(session=session).bulk_add(events)
+
+
+async def measure(session_factory, path, events: list[BaseEvent], iterations: int) -> float:
+    elapsed = 0.0
+    for _ in range(iterations):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            await path(session, events)
+            elapsed += time.perf_counter() - started
+            await session.rollback()
+    return elapsed / iterations * 1000
+
+
+async def main(iterations: int, events_counts: list[int]) -> None:
+    engine = get_async_engine(Settings())
+    session_factory = get_async_session_factory(engine)
+    for handler, make_event in HANDLER_EVENTS.items():
+        for events_count in events_counts:
+            events = [make_event() for _ in range(events_count)]
+            per_event = await measure(session_factory, per_event_path, events, iterations)
+            bulk = await measure(session_factory, bulk_path, events, iterations)
+            print(f"{handler}, events: {events_count}")
+            print(f"  per event: {per_event:.3f}ms")
+            print(f"  bulk:      {bulk:.3f}ms ({per_event / bulk:.1f}x)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--events", type=int, nargs="+", default=[1, 10])
+    args = parser.parse_args()
+    asyncio.run(main(iterations=args.iterations, events_counts=args.events))
@@ -0,0 +1,67 @@
+"""
+Сравнение чтения услуг: ORM-сущности с маппером в DTO и выборка только нужных колонок.
+
+Услуги вставляются в транзакции, которая откатывается, поэтому база не меняется.
+
+python -m benchmarks.bench_query_projection --rows 10000 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import insert, select
+
+from src.infrastructure.db.config import get_async_engine, get_async_session_factory
+from src.infrastructure.db.models.schedules import Service
+from src.infrastructure.db.repositories.projections import SERVICE_COLUMNS, service_from_row
+from src.logic.dto.mappers.schedule_mappers import service_to_detail_dto_mapper
+from src.presentation.api.settings import Settings
+
+BENCH_NAME_PREFIX = "bench projection"
+
+
+async def orm_path(session) -> tuple[float, int]:
+    started = time.perf_counter()
+    result = await session.execute(select(Service).where(Service.name.startswith(BENCH_NAME_PREFIX)))
+    dtos = [service_to_detail_dto_mapper(el) for el in result.scalars().all()]
+    elapsed = time.perf_counter() - started
+    session.expunge_all()
+    return elapsed, len(dtos)
+
+
+async def projection_path(session) -> tuple[float, int]:
+    started = time.perf_counter()
+    result = await session.execute(select(*SERVICE_COLUMNS).where(Service.name.startswith(BENCH_NAME_PREFIX)))
+    dtos = [service_from_row(row) for row in result]
+    elapsed = time.perf_counter() - started
+    return elapsed, len(dtos)
+
+
+async def run(session_factory, rows: int) -> None:
+    async with session_factory() as session:
+        await session.execute(
+            insert(Service),
+            [{"name": f"{BENCH_NAME_PREFIX} {i}", "description": "", "price": i} for i in range(rows)],
+        )
+        orm, orm_count = await orm_path(session)
+        projection, projection_count = await projection_path(session)
+        await session.rollback()
+    print(f"rows: {rows}")
+    print(f"orm:        {orm:.3f}s ({orm_count})")
+    print(f"projection: {projection:.3f}s ({projection_count}, {orm / projection:.1f}x)")
+
+
+async def main(rows_list: list[int]) -> None:
+    engine = get_async_engine(Settings())
+    session_factory = get_async_session_factory(engine)
+    for rows in rows_list:
+        await run(session_factory, rows)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    asyncio.run(main(rows_list=args.rows))
@@ -0,0 +1,81 @@
+"""
+Сравнение публикации в RabbitMQ: соединение, канал и объявление exchange на каждое сообщение
+и пул каналов на общем соединении с топологией, объявленной один раз.
+
+Сообщения уходят во временный exchange без очередей, брокер их отбрасывает; exchange удаляется в конце.
+
+python -m benchmarks.bench_rabbit_publish --messages 1000 --concurrency 1 16
+"""
+
+import argparse
+import asyncio
+import time
+
+import aio_pika
+
+from src.infrastructure.broker.converters import convert_event_to_broker_message
+from src.infrastructure.broker.rabbit.channel_pool import RabbitChannelPool
+from src.infrastructure.broker.rabbit.connector import RabbitConnector
+from src.infrastructure.broker.rabbit.producer import Producer
+from src.infrastructure.broker.rabbit.topology import RabbitTopology
+from src.logic.events.user_events import UserCreatedEvent
+from src.presentation.api.settings import Settings
+
+BENCH_EXCHANGE = "bench_publish"
+BENCH_ROUTING_KEY = "bench_publish"
+
+
+async def per_message_path(settings: Settings, body: bytes, messages: int) -> float:
+    # прежняя публикация: declare_exchange и publish_message открывали свое соединение и канал
+    connector = RabbitConnector(settings)
+    started = time.perf_counter()
+    for _ in range(messages):
+        async with connector:
+            await connector.channel.declare_exchange(BENCH_EXCHANGE, aio_pika.ExchangeType.DIRECT)
+        async with connector:
+            exchange = await connector.channel.get_exchange(BENCH_EXCHANGE, ensure=False)
+            await exchange.publish(Producer.build_message(body), routing_key=BENCH_ROUTING_KEY)
+    return time.perf_counter() - started
+
+
+async def pool_path(settings: Settings, body: bytes, messages: int, concurrency: int) -> float:
+    topology = RabbitTopology()
+    topology.add_exchange(BENCH_EXCHANGE)
+    pool = RabbitChannelPool(RabbitConnector(settings), size=settings.rabbit.RABBIT_PUBLISH_CHANNELS, topology=topology)
+    await pool.open()
+    producer = Producer(pool)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def publish() -> None:
+        async with semaphore:
+            await producer.publish_message(body, exchange_name=BENCH_EXCHANGE, routing_key=BENCH_ROUTING_KEY)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[publish() for _ in range(messages)])
+        return time.perf_counter() - started
+    finally:
+        async with pool.acquire() as channel:
+            await channel.exchange_delete(BENCH_EXCHANGE)
+        await pool.close()
+
+
+async def main(messages: int, concurrency_list: list[int]) -> None:
+    settings = Settings()
+    body = convert_event_to_broker_message(
+        UserCreatedEvent(user_id=1, email="bench@example.com", first_name="Иван", last_name="Иванов")
+    )
+    print(f"messages: {messages}")
+    per_message = await per_message_path(settings, body, messages)
+    print(f"per message:       {messages / per_message:.0f} msg/s")
+    for concurrency in concurrency_list:
+        pooled = await pool_path(settings, body, messages, concurrency)
+        print(f"pool, {concurrency:>3} in flight: {messages / pooled:.0f} msg/s ({per_message / pooled:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args()
+    asyncio.run(main(messages=args.messages, concurrency_list=args.concurrency))
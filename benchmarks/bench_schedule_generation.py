@@ -0,0 +1,60 @@
+"""
+Сравнение создания расписаний: по одному дню (AddScheduleCommand) и пакетной вставкой (GenerateSchedulesCommand).
+
+Обе ветки выполняются в транзакции, которая откатывается, поэтому база не меняется.
+
+python -m benchmarks.bench_schedule_generation --masters 1 2 3 --days 30
+"""
+
+import argparse
+import asyncio
+import time
+
+from datetime import date, timedelta
+
+from src.domain.schedules.entities import Schedule
+from src.infrastructure.db.config import get_async_engine, get_async_session_factory
+from src.infrastructure.db.repositories.schedules import ScheduleRepository
+from src.presentation.api.settings import Settings
+
+
+async def per_day_path(session_factory, schedules: list[Schedule]) -> float:
+    async with session_factory() as session:
+        repository = ScheduleRepository(session=session)
+        started = time.perf_counter()
+        for schedule in schedules:
+            await repository.add(schedule)
+        elapsed = time.perf_counter() - started
+        await session.rollback()
+    return elapsed
+
+
+async def bulk_path(session_factory, schedules: list[Schedule]) -> float:
+    async with session_factory() as session:
+        repository = ScheduleRepository(session=session)
+        started = time.perf_counter()
+        await repository.bulk_add(schedules)
+        elapsed = time.perf_counter() - started
+        await session.rollback()
+    return elapsed
+
+
+async def main(master_ids: list[int], days_count: int, date_from: date) -> None:
+    engine = get_async_engine(Settings())
+    session_factory = get_async_session_factory(engine)
+    days = Schedule.get_days(date_from=date_from, date_to=date_from + timedelta(days=days_count - 1))
+    print(f"masters: {len(master_ids)}, days: {len(days)}")
+    per_day = await per_day_path(session_factory, Schedule.generate(master_ids=master_ids, days=days))
+    print(f"per day: {per_day:.3f}s")
+    bulk = await bulk_path(session_factory, Schedule.generate(master_ids=master_ids, days=days))
+    print(f"bulk:    {bulk:.3f}s ({per_day / bulk:.1f}x)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--masters", type=int, nargs="+", required=True)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--date-from", type=date.fromisoformat, default=date.today() + timedelta(days=365))
+    args = parser.parse_args()
+    asyncio.run(main(master_ids=args.masters, days_count=args.days, date_from=args.date_from))
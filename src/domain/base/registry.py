@@ -0,0 +1,102 @@
+import dataclasses
+import types
+
+from collections.abc import Callable
+from datetime import date, datetime
+from typing import Any, Union, get_args, get_origin, get_type_hints
+from uuid import UUID
+
+import orjson
+
+from src.domain.base.events import BaseEvent
+
+
+def decode_datetime(value: Any) -> datetime:
+    # старые сообщения dataclasses_json хранили дату как timestamp
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    return datetime.fromisoformat(value)
+
+
+FIELD_DECODERS: dict[type, Callable[[Any], Any]] = {
+    UUID: UUID,
+    datetime: decode_datetime,
+    date: date.fromisoformat,
+}
+
+
+def get_field_decoder(field_type: Any) -> Callable[[Any], Any] | None:
+    if get_origin(field_type) in (Union, types.UnionType):
+        args = [arg for arg in get_args(field_type) if arg is not type(None)]
+        return get_field_decoder(args[0]) if len(args) == 1 else None
+    return FIELD_DECODERS.get(field_type)
+
+
+class EventCodec:
+    """Кодек одного класса событий: поля и преобразования типов вычисляются один раз при регистрации"""
+
+    def __init__(self, event_cls: type[BaseEvent], type_name: str):
+        self.event_cls = event_cls
+        self.type_name = type_name
+        hints = get_type_hints(event_cls)
+        fields = [field for field in dataclasses.fields(event_cls) if field.init]
+        self.field_names = tuple(field.name for field in fields)
+        self.decoders = tuple(
+            (field.name, decoder) for field in fields if (decoder := get_field_decoder(hints[field.name])) is not None
+        )
+
+    @staticmethod
+    def encode(event: BaseEvent) -> bytes:
+        # orjson сериализует dataclass, UUID и datetime без промежуточного словаря
+        return orjson.dumps(event)
+
+    def decode(self, data: bytes | str) -> BaseEvent:
+        raw = orjson.loads(data)
+        for name, decoder in self.decoders:
+            value = raw.get(name)
+            if value is not None:
+                raw[name] = decoder(value)
+        return self.event_cls(**{name: raw[name] for name in self.field_names if name in raw})
+
+
+class EventRegistry:
+    def __init__(self):
+        self._by_name: dict[str, EventCodec] = {}
+        self._by_cls: dict[type[BaseEvent], EventCodec] = {}
+
+    def register(self, name: str, version: int = 1) -> Callable[[type[BaseEvent]], type[BaseEvent]]:
+        def decorator(event_cls: type[BaseEvent]) -> type[BaseEvent]:
+            type_name = f"{name}.v{version}"
+            if type_name in self._by_name:
+                raise ValueError(f"Событие {type_name} уже зарегистрировано")
+            codec = EventCodec(event_cls, type_name)
+            self._by_name[type_name] = codec
+            # сообщения outbox, записанные до реестра, хранят путь к классу
+            self._by_name[f"{event_cls.__module__}.{event_cls.__name__}"] = codec
+            self._by_cls[event_cls] = codec
+            return event_cls
+
+        return decorator
+
+    def get_codec(self, event_cls: type[BaseEvent]) -> EventCodec:
+        codec = self._by_cls.get(event_cls)
+        if codec is None:
+            # незарегистрированное событие можно закодировать, но не восстановить по имени
+            codec = EventCodec(event_cls, f"{event_cls.__module__}.{event_cls.__name__}")
+            self._by_cls[event_cls] = codec
+        return codec
+
+    def get_type_name(self, event: BaseEvent) -> str:
+        return self.get_codec(type(event)).type_name
+
+    def encode(self, event: BaseEvent) -> bytes:
+        return self.get_codec(type(event)).encode(event)
+
+    def decode(self, type_name: str, data: bytes | str) -> BaseEvent:
+        codec = self._by_name.get(type_name)
+        if codec is None:
+            raise KeyError(f"Неизвестный тип события: {type_name}")
+        return codec.decode(data)
+
+
+event_registry = EventRegistry()
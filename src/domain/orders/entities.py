@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import date
+from datetime import date, datetime
 from typing import Literal
 
 from src.domain.base.entities import BaseEntityWithIntIdAndEvents
@@ -59,6 +59,8 @@ class OrderPayment(BaseEntityWithIntIdAndEvents):
     point_uses: CountNumber = CountNumber(0)
     promotion_sale: CountNumber = CountNumber(0)
     is_payed: bool = False
+    promotion_id: int | None = None
+    payed_at: datetime | None = None
 
     @classmethod
     def add(cls, order_id: int, service_price: int):
@@ -79,14 +81,22 @@ class OrderPayment(BaseEntityWithIntIdAndEvents):
         )
         return total_amount_result
 
-    def pay(self, promotion_sale: int | None, user_point_count: int | None, input_user_point: int):
+    def pay(
+        self,
+        promotion_sale: int | None,
+        user_point_count: int | None,
+        input_user_point: int,
+        promotion_id: int | None = None,
+    ):
         if self.is_payed:
             raise OrderIsPayedException()
         total_amount_result = self.calculate_amount(promotion_sale, user_point_count, input_user_point)
         self.point_uses = CountNumber(total_amount_result.point_uses)
         self.promotion_sale = CountNumber(total_amount_result.promotion_sale)
         self.total_amount = PositiveIntNumber(total_amount_result.total_amount)
+        self.promotion_id = promotion_id if total_amount_result.promotion_sale else None
         self.is_payed = True
+        self.payed_at = datetime.now()
 
     def cancel_payment(self):
         if not self.is_payed:
@@ -101,4 +111,6 @@ class OrderPayment(BaseEntityWithIntIdAndEvents):
             "total_amount": self.total_amount.as_generic_type(),
             "order_id": self.order_id,
             "is_payed": self.is_payed,
+            "promotion_id": self.promotion_id,
+            "payed_at": self.payed_at,
         }
@@ -14,6 +14,7 @@ class OutboxMessage(BaseEntity):
     id: UUID = field(default_factory=uuid4, kw_only=True)
     occurred_at: datetime = field(default_factory=datetime.now, kw_only=True)
     processed_at: datetime | None = None
+    partition_key: str | None = field(default=None, kw_only=True)
 
     def update_process_at(self):
         self.processed_at = datetime.now()
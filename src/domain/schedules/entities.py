@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import enum
 
+from collections.abc import Iterable
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
 from src.domain.base.entities import BaseEntityWithIntIdAndEvents
 from src.domain.base.values import Name, PositiveIntNumber
@@ -11,10 +12,11 @@ from src.domain.schedules.events import OrderCancelledEvent
 from src.domain.schedules.exceptions import (
     OrderNotInProgressException,
     OrderNotReceivedException,
+    ScheduleTemplateInvalidException,
     SlotOccupiedException,
     SlotServiceInvalidException,
 )
-from src.domain.schedules.values import END_HOUR, SLOT_DELTA, START_HOUR, SlotTime
+from src.domain.schedules.values import DAYS_IN_WEEK, DEFAULT_SLOT_GRID, SlotGrid, SlotOccupancy, SlotTime
 
 
 @dataclass()
@@ -54,26 +56,76 @@ class Schedule(BaseEntityWithIntIdAndEvents):
     slots: list[Slot]
 
     @classmethod
-    def add(cls, day: date, master_id: int):
+    def add(cls, day: date, master_id: int, grid: SlotGrid = DEFAULT_SLOT_GRID):
         all_day_slots = [
             Slot(
-                time_start=SlotTime(f"{hour}:00"),
+                time_start=SlotTime(grid.time_at(index)),
             )
-            for hour in range(START_HOUR, END_HOUR + SLOT_DELTA)
+            for index in range(grid.slots_count)
         ]
 
         schedule = cls(day=day, master_id=master_id, slots=all_day_slots)
         return schedule
 
-    def get_free_slots(self, occupied_slots: list[Slot]) -> list[Slot]:
-        occupied_slots_time = set(occupied_slots)
-        difference = set(self.slots).difference(occupied_slots_time)
-        return sorted(difference)
+    @classmethod
+    def generate(
+        cls, master_ids: Iterable[int], days: Iterable[date], grid: SlotGrid = DEFAULT_SLOT_GRID
+    ) -> list[Schedule]:
+        days = list(days)
+        return [cls.add(day=day, master_id=master_id, grid=grid) for master_id in master_ids for day in days]
+
+    @staticmethod
+    def get_days(date_from: date, date_to: date, weekdays: Iterable[int] | None = None) -> list[date]:
+        weekdays = set(weekdays) if weekdays is not None else None
+        days = (date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1))
+        return [day for day in days if weekdays is None or day.weekday() in weekdays]
+
+    @property
+    def grid(self) -> SlotGrid:
+        return SlotGrid.from_times(slot.time_start.value for slot in self.slots)
+
+    def get_occupancy(self, occupied_slots: Iterable[Slot], grid: SlotGrid | None = None) -> SlotOccupancy:
+        return SlotOccupancy.from_times((slot.time_start.value for slot in occupied_slots), grid or self.grid)
+
+    def get_free_slots(self, occupied_slots: list[Slot], grid: SlotGrid | None = None) -> list[Slot]:
+        occupancy = self.get_occupancy(occupied_slots, grid)
+        free_slots = [slot for slot in self.slots if occupancy.is_free(slot.time_start.value)]
+        return sorted(free_slots, key=lambda slot: slot.time_start.minutes)
 
     def to_dict(self) -> dict:
         return {"id": self.id, "day": self.day, "master_id": self.master_id, "slots": self.slots}
 
 
+@dataclass()
+class ScheduleTemplate(BaseEntityWithIntIdAndEvents):
+    master_id: int
+    weekday: int
+    grid: SlotGrid = DEFAULT_SLOT_GRID
+
+    @classmethod
+    def add(cls, master_id: int, weekday: int, start_hour: int, end_hour: int, slot_delta: int) -> ScheduleTemplate:
+        grid = SlotGrid(start_hour=start_hour, end_hour=end_hour, slot_delta=slot_delta)
+        if not 0 <= weekday < DAYS_IN_WEEK or not grid.is_valid():
+            raise ScheduleTemplateInvalidException()
+        return cls(master_id=master_id, weekday=weekday, grid=grid)
+
+    def is_for_day(self, day: date) -> bool:
+        return day.weekday() == self.weekday
+
+    def materialize(self, day: date) -> Schedule:
+        return Schedule.add(day=day, master_id=self.master_id, grid=self.grid)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "master_id": self.master_id,
+            "weekday": self.weekday,
+            "start_hour": self.grid.start_hour,
+            "end_hour": self.grid.end_hour,
+            "slot_delta": self.grid.slot_delta,
+        }
+
+
 @dataclass()
 class Slot(BaseEntityWithIntIdAndEvents):
     schedule_id: int = field(init=False, hash=False, repr=False, compare=False)
@@ -93,14 +145,18 @@ class Slot(BaseEntityWithIntIdAndEvents):
 
 
 class SlotsForSchedule:
+    def __init__(self, grid: SlotGrid = DEFAULT_SLOT_GRID):
+        self.grid = grid
+
+    def get_occupancy(self, occupied_slots: Iterable[Slot]) -> SlotOccupancy:
+        return SlotOccupancy.from_times((slot.time_start.value for slot in occupied_slots), self.grid)
+
     def get_free_slots(self, occupied_slots: list[Slot]) -> list[SlotTime]:
-        all_day_slots = {SlotTime(f"{hour}:00") for hour in range(START_HOUR, END_HOUR + SLOT_DELTA)}
-        occupied_slots_time = {occupied_slot.time_start for occupied_slot in occupied_slots}
-        return sorted(all_day_slots.difference(occupied_slots_time))
+        occupancy = self.get_occupancy(occupied_slots)
+        return [SlotTime(self.grid.time_at(index)) for index in occupancy.free_indexes()]
 
     def check_slot_time_is_free(self, slot_time: SlotTime, occupied_slots: list[Slot]) -> bool:
-        free_slots = self.get_free_slots(occupied_slots)
-        return True if slot_time in free_slots else False
+        return self.get_occupancy(occupied_slots).is_free(slot_time.value)
 
 
 class OrderStatus(enum.Enum):
@@ -129,11 +185,10 @@ class Order(BaseEntityWithIntIdAndEvents):
         schedule_master_services_ids: list[int],
         occupied_slots_ids: list[int],
     ) -> Order:
-        if slot_id in occupied_slots_ids:
-            raise SlotOccupiedException()
-
-        if service_id not in schedule_master_services_ids:
-            raise SlotServiceInvalidException()
+        cls.check_slot_booking(
+            slot_is_free=slot_id not in occupied_slots_ids,
+            service_is_valid=service_id in schedule_master_services_ids,
+        )
 
         order = cls(
             user_id=user_id,
@@ -143,11 +198,19 @@ class Order(BaseEntityWithIntIdAndEvents):
 
         return order
 
-    def update_slot_time(self, slot_id: int, occupied_slots: list[Slot]):
+    @staticmethod
+    def check_slot_booking(slot_is_free: bool, service_is_valid: bool) -> None:
+        if not slot_is_free:
+            raise SlotOccupiedException()
+
+        if not service_is_valid:
+            raise SlotServiceInvalidException()
+
+    def update_slot_time(self, slot_id: int, slot_is_free: bool):
         if self.status != OrderStatus.RECEIVED:
             raise OrderNotReceivedException()
 
-        if slot_id in [slot.id for slot in occupied_slots]:
+        if not slot_is_free:
             raise SlotOccupiedException()
 
         self.slot_id = slot_id
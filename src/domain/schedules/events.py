@@ -1,18 +1,23 @@
 from dataclasses import dataclass
 
-from dataclasses_json import dataclass_json
-
 from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
 
 
-@dataclass_json
+@event_registry.register("schedule.created")
 @dataclass
 class ScheduleCreatedEvent(BaseEvent):
     schedule_id: int
 
+    def get_partition_key(self) -> str | None:
+        return f"schedule:{self.schedule_id}"
+
 
-@dataclass_json
+@event_registry.register("order.cancelled")
 @dataclass()
 class OrderCancelledEvent(BaseEvent):
     order_id: int
     user_id: int
+
+    def get_partition_key(self) -> str | None:
+        return f"order:{self.order_id}"
@@ -31,8 +31,22 @@ class SlotServiceInvalidException(ValueError, DomainException):
         return "Времянное окно не подходит для данной услуги"
 
 
+@dataclass(eq=False)
+class ScheduleTemplateInvalidException(ValueError, DomainException):
+    @property
+    def title(self) -> str:
+        return "Шаблон расписания некорректен: проверьте день недели, часы работы и длину окна"
+
+
 @dataclass(eq=False)
 class SlotInvalidException(BaseValueObjectException):
     @property
     def title(self) -> str:
         return f'Времянное окно "{self.value}" имеет неверный формат'
+
+
+@dataclass(eq=False)
+class SlotOccupancyInvalidException(BaseValueObjectException):
+    @property
+    def title(self) -> str:
+        return f'Маска занятости "{self.value}" выходит за пределы расписания'
@@ -1,14 +1,28 @@
+from __future__ import annotations
+
 import re
 
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from datetime import time
 
 from src.domain.base.values import BaseValueObject
-from src.domain.schedules.exceptions import SlotInvalidException
+from src.domain.schedules.exceptions import SlotInvalidException, SlotOccupancyInvalidException
 
 SLOT_TIME_REGEX = re.compile(r"^(?:[01][0-9]|2?[0-3]):[0-5]\d$")
 START_HOUR = 10
 END_HOUR = 20
 SLOT_DELTA = 1
+MINUTES_IN_HOUR = 60
+HOURS_IN_DAY = 24
+DAYS_IN_WEEK = 7
+
+
+def slot_time_to_minutes(value: str | time) -> int:
+    if isinstance(value, time):
+        return value.hour * MINUTES_IN_HOUR + value.minute
+    hours, minutes = value.split(":")
+    return int(hours) * MINUTES_IN_HOUR + int(minutes)
 
 
 class SlotTime(BaseValueObject[str]):
@@ -18,8 +32,110 @@ class SlotTime(BaseValueObject[str]):
         if not SLOT_TIME_REGEX.match(self.value):
             raise SlotInvalidException(self.value)
 
+    @property
+    def minutes(self) -> int:
+        return slot_time_to_minutes(self.value)
+
     def __gt__(self, other):
-        return time.fromisoformat(self.value) > time.fromisoformat(other.value)
+        return self.minutes > other.minutes
 
     def __lt__(self, other):
-        return time.fromisoformat(self.value) < time.fromisoformat(other.value)
+        return self.minutes < other.minutes
+
+
+@dataclass(frozen=True)
+class SlotGrid:
+    # слот с индексом i начинается в start_hour + i * slot_delta
+    start_hour: int = START_HOUR
+    end_hour: int = END_HOUR
+    slot_delta: int = SLOT_DELTA
+
+    @property
+    def slots_count(self) -> int:
+        return (self.end_hour - self.start_hour) // self.slot_delta + 1
+
+    @property
+    def full_mask(self) -> int:
+        return (1 << self.slots_count) - 1
+
+    def index_of(self, value: str | time) -> int | None:
+        step = self.slot_delta * MINUTES_IN_HOUR
+        offset = slot_time_to_minutes(value) - self.start_hour * MINUTES_IN_HOUR
+        if offset < 0 or offset % step:
+            return None
+        index = offset // step
+        return index if index < self.slots_count else None
+
+    def is_valid(self) -> bool:
+        return 0 <= self.start_hour <= self.end_hour < HOURS_IN_DAY and self.slot_delta > 0
+
+    def time_at(self, index: int) -> str:
+        minutes = self.start_hour * MINUTES_IN_HOUR + index * self.slot_delta * MINUTES_IN_HOUR
+        return f"{minutes // MINUTES_IN_HOUR:02d}:{minutes % MINUTES_IN_HOUR:02d}"
+
+    @classmethod
+    def from_times(cls, times: Iterable[str | time]) -> SlotGrid:
+        # сетка расписания по времени всех его слотов: расписание могло быть создано по шаблону с другой сеткой
+        hours = sorted({slot_time_to_minutes(value) // MINUTES_IN_HOUR for value in times})
+        if not hours:
+            return cls()
+        slot_delta = hours[1] - hours[0] if len(hours) > 1 else SLOT_DELTA
+        return cls(start_hour=hours[0], end_hour=hours[-1], slot_delta=slot_delta)
+
+
+DEFAULT_SLOT_GRID = SlotGrid()
+
+
+@dataclass(frozen=True)
+class SlotOccupancy(BaseValueObject[int]):
+    # бит i выставлен, если слот с индексом i в сетке grid занят
+    value: int = 0
+    grid: SlotGrid = DEFAULT_SLOT_GRID
+
+    def validate(self):
+        if not isinstance(self.value, int) or self.value < 0 or self.value & ~self.grid.full_mask:
+            raise SlotOccupancyInvalidException(self.value)
+
+    @classmethod
+    def from_times(cls, times: Iterable[str | time], grid: SlotGrid = DEFAULT_SLOT_GRID) -> SlotOccupancy:
+        mask = 0
+        for value in times:
+            index = grid.index_of(value)
+            if index is not None:
+                mask |= 1 << index
+        return cls(mask, grid)
+
+    @property
+    def free_mask(self) -> int:
+        return ~self.value & self.grid.full_mask
+
+    def is_occupied(self, value: str | time) -> bool:
+        index = self.grid.index_of(value)
+        return index is not None and bool(self.value >> index & 1)
+
+    def is_free(self, value: str | time) -> bool:
+        index = self.grid.index_of(value)
+        return index is not None and not self.value >> index & 1
+
+    def occupy(self, value: str | time) -> SlotOccupancy:
+        index = self.grid.index_of(value)
+        if index is None:
+            raise SlotInvalidException(value)
+        return SlotOccupancy(self.value | 1 << index, self.grid)
+
+    def release(self, value: str | time) -> SlotOccupancy:
+        index = self.grid.index_of(value)
+        if index is None:
+            raise SlotInvalidException(value)
+        return SlotOccupancy(self.value & ~(1 << index), self.grid)
+
+    def free_indexes(self) -> Iterator[int]:
+        mask = self.free_mask
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+    @property
+    def occupied_count(self) -> int:
+        return self.value.bit_count()
@@ -1,13 +1,26 @@
 from dataclasses import asdict
-from typing import Any
+from typing import Any, TypeVar
 
 import orjson
 
 from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
+
+ET = TypeVar("ET", bound=BaseEvent)
+
+OCCURRED_AT_HEADER = "x-occurred-at"
 
 
 def convert_event_to_broker_message(event: BaseEvent) -> bytes:
-    return orjson.dumps(event)
+    return event_registry.encode(event)
+
+
+def convert_broker_message_to_event(event_cls: type[ET], message_body: bytes) -> ET:
+    return event_registry.get_codec(event_cls).decode(message_body)
+
+
+def get_event_type_name(event: BaseEvent) -> str:
+    return event_registry.get_type_name(event)
 
 
 def convert_broker_message_to_dict(message_body: bytes) -> dict[str, Any]:
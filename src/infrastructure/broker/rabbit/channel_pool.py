@@ -0,0 +1,92 @@
+import asyncio
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from aio_pika.abc import AbstractChannel
+
+from src.infrastructure.broker.rabbit.connector import BlankChannelException, RabbitConnector
+from src.infrastructure.broker.rabbit.topology import RabbitTopology
+from src.infrastructure.logger_adapter.logger import init_logger
+
+logger = init_logger(__name__)
+
+RABBIT_PUBLISH_CHANNELS = 4
+
+
+class RabbitChannelPool:
+    """
+    Каналы публикации поверх одного соединения на все приложение.
+
+    Соединение и каналы открываются один раз при старте, публикация только берет свободный канал.
+    Закрытый брокером канал (ошибка публикации, потеря соединения) заменяется новым при следующей выдаче,
+    недоступное на старте соединение переоткрывается при следующей публикации.
+    Топология объявляется до выдачи первого канала соединения, поэтому публикация exchange не объявляет.
+    """
+
+    def __init__(
+        self,
+        connector: RabbitConnector,
+        size: int = RABBIT_PUBLISH_CHANNELS,
+        topology: RabbitTopology | None = None,
+        publisher_confirms: bool = True,
+    ) -> None:
+        self.connector = connector
+        self.size = size
+        self.topology = topology
+        self.publisher_confirms = publisher_confirms
+        self._channels: asyncio.Queue[AbstractChannel | None] = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        self._opened = False
+
+    async def open(self) -> None:
+        async with self._lock:
+            if self._opened:
+                return
+            await self.connector.__aenter__()
+            self._opened = True
+            if self.topology is not None and self.connector.is_connected:
+                await self.topology.ensure_declared(self.connector.connection)
+            # каналы создаются лениво, чтобы пул открывался и без доступного брокера
+            for _ in range(self.size):
+                self._channels.put_nowait(None)
+        logger.info(f"{self.__class__.__name__}: opened with {self.size} channels")
+
+    async def close(self) -> None:
+        async with self._lock:
+            if not self._opened:
+                return
+            self._opened = False
+            while not self._channels.empty():
+                channel = self._channels.get_nowait()
+                if channel is not None and not channel.is_closed:
+                    await channel.close()
+            await self.connector.__aexit__(None, None, None)
+        logger.info(f"{self.__class__.__name__}: closed")
+
+    async def _reconnect(self) -> None:
+        async with self._lock:
+            if self.connector.is_connected:
+                return
+            logger.warning(f"{self.__class__.__name__}: reconnecting")
+            await self.connector.open_connection()
+
+    async def _get_healthy_channel(self, channel: AbstractChannel | None) -> AbstractChannel:
+        if channel is not None and not channel.is_closed:
+            return channel
+        if not self.connector.is_connected:
+            await self._reconnect()
+        if self.topology is not None:
+            await self.topology.ensure_declared(self.connector.connection)
+        return await self.connector.connection.channel(publisher_confirms=self.publisher_confirms)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AbstractChannel]:
+        if not self._opened:
+            raise BlankChannelException()
+        channel = await self._channels.get()
+        try:
+            channel = await self._get_healthy_channel(channel)
+            yield channel
+        finally:
+            self._channels.put_nowait(channel)
@@ -1,3 +1,5 @@
+import asyncio
+
 from typing import Any, Self
 
 import aio_pika
@@ -15,6 +17,10 @@ class BlankChannelException(Exception):
     message = "Please use context manager for Rabbit helper or check connection"
 
 
+class MessageNotConfirmedException(Exception):
+    message = "Broker did not confirm the published message"
+
+
 def except_rabbit_exception_deco(func):
     async def wrapped(*args, **kwargs) -> Any:
         try:
@@ -31,6 +37,9 @@ class RabbitConnector:
         self._connection: AbstractRobustConnection | None = None
         self._channel: AbstractRobustChannel | None = None
         self.config = settings.rabbit
+        # один коннектор используют параллельные публикации: соединение открывает первый вход, закрывает последний выход
+        self._users = 0
+        self._lock = asyncio.Lock()
 
     async def get_connection(self) -> AbstractRobustConnection | None:
         try:
@@ -50,18 +59,33 @@ class RabbitConnector:
             raise BlankChannelException()
         return self._channel
 
+    @property
+    def connection(self) -> AbstractRobustConnection:
+        if self._connection is None:
+            raise BlankChannelException()
+        return self._connection
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed
+
     async def open_connection(self):
         self._connection = await self.get_connection()
         if self._connection:
             self._channel = await self._connection.channel()
-            await self._channel.set_qos(prefetch_count=1)
 
     async def __aenter__(self) -> Self:
-        await self.open_connection()
+        async with self._lock:
+            if self._users == 0:
+                await self.open_connection()
+            self._users += 1
         return self
 
     async def __aexit__(self, *args, **kwargs) -> None:
-        await self.close_connection()
+        async with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                await self.close_connection()
 
     async def close_connection(self):
         if self._channel and not self._channel.is_closed:
@@ -1,105 +1,96 @@
 import asyncio
 
-from typing import Any, Callable
+from collections.abc import Awaitable, Callable
+from typing import Any
 
 import aio_pika
 
-from aio_pika.abc import AbstractIncomingMessage, AbstractRobustChannel, AbstractRobustQueue, ExchangeType
+from aio_pika.abc import AbstractIncomingMessage
 
-from src.infrastructure.broker.converters import convert_broker_message_to_dict
+from src.infrastructure.broker.converters import OCCURRED_AT_HEADER, convert_broker_message_to_dict
 from src.infrastructure.broker.rabbit.connector import RabbitConnector, except_rabbit_exception_deco
+from src.infrastructure.broker.rabbit.topology import RabbitTopology
 from src.infrastructure.logger_adapter.logger import init_logger
+from src.infrastructure.redis_adapter.outbox_metrics import OutboxMetrics
 
 logger = init_logger(__name__)
 
+CONSUMER_PREFETCH_COUNT = 20
+CONSUMER_CONCURRENCY = 10
+CONSUMER_MESSAGE_TIMEOUT_SECONDS = 60
+
 
 class RabbitConsumer:
     def __init__(
         self,
         connector: RabbitConnector,
+        topology: RabbitTopology,
+        metrics: OutboxMetrics | None = None,
     ):
         self.connector = connector
-
-    @except_rabbit_exception_deco
-    async def declare_queue(
-        self,
-        channel: AbstractRobustChannel,
-        exchange_name: str,
-        queue_name: str,
-        routing_key: str,
-    ) -> AbstractRobustQueue:
-        dlx_name = f"{exchange_name}_dlx"
-        dlq_retry_1_name = f"{queue_name}_dlq_retry_1"
-        dlq_retry_2_name = f"{queue_name}_dlq_retry_2"
-        routing_key_retry_2 = f"{routing_key}_retry_2"
-        routing_key_fail = f"{routing_key}_fail"
-        dlq_fail_name = f"{queue_name}_dlq_fail"
-        dlx = await channel.declare_exchange(
-            name=dlx_name,
-            type=ExchangeType.DIRECT,
-        )
-        dlq_retry_1 = await channel.declare_queue(
-            name=dlq_retry_1_name,
-            durable=True,
-            arguments={
-                "x-dead-letter-exchange": exchange_name,
-                "x-dead-letter-routing-key": routing_key_retry_2,
-                "x-message-ttl": 1 * 60 * 1000,  # 1 min
-            },
-        )
-        await dlq_retry_1.bind(exchange=dlx, routing_key=routing_key)
-        dlq_retry_2 = await channel.declare_queue(
-            name=dlq_retry_2_name,
-            durable=True,
-            arguments={
-                "x-dead-letter-exchange": exchange_name,
-                "x-dead-letter-routing-key": routing_key_fail,
-                "x-message-ttl": 5 * 60 * 1000,  # 5 min
-            },
-        )
-        await dlq_retry_2.bind(exchange=dlx, routing_key=routing_key_retry_2)
-        dlq_fail = await channel.declare_queue(
-            name=dlq_fail_name,
-            durable=True,
-        )
-        await dlq_fail.bind(exchange=dlx, routing_key=routing_key_fail)
-        exchange = await channel.declare_exchange(
-            name=exchange_name,
-            type=ExchangeType.DIRECT,
-        )
-        queue = await channel.declare_queue(
-            name=queue_name,
-            durable=True,
-            arguments={
-                "x-dead-letter-exchange": dlx_name,
-            },
-        )
-        await queue.bind(exchange=exchange, routing_key=routing_key)
-        await queue.bind(exchange=exchange, routing_key=routing_key_retry_2)
-        await queue.bind(exchange=exchange, routing_key=routing_key_fail)
-        return queue
+        self.topology = topology
+        self.metrics = metrics
 
     @except_rabbit_exception_deco
     async def consume_messages(
         self,
-        message_callback: Callable[[AbstractIncomingMessage], Any],
-        exchange_name: str,
+        message_callback: Callable[[AbstractIncomingMessage], Awaitable[Any]],
         queue_name: str,
-        routing_key: str,
+        prefetch_count: int = CONSUMER_PREFETCH_COUNT,
+        concurrency: int = CONSUMER_CONCURRENCY,
+        message_timeout: float = CONSUMER_MESSAGE_TIMEOUT_SECONDS,
     ):
+        """
+        Читает очередь и раздает сообщения пулу из concurrency обработчиков.
+
+        Сообщение подтверждается после успешной обработки и отклоняется без возврата в очередь при ошибке
+        или таймауте, откуда его подберет цепочка повторов из топологии. prefetch ограничивает число
+        неподтвержденных сообщений на консьюмер и должен быть не меньше concurrency, чтобы пул не простаивал.
+        """
         async with self.connector:
-            queue = await self.declare_queue(
-                channel=self.connector.channel,
-                exchange_name=exchange_name,
-                queue_name=queue_name,
-                routing_key=routing_key,
-            )
-            await queue.consume(
-                callback=message_callback,
-            )
-            logger.info("Waiting for messages...")
-
-            await asyncio.Future()
+            # очередь со всей цепочкой повторов описана в топологии и объявляется один раз на соединение
+            await self.topology.ensure_declared(self.connector.connection)
+            # prefetch задается на канал, поэтому у каждого консьюмера свой канал
+            channel = await self.connector.connection.channel()
+            await channel.set_qos(prefetch_count=prefetch_count)
+            workers = asyncio.Semaphore(concurrency)
+            tasks: set[asyncio.Task] = set()
+            try:
+                # пассивное объявление только находит очередь, зато robust-канал восстановит подписку
+                queue = await channel.declare_queue(queue_name, passive=True)
+                async with queue.iterator() as messages:
+                    logger.info(f"Waiting for messages from {queue_name}...")
+                    async for message in messages:
+                        await workers.acquire()
+                        task = asyncio.create_task(
+                            self._process_message(message_callback, message, queue_name, message_timeout)
+                        )
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                        task.add_done_callback(lambda _: workers.release())
+            finally:
+                # начатые сообщения дорабатываются, остальные неподтвержденные брокер вернет в очередь
+                if tasks:
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                await channel.close()
+
+    async def _process_message(
+        self,
+        message_callback: Callable[[AbstractIncomingMessage], Awaitable[Any]],
+        message: AbstractIncomingMessage,
+        queue_name: str,
+        message_timeout: float,
+    ) -> None:
+        try:
+            async with message.process(requeue=False):
+                await asyncio.wait_for(message_callback(message), timeout=message_timeout)
+        except Exception as err:
+            logger.error(f"{self.__class__.__name__}: message from {queue_name} rejected: {err!r}")
+            return
+        occurred_at = (message.headers or {}).get(OCCURRED_AT_HEADER)
+        # сообщения без заголовка отправлены до появления метрик
+        if self.metrics is not None and isinstance(occurred_at, (int, float)):
+            self.metrics.record_delivery(message.type or queue_name, occurred_at)
 
 
 async def process_new_message(
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Any
+
+from aio_pika.abc import AbstractIncomingMessage
+
+from src.infrastructure.broker.rabbit.consumer import (
+    CONSUMER_CONCURRENCY,
+    CONSUMER_MESSAGE_TIMEOUT_SECONDS,
+    CONSUMER_PREFETCH_COUNT,
+    RabbitConsumer,
+)
+from src.infrastructure.logger_adapter.logger import init_logger
+
+logger = init_logger(__name__)
+
+CONSUMER_RESTART_MIN_SECONDS = 1
+CONSUMER_RESTART_MAX_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class ConsumerRegistration:
+    callback: Callable[[AbstractIncomingMessage], Awaitable[Any]]
+    queue_name: str
+    prefetch_count: int = CONSUMER_PREFETCH_COUNT
+    concurrency: int = CONSUMER_CONCURRENCY
+    message_timeout: float = CONSUMER_MESSAGE_TIMEOUT_SECONDS
+
+
+class RabbitConsumerHost:
+    """
+    Все консьюмеры процесса на одном robust-соединении, по каналу на очередь.
+
+    Соединение открывается один раз в start и держится до stop, поэтому число соединений не растет
+    с числом типов событий, а после рестарта брокера переподключается одно соединение, а не каждый консьюмер.
+    Потерю уже открытого соединения восстанавливает robust-соединение; консьюмер, который не смог стартовать
+    (брокер недоступен при старте процесса) или упал, перезапускается с растущей паузой.
+    """
+
+    def __init__(self, consumer: RabbitConsumer) -> None:
+        self.consumer = consumer
+        self.registrations: list[ConsumerRegistration] = []
+        self._tasks: list[asyncio.Task] = []
+        self._stack: AsyncExitStack | None = None
+        self._connect_lock = asyncio.Lock()
+
+    def register(self, registration: ConsumerRegistration) -> None:
+        if any(el.queue_name == registration.queue_name for el in self.registrations):
+            raise ValueError(f"Consumer for queue {registration.queue_name} is already registered")
+        self.registrations.append(registration)
+
+    async def start(self) -> None:
+        if self._stack is not None:
+            return
+        self._stack = AsyncExitStack()
+        await self._stack.enter_async_context(self.consumer.connector)
+        for registration in self.registrations:
+            task = asyncio.create_task(self._supervise(registration), name=f"consumer:{registration.queue_name}")
+            task.add_done_callback(self._on_consumer_done)
+            self._tasks.append(task)
+        logger.info(f"{self.__class__.__name__}: started {len(self._tasks)} consumers")
+
+    async def _supervise(self, registration: ConsumerRegistration) -> None:
+        # consume_messages возвращается только при ошибке: без соединения он пишет ошибку и выходит,
+        # поэтому выход и исключение одинаково ведут к перезапуску; остановку хоста задача получает отменой
+        delay = CONSUMER_RESTART_MIN_SECONDS
+        while True:
+            started = time.monotonic()
+            try:
+                await self._ensure_connected()
+                await self.consumer.consume_messages(
+                    registration.callback,
+                    queue_name=registration.queue_name,
+                    prefetch_count=registration.prefetch_count,
+                    concurrency=registration.concurrency,
+                    message_timeout=registration.message_timeout,
+                )
+            except Exception as err:
+                logger.error(f"{self.__class__.__name__}: consumer of {registration.queue_name} failed: {err!r}")
+            # консьюмер, проработавший дольше максимальной паузы, падает заново, а не продолжает серию неудач
+            if time.monotonic() - started > CONSUMER_RESTART_MAX_SECONDS:
+                delay = CONSUMER_RESTART_MIN_SECONDS
+            logger.warning(f"{self.__class__.__name__}: restarting consumer of {registration.queue_name} in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CONSUMER_RESTART_MAX_SECONDS)
+
+    async def _ensure_connected(self) -> None:
+        async with self._connect_lock:
+            if self.consumer.connector.is_connected:
+                return
+            await self.consumer.connector.open_connection()
+
+    def _on_consumer_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{self.__class__.__name__}: {task.get_name()} stopped: {task.exception()!r}")
+
+    async def stop(self) -> None:
+        if self._stack is None:
+            return
+        for task in self._tasks:
+            task.cancel()
+        # отмена ждет, пока пулы доработают начатые сообщения и закроют свои каналы
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await self._stack.aclose()
+        self._stack = None
+        logger.info(f"{self.__class__.__name__}: stopped")
@@ -1,29 +1,43 @@
 import asyncio
 
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
 import aio_pika
 
+from pamqp.commands import Basic
+
 from src.domain.base.events import BaseEvent
 from src.infrastructure.broker.converters import convert_event_to_broker_message
-from src.infrastructure.broker.rabbit.connector import RabbitConnector, except_rabbit_exception_deco
+from src.infrastructure.broker.rabbit.channel_pool import RabbitChannelPool
+from src.infrastructure.broker.rabbit.connector import (
+    MessageNotConfirmedException,
+    RabbitConnector,
+    except_rabbit_exception_deco,
+)
+from src.infrastructure.broker.rabbit.topology import RabbitTopology
 from src.infrastructure.logger_adapter.logger import init_logger
 from src.presentation.api.settings import settings
 
 logger = init_logger(__name__)
 
 
+@dataclass(frozen=True)
+class OutgoingMessage:
+    body: bytes
+    exchange_name: str
+    routing_key: str
+    message_type: str | None = None
+    headers: dict[str, Any] | None = None
+
+
 class Producer:
     def __init__(
         self,
-        connector: RabbitConnector,
-        # channel: AbstractRobustChannel
+        channel_pool: RabbitChannelPool,
     ):
-        self.connector = connector
-        # self.channel = channel
-
-    @except_rabbit_exception_deco
-    async def declare_exchange(self, exchange_name: str) -> None:
-        async with self.connector:
-            await self.connector.channel.declare_exchange(exchange_name, aio_pika.ExchangeType.DIRECT)
+        self.channel_pool = channel_pool
 
     @except_rabbit_exception_deco
     async def publish_message(
@@ -31,17 +45,57 @@ class Producer:
         message_data: bytes,
         exchange_name: str,
         routing_key: str,
+        message_type: str | None = None,
+        headers: dict[str, Any] | None = None,
     ) -> None:
-        rq_message = self.build_message(message_data)
-        async with self.connector:
-            exchange = await self.connector.channel.get_exchange(exchange_name, ensure=False)
-            await exchange.publish(rq_message, routing_key=routing_key)
-        logger.debug("Message sent", extra={"rq_message": rq_message})
+        message = OutgoingMessage(message_data, exchange_name, routing_key, message_type, headers)
+        [confirmed] = await self.publish_batch([message])
+        if not confirmed:
+            raise MessageNotConfirmedException()
+
+    async def publish_batch(self, messages: Sequence[OutgoingMessage]) -> list[bool]:
+        """
+        Публикует сообщения на одном канале, не дожидаясь подтверждения каждого, и ждет все подтверждения разом.
+
+        Возвращает ack брокера по каждому сообщению в порядке передачи. Канал без подтверждений
+        считает успехом саму отправку. Сообщения пачки могут подтвердиться не по порядку: при nack одного
+        следующие за ним уже отправлены, поэтому упорядоченные сообщения передаются разными пачками.
+        """
+        if not messages:
+            return []
+        async with self.channel_pool.acquire() as channel:
+            exchanges = {
+                exchange_name: await channel.get_exchange(exchange_name, ensure=False)
+                for exchange_name in {message.exchange_name for message in messages}
+            }
+            results = await asyncio.gather(
+                *[
+                    exchanges[message.exchange_name].publish(
+                        self.build_message(message.body, message.message_type, message.headers),
+                        routing_key=message.routing_key,
+                    )
+                    for message in messages
+                ],
+                return_exceptions=True,
+            )
+        confirmed = []
+        for message, result in zip(messages, results):
+            if isinstance(result, BaseException):
+                logger.error(f"{self.__class__.__name__}: publish to {message.exchange_name} failed: {result!r}")
+            elif result is not None and not isinstance(result, Basic.Ack):
+                logger.error(f"{self.__class__.__name__}: broker rejected message to {message.exchange_name}: {result}")
+            confirmed.append(result is None or isinstance(result, Basic.Ack))
+        logger.debug(f"{self.__class__.__name__}: confirmed {sum(confirmed)} of {len(messages)} messages")
+        return confirmed
 
     @staticmethod
-    def build_message(message_data: bytes) -> aio_pika.Message:
+    def build_message(
+        message_data: bytes, message_type: str | None = None, headers: dict[str, Any] | None = None
+    ) -> aio_pika.Message:
         return aio_pika.Message(
             body=message_data,
+            type=message_type,
+            headers=headers,
             content_type="application/json",
             delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
         )
@@ -50,15 +104,19 @@ class Producer:
 async def main():
     exchange_name = "user_create"
     routing_key = "user_create"
-    c = RabbitConnector(settings)
-    async with c:
-        p = Producer(c)
-        await p.declare_exchange(exchange_name)
+    topology = RabbitTopology()
+    topology.add_exchange(exchange_name)
+    pool = RabbitChannelPool(RabbitConnector(settings), topology=topology)
+    await pool.open()
+    try:
+        p = Producer(pool)
         await p.publish_message(
             message_data=convert_event_to_broker_message(BaseEvent()),
             exchange_name=exchange_name,
             routing_key=routing_key,
         )
+    finally:
+        await pool.close()
 
 
 if __name__ == "__main__":
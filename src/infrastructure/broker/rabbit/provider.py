@@ -1,7 +1,11 @@
+from typing import AsyncIterator
+
 from dishka import Provider, Scope, from_context, provide
 
+from src.infrastructure.broker.rabbit.channel_pool import RabbitChannelPool
 from src.infrastructure.broker.rabbit.connector import RabbitConnector
 from src.infrastructure.broker.rabbit.producer import Producer
+from src.infrastructure.broker.rabbit.topology import RabbitTopology
 from src.presentation.api.settings import Settings
 
 
@@ -10,10 +14,22 @@ class RabbitProvider(Provider):
 
     settings = from_context(provides=Settings)
 
-    # connector = provide(RabbitConnector)
-
     publisher = provide(Producer)
 
     @provide()
     async def connector(self, settings: Settings) -> RabbitConnector:
         return RabbitConnector(settings)
+
+    @provide()
+    async def channel_pool(
+        self, connector: RabbitConnector, settings: Settings, topology: RabbitTopology
+    ) -> AsyncIterator[RabbitChannelPool]:
+        pool = RabbitChannelPool(
+            connector,
+            size=settings.rabbit.RABBIT_PUBLISH_CHANNELS,
+            topology=topology,
+            publisher_confirms=settings.rabbit.RABBIT_PUBLISHER_CONFIRMS,
+        )
+        await pool.open()
+        yield pool
+        await pool.close()
@@ -0,0 +1,125 @@
+import asyncio
+
+from dataclasses import dataclass, field
+
+from aio_pika import ExchangeType
+from aio_pika.abc import AbstractChannel, AbstractRobustConnection
+
+from src.infrastructure.logger_adapter.logger import init_logger
+
+logger = init_logger(__name__)
+
+DLQ_RETRY_1_TTL_MILLISECONDS = 1 * 60 * 1000  # 1 min
+DLQ_RETRY_2_TTL_MILLISECONDS = 5 * 60 * 1000  # 5 min
+
+
+@dataclass(frozen=True)
+class QueueBinding:
+    """Очередь консьюмера с цепочкой повторов: queue -> dlq_retry_1 -> queue -> dlq_retry_2 -> queue -> dlq_fail"""
+
+    exchange_name: str
+    queue_name: str
+    routing_key: str
+
+    @property
+    def dlx_name(self) -> str:
+        return f"{self.exchange_name}_dlx"
+
+    @property
+    def routing_key_retry_2(self) -> str:
+        return f"{self.routing_key}_retry_2"
+
+    @property
+    def routing_key_fail(self) -> str:
+        return f"{self.routing_key}_fail"
+
+    async def declare(self, channel: AbstractChannel) -> None:
+        dlx = await channel.declare_exchange(name=self.dlx_name, type=ExchangeType.DIRECT)
+        dlq_retry_1 = await channel.declare_queue(
+            name=f"{self.queue_name}_dlq_retry_1",
+            durable=True,
+            arguments={
+                "x-dead-letter-exchange": self.exchange_name,
+                "x-dead-letter-routing-key": self.routing_key_retry_2,
+                "x-message-ttl": DLQ_RETRY_1_TTL_MILLISECONDS,
+            },
+        )
+        await dlq_retry_1.bind(exchange=dlx, routing_key=self.routing_key)
+        dlq_retry_2 = await channel.declare_queue(
+            name=f"{self.queue_name}_dlq_retry_2",
+            durable=True,
+            arguments={
+                "x-dead-letter-exchange": self.exchange_name,
+                "x-dead-letter-routing-key": self.routing_key_fail,
+                "x-message-ttl": DLQ_RETRY_2_TTL_MILLISECONDS,
+            },
+        )
+        await dlq_retry_2.bind(exchange=dlx, routing_key=self.routing_key_retry_2)
+        dlq_fail = await channel.declare_queue(name=f"{self.queue_name}_dlq_fail", durable=True)
+        await dlq_fail.bind(exchange=dlx, routing_key=self.routing_key_fail)
+        exchange = await channel.get_exchange(self.exchange_name, ensure=False)
+        queue = await channel.declare_queue(
+            name=self.queue_name,
+            durable=True,
+            arguments={"x-dead-letter-exchange": self.dlx_name},
+        )
+        for routing_key in (self.routing_key, self.routing_key_retry_2, self.routing_key_fail):
+            await queue.bind(exchange=exchange, routing_key=routing_key)
+
+
+@dataclass
+class RabbitTopology:
+    """
+    Все exchange, очереди и привязки приложения.
+
+    Объявляются одним проходом на соединение: при старте, первым пользователем соединения или из CLI.
+    После переподключения robust-соединения объявление повторяется, так как недолговечные exchange
+    не переживают рестарт брокера. Публикация и подписка объявлением больше не занимаются.
+    """
+
+    exchanges: set[str] = field(default_factory=set)
+    queues: dict[str, QueueBinding] = field(default_factory=dict)
+    _declared_connections: set[int] = field(default_factory=set, init=False, repr=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+
+    def add_exchange(self, exchange_name: str) -> None:
+        self.exchanges.add(exchange_name)
+
+    def add_queue(self, exchange_name: str, queue_name: str, routing_key: str) -> None:
+        binding = QueueBinding(exchange_name=exchange_name, queue_name=queue_name, routing_key=routing_key)
+        if self.queues.setdefault(queue_name, binding) != binding:
+            raise ValueError(f"Queue {queue_name} is already bound as {self.queues[queue_name]}")
+        self.add_exchange(exchange_name)
+
+    async def declare(self, channel: AbstractChannel) -> None:
+        for exchange_name in sorted(self.exchanges):
+            await channel.declare_exchange(exchange_name, ExchangeType.DIRECT)
+        for binding in self.queues.values():
+            await binding.declare(channel)
+        logger.info(f"{self.__class__.__name__}: declared {len(self.exchanges)} exchanges, {len(self.queues)} queues")
+
+    async def ensure_declared(self, connection: AbstractRobustConnection) -> None:
+        async with self._lock:
+            if id(connection) in self._declared_connections:
+                return
+            await self._declare_on(connection)
+            self._declared_connections.add(id(connection))
+            connection.reconnect_callbacks.add(self._on_reconnect)
+            connection.close_callbacks.add(self._on_close)
+
+    async def _declare_on(self, connection: AbstractRobustConnection) -> None:
+        channel = await connection.channel(publisher_confirms=False)
+        try:
+            await self.declare(channel)
+        finally:
+            await channel.close()
+
+    async def _on_reconnect(self, connection: AbstractRobustConnection) -> None:
+        async with self._lock:
+            try:
+                await self._declare_on(connection)
+            except Exception as err:
+                logger.error(f"{self.__class__.__name__}: не удалось объявить топологию после переподключения: {err}")
+
+    def _on_close(self, connection: AbstractRobustConnection, *args) -> None:
+        self._declared_connections.discard(id(connection))
@@ -0,0 +1,93 @@
+import asyncio
+
+from typing import Any, Self
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.infrastructure.logger_adapter.logger import init_logger
+
+logger = init_logger(__name__)
+
+
+class PostgresNotificationListener:
+    """
+    Подписка на LISTEN канала postgres на отдельном соединении.
+
+    Если подписаться не удалось, wait работает как обычный sleep, и вызывающий код продолжает опрос по таймеру.
+    Потерянное соединение wait замечает сам и подписывается заново.
+    """
+
+    def __init__(self, engine: AsyncEngine, channel: str):
+        self.engine = engine
+        self.channel = channel
+        self._notified = asyncio.Event()
+        self._connection: AsyncConnection | None = None
+        self._driver_connection: Any = None
+
+    def _on_notification(self, *args) -> None:
+        self._notified.set()
+
+    def _on_termination(self, *args) -> None:
+        # будим ожидающего, чтобы он переподписался, а не ждал уведомлений от закрытого соединения
+        self._notified.set()
+
+    def notify(self) -> None:
+        self._notified.set()
+
+    @property
+    def is_listening(self) -> bool:
+        return self._driver_connection is not None and not self._driver_connection.is_closed()
+
+    async def listen(self) -> bool:
+        try:
+            self._connection = await self.engine.connect()
+            raw_connection = await self._connection.get_raw_connection()
+            self._driver_connection = raw_connection.driver_connection
+            await self._driver_connection.add_listener(self.channel, self._on_notification)
+            self._driver_connection.add_termination_listener(self._on_termination)
+        except Exception as err:
+            logger.error(f"{self.__class__.__name__}: не удалось подписаться на {self.channel}: {err}")
+            await self.close()
+            return False
+        return True
+
+    async def ensure_listening(self) -> bool:
+        if self.is_listening:
+            return True
+        if self._driver_connection is not None:
+            logger.warning(f"{self.__class__.__name__}: соединение LISTEN {self.channel} закрыто, подписываемся заново")
+        await self.close()
+        if not await self.listen():
+            return False
+        # пока подписки не было, уведомления терялись: вызывающий код сразу проверяет таблицу
+        self._notified.set()
+        return True
+
+    async def wait(self, timeout: float) -> bool:
+        await self.ensure_listening()
+        try:
+            await asyncio.wait_for(self._notified.wait(), timeout=timeout)
+        except TimeoutError:
+            return False
+        finally:
+            self._notified.clear()
+        return True
+
+    async def close(self) -> None:
+        if self.is_listening:
+            self._driver_connection.remove_termination_listener(self._on_termination)
+            await self._driver_connection.remove_listener(self.channel, self._on_notification)
+        self._driver_connection = None
+        if self._connection is not None:
+            try:
+                await self._connection.close()
+            except Exception as err:
+                logger.warning(f"{self.__class__.__name__}: ошибка закрытия соединения {self.channel}: {err}")
+            self._connection = None
+
+    async def __aenter__(self) -> Self:
+        await self.listen()
+        return self
+
+    async def __aexit__(self, *args, **kwargs) -> None:
+        await self.close()
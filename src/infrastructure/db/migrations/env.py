@@ -14,10 +14,22 @@ from src.infrastructure.db.models.schedules import (
     Master,
     ServiceToMaster,
     Schedule,
+    ScheduleTemplate,
     Slot,
-    Order
+    Order,
+    MasterMonthReport,
+    ServiceMonthReport,
+    OrderReportEvent,
+)
+from src.infrastructure.db.models.orders import (
+    Promotion,
+    PromotionToService,
+    UserPoint,
+    OrderPayment,
+    RevenueReport,
+    RevenueReportPayment,
+    ReportWatermark,
 )
-from src.infrastructure.db.models.orders import Promotion, PromotionToService, UserPoint
 from src.presentation.api.settings import settings
 
 # this is the Alembic Config object, which provides
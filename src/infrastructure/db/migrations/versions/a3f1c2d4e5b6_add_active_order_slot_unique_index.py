@@ -0,0 +1,32 @@
+"""add active order slot unique index
+
+Revision ID: a3f1c2d4e5b6
+Revises: 63366f674875
+Create Date: 2026-10-17 10:12:31.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c2d4e5b6'
+down_revision: Union[str, None] = '63366f674875'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'uq_order_active_slot',
+        'order',
+        ['slot_id'],
+        unique=True,
+        postgresql_where=sa.text('status IS NULL OR status <> 4'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_order_active_slot', table_name='order')
@@ -0,0 +1,85 @@
+"""add revenue report
+
+Revision ID: a71c4e9b3d58
+Revises: f63b1d8e2a45
+Create Date: 2026-10-17 18:04:51.207913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71c4e9b3d58'
+down_revision: Union[str, None] = 'f63b1d8e2a45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('order_payment_revision_seq')))
+    op.add_column('order_payment', sa.Column('promotion_id', sa.BigInteger(), nullable=True))
+    op.add_column('order_payment', sa.Column('payed_at', sa.DateTime(), nullable=True))
+    op.add_column(
+        'order_payment',
+        sa.Column(
+            'revision',
+            sa.BigInteger(),
+            server_default=sa.text("nextval('order_payment_revision_seq')"),
+            nullable=False,
+        ),
+    )
+    op.create_foreign_key(None, 'order_payment', 'promotion', ['promotion_id'], ['id'], ondelete='SET NULL')
+    op.create_index('ix_order_payment_revision', 'order_payment', ['revision'], unique=False)
+    # время оплаты раньше не хранилось, для старых оплат берем дату заказа
+    op.execute(
+        """
+        UPDATE order_payment op SET payed_at = o.date_add
+        FROM "order" o
+        WHERE o.id = op.order_id AND op.is_payed
+        """
+    )
+    op.create_table('revenue_report',
+    sa.Column('dimension', sa.String(length=15), nullable=False),
+    sa.Column('key_id', sa.BigInteger(), nullable=False),
+    sa.Column('year', sa.BigInteger(), nullable=False),
+    sa.Column('month', sa.BigInteger(), nullable=False),
+    sa.Column('payments_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('total_amount', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('point_uses', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('promotion_sale', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'key_id', 'year', 'month')
+    )
+    op.create_table('revenue_report_payment',
+    sa.Column('order_payment_id', sa.BigInteger(), nullable=False),
+    sa.Column('master_id', sa.BigInteger(), nullable=False),
+    sa.Column('service_id', sa.BigInteger(), nullable=False),
+    sa.Column('promotion_id', sa.BigInteger(), nullable=True),
+    sa.Column('year', sa.BigInteger(), nullable=False),
+    sa.Column('month', sa.BigInteger(), nullable=False),
+    sa.Column('total_amount', sa.Integer(), nullable=False),
+    sa.Column('point_uses', sa.Integer(), nullable=False),
+    sa.Column('promotion_sale', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['order_payment_id'], ['order_payment.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('order_payment_id')
+    )
+    op.create_table('report_watermark',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('report_watermark')
+    op.drop_table('revenue_report_payment')
+    op.drop_table('revenue_report')
+    op.drop_index('ix_order_payment_revision', table_name='order_payment')
+    op.drop_constraint('order_payment_promotion_id_fkey', 'order_payment', type_='foreignkey')
+    op.drop_column('order_payment', 'revision')
+    op.drop_column('order_payment', 'payed_at')
+    op.drop_column('order_payment', 'promotion_id')
+    op.execute(sa.schema.DropSequence(sa.Sequence('order_payment_revision_seq')))
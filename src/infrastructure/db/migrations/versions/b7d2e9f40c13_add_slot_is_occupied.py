@@ -0,0 +1,39 @@
+"""add slot is_occupied
+
+Revision ID: b7d2e9f40c13
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-17 11:03:54.127940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e9f40c13'
+down_revision: Union[str, None] = 'a3f1c2d4e5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('slot', sa.Column('is_occupied', sa.Boolean(), server_default='f', nullable=False))
+    op.execute(
+        'UPDATE slot SET is_occupied = EXISTS ('
+        'SELECT 1 FROM "order" WHERE "order".slot_id = slot.id AND ("order".status IS NULL OR "order".status <> 4)'
+        ')'
+    )
+    op.create_index(
+        'ix_slot_schedule_free',
+        'slot',
+        ['schedule_id', 'time_start'],
+        unique=False,
+        postgresql_where=sa.text('NOT is_occupied'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_slot_schedule_free', table_name='slot')
+    op.drop_column('slot', 'is_occupied')
@@ -0,0 +1,32 @@
+"""add outbox unprocessed index
+
+Revision ID: b83d5f1a6c09
+Revises: a71c4e9b3d58
+Create Date: 2026-10-17 19:26:03.744150
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83d5f1a6c09'
+down_revision: Union[str, None] = 'a71c4e9b3d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_outbox_messages_unprocessed',
+        'outbox_messages',
+        ['occurred_at'],
+        unique=False,
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_messages_unprocessed', table_name='outbox_messages')
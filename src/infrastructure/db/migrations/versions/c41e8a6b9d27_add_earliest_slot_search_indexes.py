@@ -0,0 +1,28 @@
+"""add earliest slot search indexes
+
+Revision ID: c41e8a6b9d27
+Revises: b7d2e9f40c13
+Create Date: 2026-10-17 12:26:08.551372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e8a6b9d27'
+down_revision: Union[str, None] = 'b7d2e9f40c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_service_to_master_service_master', 'service_to_master', ['service_id', 'master_id'], unique=False)
+    op.create_index('ix_schedule_master_day', 'schedule', ['master_id', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_schedule_master_day', table_name='schedule')
+    op.drop_index('ix_service_to_master_service_master', table_name='service_to_master')
@@ -0,0 +1,84 @@
+"""partition outbox messages
+
+Revision ID: c5e0a7d2f914
+Revises: b83d5f1a6c09
+Create Date: 2026-10-17 21:48:12.315402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e0a7d2f914'
+down_revision: Union[str, None] = 'b83d5f1a6c09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'id, occurred_at, type, data, processed_at'
+
+
+def create_outbox_table(**kwargs) -> None:
+    op.create_table('outbox_messages',
+    sa.Column('id', sa.CHAR(length=36), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    **kwargs,
+    )
+    op.create_index(
+        'ix_outbox_messages_unprocessed',
+        'outbox_messages',
+        ['occurred_at'],
+        unique=False,
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+
+
+def upgrade() -> None:
+    op.drop_index('ix_outbox_messages_unprocessed', table_name='outbox_messages')
+    op.rename_table('outbox_messages', 'outbox_messages_old')
+    op.execute('ALTER TABLE outbox_messages_old RENAME CONSTRAINT outbox_messages_pkey TO outbox_messages_old_pkey')
+    create_outbox_table(postgresql_partition_by='RANGE (occurred_at)')
+    op.create_primary_key('outbox_messages_pkey', 'outbox_messages', ['id', 'occurred_at'])
+    op.execute('CREATE TABLE outbox_messages_default PARTITION OF outbox_messages DEFAULT')
+    # недельные партиции от самого старого сообщения до 4 недель вперед, дальше их создает maintain_outbox_partitions
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            week_start date;
+        BEGIN
+            FOR week_start IN
+                SELECT generate_series(
+                    date_trunc('week', coalesce((SELECT min(occurred_at) FROM outbox_messages_old), now())),
+                    date_trunc('week', now()) + interval '4 weeks',
+                    interval '1 week'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE outbox_messages_p%s PARTITION OF outbox_messages FOR VALUES FROM (%L) TO (%L)',
+                    to_char(week_start, 'YYYYMMDD'), week_start, week_start + 7
+                );
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(f'INSERT INTO outbox_messages ({COLUMNS}) SELECT {COLUMNS} FROM outbox_messages_old')
+    op.drop_table('outbox_messages_old')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_messages_unprocessed', table_name='outbox_messages')
+    op.rename_table('outbox_messages', 'outbox_messages_part')
+    op.execute(
+        'ALTER TABLE outbox_messages_part RENAME CONSTRAINT outbox_messages_pkey TO outbox_messages_part_pkey'
+    )
+    create_outbox_table()
+    op.create_primary_key('outbox_messages_pkey', 'outbox_messages', ['id'])
+    op.execute(f'INSERT INTO outbox_messages ({COLUMNS}) SELECT {COLUMNS} FROM outbox_messages_part')
+    # партиции удаляются вместе с родительской таблицей
+    op.drop_table('outbox_messages_part')
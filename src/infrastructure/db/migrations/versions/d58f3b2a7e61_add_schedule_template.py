@@ -0,0 +1,39 @@
+"""add schedule template
+
+Revision ID: d58f3b2a7e61
+Revises: c41e8a6b9d27
+Create Date: 2026-10-17 13:41:17.902214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd58f3b2a7e61'
+down_revision: Union[str, None] = 'c41e8a6b9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('schedule_template',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('master_id', sa.BigInteger(), nullable=False),
+    sa.Column('weekday', sa.BigInteger(), nullable=False),
+    sa.Column('start_hour', sa.BigInteger(), nullable=False),
+    sa.Column('end_hour', sa.BigInteger(), nullable=False),
+    sa.Column('slot_delta', sa.BigInteger(), nullable=False),
+    sa.CheckConstraint('weekday >= 0 AND weekday < 7', name='check_template_weekday'),
+    sa.CheckConstraint('start_hour >= 0 AND start_hour <= end_hour AND end_hour < 24', name='check_template_hours'),
+    sa.CheckConstraint('slot_delta > 0', name='check_template_slot_delta_positive'),
+    sa.ForeignKeyConstraint(['master_id'], ['master.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('master_id', 'weekday')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('schedule_template')
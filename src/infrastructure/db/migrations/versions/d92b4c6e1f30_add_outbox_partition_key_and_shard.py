@@ -0,0 +1,143 @@
+"""add outbox partition key and shard
+
+Revision ID: d92b4c6e1f30
+Revises: c5e0a7d2f914
+Create Date: 2026-10-17 22:31:47.508216
+
+"""
+import json
+import zlib
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd92b4c6e1f30'
+down_revision: Union[str, None] = 'c5e0a7d2f914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# копия get_shard и get_partition_key событий на момент миграции: код приложения может измениться позже
+OUTBOX_SHARD_COUNT = 64
+PARTITION_KEY_FIELDS = {
+    'order.created': ('order', 'order_id'),
+    'order.rescheduled': ('order', 'order_id'),
+    'order.cancelled': ('order', 'order_id'),
+    'schedule.created': ('schedule', 'schedule_id'),
+    'user.created': ('user', 'user_id'),
+    'order_payment.payed': ('order_payment', 'order_payment_id'),
+    'order_payment.cancelled': ('order_payment', 'order_payment_id'),
+}
+# сообщения, записанные до реестра событий, хранят путь к классу
+LEGACY_TYPE_NAMES = {
+    'src.logic.events.schedule_events.OrderCreatedEvent': 'order.created',
+    'src.logic.events.schedule_events.OrderRescheduledEvent': 'order.rescheduled',
+    'src.domain.schedules.events.OrderCancelledEvent': 'order.cancelled',
+    'src.domain.schedules.events.ScheduleCreatedEvent': 'schedule.created',
+    'src.logic.events.user_events.UserCreatedEvent': 'user.created',
+    'src.logic.events.order_events.OrderPayedEvent': 'order_payment.payed',
+    'src.logic.events.order_events.OrderPaymentCanceledEvent': 'order_payment.cancelled',
+}
+
+outbox_messages = sa.table(
+    'outbox_messages',
+    sa.column('id', sa.CHAR(length=36)),
+    sa.column('occurred_at', sa.DateTime()),
+    sa.column('type', sa.String()),
+    sa.column('data', sa.JSON()),
+    sa.column('processed_at', sa.DateTime()),
+    sa.column('partition_key', sa.String()),
+    sa.column('shard', sa.SmallInteger()),
+)
+
+
+def get_partition_key(message_type: str, data) -> str | None:
+    name = LEGACY_TYPE_NAMES.get(message_type) or message_type.rsplit('.v', 1)[0]
+    if name not in PARTITION_KEY_FIELDS:
+        return None
+    prefix, field = PARTITION_KEY_FIELDS[name]
+    # событие хранится строкой json внутри колонки json
+    raw = json.loads(data) if isinstance(data, str) else data
+    if raw.get(field) is None:
+        return None
+    return f'{prefix}:{raw[field]}'
+
+
+def backfill_unprocessed_shards() -> None:
+    # неотправленные сообщения получают тот же ключ и шард, что при вставке, иначе все они уйдут релею шарда 0
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(outbox_messages.c.id, outbox_messages.c.occurred_at, outbox_messages.c.type, outbox_messages.c.data)
+        .where(outbox_messages.c.processed_at.is_(None))
+    ).all()
+    if not rows:
+        return
+    params = []
+    for row in rows:
+        partition_key = get_partition_key(row.type, row.data)
+        key = partition_key or row.id
+        params.append(
+            {
+                'message_id': row.id,
+                'message_occurred_at': row.occurred_at,
+                'message_partition_key': partition_key,
+                'message_shard': zlib.crc32(key.encode()) % OUTBOX_SHARD_COUNT,
+            }
+        )
+    query = (
+        outbox_messages.update()
+        .where(
+            outbox_messages.c.id == sa.bindparam('message_id'),
+            outbox_messages.c.occurred_at == sa.bindparam('message_occurred_at'),
+        )
+        .values(partition_key=sa.bindparam('message_partition_key'), shard=sa.bindparam('message_shard'))
+    )
+    connection.execute(query, params)
+
+
+def upgrade() -> None:
+    op.execute('CREATE SEQUENCE outbox_messages_position_seq')
+    op.add_column('outbox_messages', sa.Column('partition_key', sa.String(), nullable=True))
+    op.add_column('outbox_messages', sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+    # существующие строки нумеруются в порядке появления
+    op.add_column('outbox_messages', sa.Column('position', sa.BigInteger(), nullable=True))
+    op.execute(
+        'UPDATE outbox_messages SET position = numbered.position FROM ('
+        "SELECT id, occurred_at, nextval('outbox_messages_position_seq') AS position "
+        'FROM (SELECT id, occurred_at FROM outbox_messages ORDER BY occurred_at, id) AS ordered'
+        ') AS numbered '
+        'WHERE outbox_messages.id = numbered.id AND outbox_messages.occurred_at = numbered.occurred_at'
+    )
+    op.alter_column(
+        'outbox_messages',
+        'position',
+        nullable=False,
+        server_default=sa.text("nextval('outbox_messages_position_seq')"),
+    )
+    backfill_unprocessed_shards()
+    op.drop_index('ix_outbox_messages_unprocessed', table_name='outbox_messages')
+    op.create_index(
+        'ix_outbox_messages_shard_unprocessed',
+        'outbox_messages',
+        ['shard', 'position'],
+        unique=False,
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_messages_shard_unprocessed', table_name='outbox_messages')
+    op.create_index(
+        'ix_outbox_messages_unprocessed',
+        'outbox_messages',
+        ['occurred_at'],
+        unique=False,
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+    op.drop_column('outbox_messages', 'position')
+    op.drop_column('outbox_messages', 'shard')
+    op.drop_column('outbox_messages', 'partition_key')
+    op.execute('DROP SEQUENCE outbox_messages_position_seq')
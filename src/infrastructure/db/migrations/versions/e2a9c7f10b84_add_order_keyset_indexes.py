@@ -0,0 +1,32 @@
+"""add order keyset indexes
+
+Revision ID: e2a9c7f10b84
+Revises: d58f3b2a7e61
+Create Date: 2026-10-17 14:52:36.208117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c7f10b84'
+down_revision: Union[str, None] = 'd58f3b2a7e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_order_date_add_id', 'order', ['date_add', 'id'], unique=False)
+    op.create_index('ix_order_user_date_add_id', 'order', ['user_id', 'date_add', 'id'], unique=False)
+    op.create_index('ix_order_service_date_add_id', 'order', ['service_id', 'date_add', 'id'], unique=False)
+    op.create_index('ix_order_status_date_add_id', 'order', ['status', 'date_add', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_status_date_add_id', table_name='order')
+    op.drop_index('ix_order_service_date_add_id', table_name='order')
+    op.drop_index('ix_order_user_date_add_id', table_name='order')
+    op.drop_index('ix_order_date_add_id', table_name='order')
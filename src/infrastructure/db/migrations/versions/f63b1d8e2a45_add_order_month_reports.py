@@ -0,0 +1,91 @@
+"""add order month reports
+
+Revision ID: f63b1d8e2a45
+Revises: e2a9c7f10b84
+Create Date: 2026-10-17 17:12:40.518361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f63b1d8e2a45'
+down_revision: Union[str, None] = 'e2a9c7f10b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ORDER_EVENT_TYPES = (
+    "'src.logic.events.schedule_events.OrderCreatedEvent', 'src.domain.schedules.events.OrderCancelledEvent'"
+)
+
+
+def upgrade() -> None:
+    op.create_table('master_month_report',
+    sa.Column('year', sa.BigInteger(), nullable=False),
+    sa.Column('month', sa.BigInteger(), nullable=False),
+    sa.Column('master_id', sa.BigInteger(), nullable=False),
+    sa.Column('total_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('total_sum', sa.BigInteger(), server_default='0', nullable=False),
+    sa.CheckConstraint('month >= 1 AND month <= 12', name='check_master_month_report_month'),
+    sa.ForeignKeyConstraint(['master_id'], ['master.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('year', 'month', 'master_id')
+    )
+    op.create_table('service_month_report',
+    sa.Column('year', sa.BigInteger(), nullable=False),
+    sa.Column('month', sa.BigInteger(), nullable=False),
+    sa.Column('service_id', sa.BigInteger(), nullable=False),
+    sa.Column('total_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('total_sum', sa.BigInteger(), server_default='0', nullable=False),
+    sa.CheckConstraint('month >= 1 AND month <= 12', name='check_service_month_report_month'),
+    sa.ForeignKeyConstraint(['service_id'], ['service.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('year', 'month', 'service_id')
+    )
+    op.create_table('order_report_event',
+    sa.Column('event_id', sa.CHAR(length=36), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    # заполняем отчеты по уже существующим заказам
+    op.execute(
+        """
+        INSERT INTO master_month_report (year, month, master_id, total_count, total_sum)
+        SELECT extract(year FROM o.date_add)::int, extract(month FROM o.date_add)::int, sc.master_id,
+               count(*), sum(s.price)
+        FROM "order" o
+        JOIN slot sl ON sl.id = o.slot_id
+        JOIN schedule sc ON sc.id = sl.schedule_id
+        JOIN service s ON s.id = o.service_id
+        WHERE o.status IS NULL OR o.status <> 4
+        GROUP BY 1, 2, 3
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO service_month_report (year, month, service_id, total_count, total_sum)
+        SELECT extract(year FROM o.date_add)::int, extract(month FROM o.date_add)::int, o.service_id,
+               count(*), sum(s.price)
+        FROM "order" o
+        JOIN service s ON s.id = o.service_id
+        WHERE o.status IS NULL OR o.status <> 4
+        GROUP BY 1, 2, 3
+        """
+    )
+    # еще не опубликованные события уже учтены выше, помечаем их обработанными
+    op.execute(
+        f"""
+        INSERT INTO order_report_event (event_id)
+        SELECT (data #>> '{{}}')::json ->> 'event_id'
+        FROM outbox_messages
+        WHERE processed_at IS NULL AND type IN ({ORDER_EVENT_TYPES})
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('order_report_event')
+    op.drop_table('service_month_report')
+    op.drop_table('master_month_report')
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import CheckConstraint, ForeignKey, Integer, String
+from sqlalchemy import BigInteger, CheckConstraint, ForeignKey, Index, Integer, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.domain.base.values import CountNumber, Name, PositiveIntNumber
@@ -15,6 +15,8 @@ if TYPE_CHECKING:
 
 
 POINT_AFTER_ORDER = 50
+# ревизия растет при каждой записи оплаты, по ней отчеты по выручке догружают только изменения
+ORDER_PAYMENT_REVISION_SEQ = "order_payment_revision_seq"
 
 
 class PromotionToService(Base):
@@ -98,6 +100,13 @@ class OrderPayment(Base[entities.OrderPayment]):
     point_uses: Mapped[int] = mapped_column(Integer, default=0)
     promotion_sale: Mapped[int] = mapped_column(Integer, default=0)
     is_payed: Mapped[bool] = mapped_column(server_default="f", default=False)
+    promotion_id: Mapped[int | None] = mapped_column(ForeignKey("promotion.id", ondelete="SET NULL"), nullable=True)
+    payed_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    revision: Mapped[int] = mapped_column(
+        BigInteger,
+        server_default=text(f"nextval('{ORDER_PAYMENT_REVISION_SEQ}')"),
+        onupdate=func.nextval(ORDER_PAYMENT_REVISION_SEQ),
+    )
 
     # order: Mapped["Order"] = relationship()
 
@@ -105,6 +114,7 @@ class OrderPayment(Base[entities.OrderPayment]):
         CheckConstraint("point_uses >= 0", name="check_point_uses_positive"),
         CheckConstraint("promotion_sale >= 0", name="check_promotion_sale_positive"),
         CheckConstraint("total_amount > 0", name="check_total_amount_positive"),
+        Index("ix_order_payment_revision", "revision"),
     )
 
     def to_domain(self) -> entities.OrderPayment:
@@ -114,6 +124,8 @@ class OrderPayment(Base[entities.OrderPayment]):
             total_amount=PositiveIntNumber(self.total_amount),
             is_payed=self.is_payed,
             order_id=self.order_id,
+            promotion_id=self.promotion_id,
+            payed_at=self.payed_at,
         )
         order_payment.id = self.id
         return order_payment
@@ -127,4 +139,44 @@ class OrderPayment(Base[entities.OrderPayment]):
             promotion_sale=entity.promotion_sale.as_generic_type(),
             is_payed=entity.is_payed,
             order_id=entity.order_id,
+            promotion_id=entity.promotion_id,
+            payed_at=entity.payed_at,
         )
+
+
+class RevenueReport(Base):
+    __tablename__ = "revenue_report"
+
+    dimension: Mapped[str] = mapped_column(String(15), primary_key=True)
+    key_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    year: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[int] = mapped_column(primary_key=True)
+    payments_count: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    total_amount: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    point_uses: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    promotion_sale: Mapped[int] = mapped_column(BigInteger, server_default="0")
+
+
+# вклад оплаты, уже учтенный в revenue_report: при изменении оплаты из отчета вычитается именно он
+class RevenueReportPayment(Base):
+    __tablename__ = "revenue_report_payment"
+
+    order_payment_id: Mapped[int] = mapped_column(
+        ForeignKey("order_payment.id", ondelete="CASCADE"), primary_key=True
+    )
+    master_id: Mapped[int] = mapped_column(BigInteger)
+    service_id: Mapped[int] = mapped_column(BigInteger)
+    promotion_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    year: Mapped[int]
+    month: Mapped[int]
+    total_amount: Mapped[int] = mapped_column(Integer)
+    point_uses: Mapped[int] = mapped_column(Integer)
+    promotion_sale: Mapped[int] = mapped_column(Integer)
+
+
+class ReportWatermark(Base):
+    __tablename__ = "report_watermark"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
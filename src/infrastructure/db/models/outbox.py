@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Self
 
-from sqlalchemy import CHAR, JSON, DateTime
+from sqlalchemy import CHAR, JSON, BigInteger, DateTime, Index, SmallInteger, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.domain.outbox import entities
@@ -11,14 +11,32 @@ from src.domain.outbox.values import MessageType
 from src.infrastructure.db.models.base import Base
 
 
+OUTBOX_POSITION_SEQ = "outbox_messages_position_seq"
+
+
 class OutboxMessage(Base):
     __tablename__ = "outbox_messages"
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
-    occurred_at: Mapped[datetime]
+    # ключ партиционирования обязан входить в первичный ключ
+    occurred_at: Mapped[datetime] = mapped_column(primary_key=True)
     type: Mapped[str]
     data: Mapped[dict[str, Any]] = mapped_column(JSON)
     processed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    partition_key: Mapped[str | None] = mapped_column(String, nullable=True)
+    shard: Mapped[int] = mapped_column(SmallInteger, server_default="0")
+    # порядок вставки, по нему доставляются события одного ключа
+    position: Mapped[int] = mapped_column(BigInteger, server_default=text(f"nextval('{OUTBOX_POSITION_SEQ}')"))
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_messages_shard_unprocessed",
+            "shard",
+            "position",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
 
     @classmethod
     def from_entity(cls, entity: entities.OutboxMessage) -> Self:
@@ -28,6 +46,7 @@ class OutboxMessage(Base):
             data=entity.data,
             occurred_at=entity.occurred_at,
             processed_at=entity.processed_at,
+            partition_key=entity.partition_key,
         )
 
     def to_domain(self) -> entities.OutboxMessage:
@@ -37,6 +56,7 @@ class OutboxMessage(Base):
             processed_at=self.processed_at,
             type=MessageType(self.type),
             data=self.data,
+            partition_key=self.partition_key,
         )
 
     def __str__(self) -> str:
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date, datetime, time
 from typing import TYPE_CHECKING
 
-from sqlalchemy import CheckConstraint, Column, ForeignKey, String, UniqueConstraint
+from sqlalchemy import CHAR, CheckConstraint, Column, ForeignKey, Index, String, UniqueConstraint, func, text
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy_file import ImageField
@@ -11,7 +11,7 @@ from sqlalchemy_file import ImageField
 from src.domain.base.values import Name, PositiveIntNumber
 from src.domain.schedules import entities
 from src.domain.schedules.entities import OrderStatus
-from src.domain.schedules.values import SlotTime
+from src.domain.schedules.values import SlotGrid, SlotTime
 from src.infrastructure.db.models.base import Base, int_pk, str_255
 
 if TYPE_CHECKING:
@@ -173,6 +173,8 @@ class ServiceToMaster(Base):
         primary_key=True,
     )
 
+    __table_args__ = (Index("ix_service_to_master_service_master", "service_id", "master_id"),)
+
 
 class Schedule(Base):
     __tablename__ = "schedule"
@@ -184,7 +186,10 @@ class Schedule(Base):
     slots: Mapped[list["Slot"]] = relationship(back_populates="schedule")
     master: Mapped["Master"] = relationship(back_populates="schedules")
 
-    __table_args__ = (UniqueConstraint("day", "master_id"),)
+    __table_args__ = (
+        UniqueConstraint("day", "master_id"),
+        Index("ix_schedule_master_day", "master_id", "day"),
+    )
 
     def to_domain(self) -> entities.Schedule:
         slots = [slot.to_domain() for slot in self.slots]
@@ -205,6 +210,44 @@ class Schedule(Base):
         )
 
 
+class ScheduleTemplate(Base):
+    __tablename__ = "schedule_template"
+
+    id: Mapped[int_pk]
+    master_id: Mapped[int] = mapped_column(ForeignKey("master.id", ondelete="CASCADE"))
+    weekday: Mapped[int]
+    start_hour: Mapped[int]
+    end_hour: Mapped[int]
+    slot_delta: Mapped[int]
+
+    __table_args__ = (
+        UniqueConstraint("master_id", "weekday"),
+        CheckConstraint("weekday >= 0 AND weekday < 7", name="check_template_weekday"),
+        CheckConstraint("start_hour >= 0 AND start_hour <= end_hour AND end_hour < 24", name="check_template_hours"),
+        CheckConstraint("slot_delta > 0", name="check_template_slot_delta_positive"),
+    )
+
+    def to_domain(self) -> entities.ScheduleTemplate:
+        template = entities.ScheduleTemplate(
+            master_id=self.master_id,
+            weekday=self.weekday,
+            grid=SlotGrid(start_hour=self.start_hour, end_hour=self.end_hour, slot_delta=self.slot_delta),
+        )
+        template.id = self.id
+        return template
+
+    @classmethod
+    def from_entity(cls, entity: entities.ScheduleTemplate) -> ScheduleTemplate:
+        return cls(
+            id=getattr(entity, "id", None),
+            master_id=entity.master_id,
+            weekday=entity.weekday,
+            start_hour=entity.grid.start_hour,
+            end_hour=entity.grid.end_hour,
+            slot_delta=entity.grid.slot_delta,
+        )
+
+
 class Slot(Base):
     __tablename__ = "slot"
 
@@ -212,11 +255,15 @@ class Slot(Base):
     time_start: Mapped[time]
     time_end: Mapped[time] = mapped_column(nullable=True)
     schedule_id: Mapped[int] = mapped_column(ForeignKey("schedule.id", ondelete="CASCADE"))
+    is_occupied: Mapped[bool] = mapped_column(server_default="f", default=False)
 
     schedule: Mapped["Schedule"] = relationship(back_populates="slots")
     orders: Mapped[list["Order"]] = relationship(back_populates="slot")
 
-    __table_args__ = (UniqueConstraint("schedule_id", "time_start"),)
+    __table_args__ = (
+        UniqueConstraint("schedule_id", "time_start"),
+        Index("ix_slot_schedule_free", "schedule_id", "time_start", postgresql_where=text("NOT is_occupied")),
+    )
 
     def to_domain(self) -> entities.Slot:
         slot = entities.Slot(
@@ -252,6 +299,18 @@ class Order(Base):
     service: Mapped["Service"] = relationship(back_populates="orders")
     user: Mapped["Users"] = relationship()
 
+    __table_args__ = (
+        Index(
+            "uq_order_active_slot",
+            "slot_id",
+            unique=True,
+            postgresql_where=text(f"status IS NULL OR status <> {OrderStatus.CANCELLED.value}"),
+        ),
+        Index("ix_order_date_add_id", "date_add", "id"),
+        Index("ix_order_user_date_add_id", "user_id", "date_add", "id"),
+        Index("ix_order_service_date_add_id", "service_id", "date_add", "id"),
+        Index("ix_order_status_date_add_id", "status", "date_add", "id"),
+    )
 
     @hybrid_property
     def photo_before_path(self):
@@ -288,3 +347,34 @@ class Order(Base):
             photo_after=entity.photo_after_path,
             status=entity.status.value,
         )
+
+
+class MasterMonthReport(Base):
+    __tablename__ = "master_month_report"
+
+    year: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[int] = mapped_column(primary_key=True)
+    master_id: Mapped[int] = mapped_column(ForeignKey("master.id", ondelete="CASCADE"), primary_key=True)
+    total_count: Mapped[int] = mapped_column(server_default="0")
+    total_sum: Mapped[int] = mapped_column(server_default="0")
+
+    __table_args__ = (CheckConstraint("month >= 1 AND month <= 12", name="check_master_month_report_month"),)
+
+
+class ServiceMonthReport(Base):
+    __tablename__ = "service_month_report"
+
+    year: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[int] = mapped_column(primary_key=True)
+    service_id: Mapped[int] = mapped_column(ForeignKey("service.id", ondelete="CASCADE"), primary_key=True)
+    total_count: Mapped[int] = mapped_column(server_default="0")
+    total_sum: Mapped[int] = mapped_column(server_default="0")
+
+    __table_args__ = (CheckConstraint("month >= 1 AND month <= 12", name="check_service_month_report_month"),)
+
+
+class OrderReportEvent(Base):
+    __tablename__ = "order_report_event"
+
+    event_id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    processed_at: Mapped[datetime] = mapped_column(server_default=func.now())
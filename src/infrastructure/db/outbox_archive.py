@@ -0,0 +1,33 @@
+import gzip
+import os
+
+from pathlib import Path
+
+import orjson
+
+
+class OutboxArchive:
+    """Архив партиций outbox: по файлу NDJSON, сжатому gzip, на партицию"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def get_path(self, partition_name: str) -> Path:
+        return self.directory / f"{partition_name}.ndjson.gz"
+
+    def open(self, partition_name: str) -> gzip.GzipFile:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return gzip.open(self._get_tmp_path(partition_name), "wb")
+
+    @staticmethod
+    def write(file: gzip.GzipFile, rows: list[dict]) -> None:
+        file.write(b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows))
+
+    def commit(self, partition_name: str) -> Path:
+        # файл появляется под итоговым именем только целиком записанным
+        path = self.get_path(partition_name)
+        os.replace(self._get_tmp_path(partition_name), path)
+        return path
+
+    def _get_tmp_path(self, partition_name: str) -> Path:
+        return self.directory / f"{partition_name}.ndjson.gz.tmp"
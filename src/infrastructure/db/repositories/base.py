@@ -1,7 +1,8 @@
 from abc import ABC
+from collections.abc import AsyncIterator
 from typing import Generic, Type
 
-from sqlalchemy import delete, select
+from sqlalchemy import Select, delete, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -15,12 +16,22 @@ class BaseRepository(ABC): ...
 class BaseQueryRepository(ABC): ...
 
 
+STREAM_PARTITION_SIZE = 1000
+
+
 class GenericSQLAlchemyQueryRepository(Generic[T], BaseQueryRepository):
     model: Type[T]
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def stream_mappings(
+        self, query: Select, partition_size: int = STREAM_PARTITION_SIZE
+    ) -> AsyncIterator[list[dict]]:
+        result = await self.session.stream(query.execution_options(yield_per=partition_size))
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
 
 class GenericSQLAlchemyRepository(Generic[T, E], BaseRepository):
     model: Type[T]
@@ -1,17 +1,70 @@
-from sqlalchemy import select
+from collections.abc import Iterable
+from dataclasses import asdict
+
+from sqlalchemy import Integer, cast, delete, extract, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
 from src.domain.orders import entities
 from src.infrastructure.db.exceptions import InsertException
-from src.infrastructure.db.models.orders import OrderPayment, Promotion, PromotionToService, UserPoint
-from src.infrastructure.db.repositories.base import GenericSQLAlchemyQueryRepository, GenericSQLAlchemyRepository
+from src.infrastructure.db.models.orders import (
+    OrderPayment,
+    Promotion,
+    PromotionToService,
+    ReportWatermark,
+    RevenueReport,
+    RevenueReportPayment,
+    UserPoint,
+)
+from src.infrastructure.db.models.schedules import Order, Schedule, Slot
+from src.infrastructure.db.repositories.base import (
+    BaseRepository,
+    GenericSQLAlchemyQueryRepository,
+    GenericSQLAlchemyRepository,
+)
 from src.logic.dto.mappers.order_mappers import (
     order_payment_detail_dto_mapper,
     promotion_to_detail_dto_mapper,
+    revenue_report_dto_mapper,
     user_point_dto_mapper,
 )
-from src.logic.dto.order_dto import OrderPaymentDetailDTO, PromotionDetailDTO, UserPointDTO
+from src.logic.dto.order_dto import (
+    OrderPaymentDetailDTO,
+    PromotionDetailDTO,
+    RevenueDimension,
+    RevenuePaymentDTO,
+    RevenueReportDTO,
+    UserPointDTO,
+)
+
+REVENUE_PAYMENT_COLUMNS = ("master_id", "service_id", "promotion_id", "year", "month")
+REVENUE_AMOUNT_COLUMNS = ("total_amount", "point_uses", "promotion_sale")
+
+
+def get_changed_payments_query(after_revision: int, limit: int):
+    return (
+        select(
+            OrderPayment.id,
+            Schedule.master_id,
+            Order.service_id,
+            OrderPayment.promotion_id,
+            cast(extract("year", OrderPayment.payed_at), Integer).label("year"),
+            cast(extract("month", OrderPayment.payed_at), Integer).label("month"),
+            OrderPayment.total_amount,
+            OrderPayment.point_uses,
+            OrderPayment.promotion_sale,
+            OrderPayment.is_payed,
+            OrderPayment.revision,
+        )
+        .join(Order, Order.id == OrderPayment.order_id)
+        .join(Slot, Slot.id == Order.slot_id)
+        .join(Schedule, Schedule.id == Slot.schedule_id)
+        .where(OrderPayment.revision > after_revision)
+        .order_by(OrderPayment.revision)
+        .limit(limit)
+    )
 
 
 class PromotionRepository(GenericSQLAlchemyRepository[Promotion, entities.Promotion]):
@@ -62,6 +115,62 @@ class OrderPaymentRepository(GenericSQLAlchemyRepository[OrderPayment, entities.
     model = OrderPayment
 
 
+class RevenueReportRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def lock_watermark(self, name: str) -> int:
+        # блокировка строки не дает двум запускам задачи учесть одни и те же оплаты
+        await self.session.execute(insert(ReportWatermark).values(name=name).on_conflict_do_nothing())
+        query = select(ReportWatermark.value).where(ReportWatermark.name == name).with_for_update()
+        return (await self.session.execute(query)).scalar_one()
+
+    async def set_watermark(self, name: str, value: int) -> None:
+        await self.session.execute(update(ReportWatermark).where(ReportWatermark.name == name).values(value=value))
+
+    async def find_changed_payments(self, after_revision: int, limit: int) -> list[RevenuePaymentDTO]:
+        result = await self.session.execute(get_changed_payments_query(after_revision=after_revision, limit=limit))
+        return [RevenuePaymentDTO(**row) for row in result.mappings()]
+
+    async def find_applied_payments(self, ids: Iterable[int]) -> list[RevenuePaymentDTO]:
+        query = select(
+            RevenueReportPayment.order_payment_id.label("id"),
+            *[getattr(RevenueReportPayment, column) for column in REVENUE_PAYMENT_COLUMNS + REVENUE_AMOUNT_COLUMNS],
+        ).where(RevenueReportPayment.order_payment_id.in_(list(ids)))
+        result = await self.session.execute(query)
+        return [RevenuePaymentDTO(**row) for row in result.mappings()]
+
+    async def apply(
+        self, deltas: list[RevenueReportDTO], payed: list[RevenuePaymentDTO], unpayed_ids: list[int]
+    ) -> None:
+        if deltas:
+            query = insert(RevenueReport).values([asdict(delta) for delta in deltas])
+            query = query.on_conflict_do_update(
+                index_elements=["dimension", "key_id", "year", "month"],
+                set_={
+                    column: getattr(RevenueReport, column) + getattr(query.excluded, column)
+                    for column in ("payments_count", *REVENUE_AMOUNT_COLUMNS)
+                },
+            )
+            await self.session.execute(query)
+        if unpayed_ids:
+            await self.session.execute(
+                delete(RevenueReportPayment).where(RevenueReportPayment.order_payment_id.in_(unpayed_ids))
+            )
+        if payed:
+            columns = REVENUE_PAYMENT_COLUMNS + REVENUE_AMOUNT_COLUMNS
+            values = [
+                {"order_payment_id": payment.id, **{column: getattr(payment, column) for column in columns}}
+                for payment in payed
+            ]
+            query = insert(RevenueReportPayment).values(values)
+            query = query.on_conflict_do_update(
+                index_elements=["order_payment_id"],
+                set_={column: getattr(query.excluded, column) for column in columns},
+            )
+            await self.session.execute(query)
+
+
 class PromotionQueryRepository(GenericSQLAlchemyQueryRepository[Promotion]):
     async def find_all(self, **filter_by) -> list[PromotionDetailDTO]:
         query = select(Promotion).options(selectinload(Promotion.services)).filter_by(**filter_by)
@@ -83,3 +192,20 @@ class OrderPaymentQueryRepository(GenericSQLAlchemyQueryRepository[OrderPayment]
         result = await self.session.execute(query)
         scalar = result.scalar_one_or_none()
         return order_payment_detail_dto_mapper(scalar) if scalar else None
+
+
+class RevenueReportQueryRepository(GenericSQLAlchemyQueryRepository[RevenueReport]):
+    async def find_all(
+        self, dimension: RevenueDimension, year: int | None = None, month: int | None = None
+    ) -> list[RevenueReportDTO]:
+        query = (
+            select(RevenueReport)
+            .where(RevenueReport.dimension == dimension)
+            .order_by(RevenueReport.year, RevenueReport.month, RevenueReport.key_id)
+        )
+        if year:
+            query = query.where(RevenueReport.year == year)
+        if month:
+            query = query.where(RevenueReport.month == month)
+        result = await self.session.execute(query)
+        return [revenue_report_dto_mapper(el) for el in result.scalars().all()]
@@ -1,63 +1,264 @@
-import asyncpg
+import re
+import zlib
 
-from sqlalchemy import null, select
+from collections.abc import AsyncIterator, Collection, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Self
+from uuid import UUID
+
+from sqlalchemy import CHAR, SmallInteger, any_, bindparam, func, insert, null, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
 from src.domain.outbox import entities
 from src.domain.outbox.values import MessageType
-from src.infrastructure.db.exceptions import InsertException, UpdateException
+from src.infrastructure.db.exceptions import InsertException
 from src.infrastructure.db.models.outbox import OutboxMessage
-from src.infrastructure.db.repositories.base import GenericSQLAlchemyRepository
+from src.infrastructure.db.repositories.base import (
+    STREAM_PARTITION_SIZE,
+    BaseRepository,
+    GenericSQLAlchemyRepository,
+)
 from src.infrastructure.logger_adapter.logger import init_logger
 
 logger = init_logger(__name__)
 
+OUTBOX_CHANNEL = "outbox_new"
+OUTBOX_BATCH_SIZE = 10
+# 7 колонок на строку, держимся далеко от лимита параметров запроса postgres
+OUTBOX_INSERT_CHUNK_SIZE = 1000
+# число шардов общее для писателей и релеев, изменение перемешивает ключи между шардами
+OUTBOX_SHARD_COUNT = 64
+# пространства ключей advisory locks релеев: членство и владение шардами
+OUTBOX_RELAY_LOCK_CLASS = 7301
+OUTBOX_SHARD_LOCK_CLASS = 7302
+
+OUTBOX_TABLE = OutboxMessage.__tablename__
+OUTBOX_PARTITION_PREFIX = f"{OUTBOX_TABLE}_p"
+OUTBOX_PARTITION_PATTERN = re.compile(rf"^{OUTBOX_PARTITION_PREFIX}(\d{{8}})$")
+OUTBOX_DEFAULT_PARTITION = f"{OUTBOX_TABLE}_default"
+
+
+def dump_event(event: BaseEvent) -> str:
+    return event_registry.encode(event).decode()
+
+
+def get_message_type(event: BaseEvent) -> MessageType:
+    return MessageType(event_registry.get_type_name(event))
+
+
+def get_shard(message: entities.OutboxMessage) -> int:
+    # сообщения без ключа порядка не требуют и раскладываются по шардам по своему id
+    key = message.partition_key or str(message.id)
+    return zlib.crc32(key.encode()) % OUTBOX_SHARD_COUNT
+
 
 class OutboxMessageRepository(GenericSQLAlchemyRepository[OutboxMessage, entities.OutboxMessage]):
     model = OutboxMessage
 
-    async def bulk_add(self, events: list[BaseEvent]) -> list[entities.OutboxMessage]:
-        results = []
-        for event in events:
-            result = await self.add_from_event(event)
-            results.append(result)
-        return results
+    async def bulk_add(self, events: Sequence[BaseEvent]) -> list[entities.OutboxMessage]:
+        if not events:
+            return []
+        messages = [
+            entities.OutboxMessage(
+                type=get_message_type(event), data=dump_event(event), partition_key=event.get_partition_key()
+            )
+            for event in events
+        ]
+        rows = [
+            {
+                "id": str(message.id),
+                "occurred_at": message.occurred_at,
+                "type": message.type.as_generic_type(),
+                "data": message.data,
+                "processed_at": None,
+                "partition_key": message.partition_key,
+                "shard": get_shard(message),
+            }
+            for message in messages
+        ]
+        for start in range(0, len(rows), OUTBOX_INSERT_CHUNK_SIZE):
+            try:
+                await self.session.execute(insert(OutboxMessage).values(rows[start : start + OUTBOX_INSERT_CHUNK_SIZE]))
+            except IntegrityError as err:
+                raise InsertException(entity=messages[start], detail=str(err.args))
+        logger.debug(f"{self.__class__.__name__}: added {len(messages)} messages")
+        # уведомление уйдет подписчикам только после коммита, одинаковые уведомления транзакции postgres схлопывает
+        await self.session.execute(select(func.pg_notify(OUTBOX_CHANNEL, "")))
+        return messages
 
     async def add_from_event(self, event: BaseEvent) -> entities.OutboxMessage:
-        data = event.to_json()
-        logger.debug(f"data: {data}")
-        entity = entities.OutboxMessage(
-            type=MessageType(f"{type(event).__module__}.{type(event).__name__}"),
-            data=data,
-        )
-        model = self.model.from_entity(entity)
-        logger.debug(f"model: {model}")
-        self.session.add(model)
-        try:
-            await self.session.flush()
-        except IntegrityError as err:
-            raise InsertException(entity=entity, detail=str(err.args))
-        return model.to_domain()
-
-    async def get_messages_to_publish(self) -> list[entities.OutboxMessage]:
+        messages = await self.bulk_add([event])
+        return messages[0]
+
+    async def get_messages_to_publish(
+        self,
+        limit: int = OUTBOX_BATCH_SIZE,
+        shards: Collection[int] | None = None,
+        occurred_before: datetime | None = None,
+    ) -> list[entities.OutboxMessage]:
+        """
+        Сообщения в порядке вставки.
+
+        shards ограничивает выборку шардами, которыми владеет релей, occurred_before оставляет свежие сообщения
+        быстрому пути публикации.
+        """
+        if shards is not None and not shards:
+            return []
+        # строки, захваченные другим процессором, пропускаются, поэтому процессоры разбирают outbox параллельно
         query = (
             select(OutboxMessage)
             .where(OutboxMessage.processed_at == null())
-            .order_by(OutboxMessage.occurred_at)
-            .with_for_update(nowait=True)
-            .limit(10)
+            .order_by(OutboxMessage.position)
+            .with_for_update(skip_locked=True)
+            .limit(limit)
         )
-        try:
-            result = await self.session.execute(query)
-        except asyncpg.exceptions.LockNotAvailableError:
-            return []
+        if shards is not None:
+            shards_param = bindparam("shards", list(shards), type_=ARRAY(SmallInteger))
+            query = query.where(OutboxMessage.shard == any_(shards_param))
+        if occurred_before is not None:
+            query = query.where(OutboxMessage.occurred_at < occurred_before)
+        result = await self.session.execute(query)
         return [el.to_domain() for el in result.scalars().all()]
 
-    async def mark_as_published(self, entity: entities.OutboxMessage) -> None:
-        model = self.model.from_entity(entity)
-        await self.session.merge(model)
-        try:
-            await self.session.flush()
-        except IntegrityError as err:
-            raise UpdateException(entity=entity, detail=str(err.args))
+    async def find_pending_keys(self, messages: Sequence[entities.OutboxMessage]) -> set[str]:
+        """Ключи порядка переданных сообщений, по которым в outbox есть другие неотправленные сообщения"""
+        keyed = [message for message in messages if message.partition_key is not None]
+        if not keyed:
+            return set()
+        # условие по шарду ведет запрос по частичному индексу неотправленных сообщений
+        query = (
+            select(OutboxMessage.partition_key)
+            .distinct()
+            .where(
+                OutboxMessage.processed_at == null(),
+                OutboxMessage.shard.in_({get_shard(message) for message in keyed}),
+                OutboxMessage.partition_key.in_({message.partition_key for message in keyed}),
+                OutboxMessage.id.not_in([str(message.id) for message in keyed]),
+            )
+        )
+        result = await self.session.execute(query)
+        return set(result.scalars().all())
+
+    async def get_lag(self) -> tuple[int, datetime | None]:
+        """Число необработанных сообщений и occurred_at самого старого из них"""
+        query = select(func.count(), func.min(OutboxMessage.occurred_at)).where(OutboxMessage.processed_at == null())
+        result = await self.session.execute(query)
+        count, oldest = result.one()
+        return count, oldest
+
+    async def mark_as_published(self, ids: Iterable[UUID | str], processed_at: datetime | None = None) -> None:
+        ids = [str(message_id) for message_id in ids]
+        if not ids:
+            return
+        query = (
+            update(OutboxMessage)
+            .where(OutboxMessage.id == any_(bindparam("ids", ids, type_=ARRAY(CHAR(36)))))
+            .values(processed_at=processed_at or datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(query)
+
+
+@dataclass(frozen=True)
+class OutboxPartition:
+    name: str
+    week_start: date
+
+    @property
+    def week_end(self) -> date:
+        return self.week_start + timedelta(days=7)
+
+    @classmethod
+    def for_week(cls, day: date) -> Self:
+        week_start = day - timedelta(days=day.weekday())
+        return cls(name=f"{OUTBOX_PARTITION_PREFIX}{week_start:%Y%m%d}", week_start=week_start)
+
+    @classmethod
+    def from_name(cls, name: str) -> Self | None:
+        match = OUTBOX_PARTITION_PATTERN.match(name)
+        if not match:
+            return None
+        return cls(name=name, week_start=datetime.strptime(match.group(1), "%Y%m%d").date())
+
+
+class OutboxPartitionRepository(BaseRepository):
+    """Недельные партиции outbox_messages по occurred_at, имена партиций формируются только из дат"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_partitions(self, partitions: Iterable[OutboxPartition]) -> None:
+        for partition in partitions:
+            if await self._exists(partition):
+                continue
+            await self._create_partition(partition)
+
+    async def _exists(self, partition: OutboxPartition) -> bool:
+        result = await self.session.execute(select(func.to_regclass(partition.name)))
+        return result.scalar_one() is not None
+
+    async def _create_partition(self, partition: OutboxPartition) -> None:
+        # строки недели, попавшие в default, мешают создать партицию (postgres отказывает из-за пересечения),
+        # поэтому партиция создается отдельной таблицей, забирает их из default и только потом подключается;
+        # блокировка default не дает вставить в него новые строки недели до подключения
+        columns = ", ".join(column.name for column in OutboxMessage.__table__.columns)
+        week_start, week_end = partition.week_start.isoformat(), partition.week_end.isoformat()
+        await self.session.execute(text(f"LOCK TABLE {OUTBOX_DEFAULT_PARTITION} IN SHARE ROW EXCLUSIVE MODE"))
+        await self.session.execute(
+            text(f"CREATE TABLE {partition.name} (LIKE {OUTBOX_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        )
+        await self.session.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {OUTBOX_DEFAULT_PARTITION} "
+                f"WHERE occurred_at >= '{week_start}' AND occurred_at < '{week_end}' RETURNING {columns}) "
+                f"INSERT INTO {partition.name} ({columns}) SELECT {columns} FROM moved"
+            )
+        )
+        await self.session.execute(
+            text(
+                f"ALTER TABLE {OUTBOX_TABLE} ATTACH PARTITION {partition.name} "
+                f"FOR VALUES FROM ('{week_start}') TO ('{week_end}')"
+            )
+        )
+
+    async def find_default_weeks(self) -> list[date]:
+        """Недели сообщений, попавших в default-партицию, когда для их недели не было партиции"""
+        query = text(f"SELECT DISTINCT CAST(date_trunc('week', occurred_at) AS date) FROM {OUTBOX_DEFAULT_PARTITION}")
+        result = await self.session.execute(query)
+        return sorted(result.scalars().all())
+
+    async def find_partitions(self) -> list[OutboxPartition]:
+        query = text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+        )
+        result = await self.session.execute(query, {"parent": OUTBOX_TABLE})
+        partitions = [OutboxPartition.from_name(name) for name in result.scalars().all()]
+        return sorted((partition for partition in partitions if partition), key=lambda partition: partition.week_start)
+
+    async def has_unprocessed(self, partition: OutboxPartition) -> bool:
+        query = text(f"SELECT EXISTS (SELECT 1 FROM {partition.name} WHERE processed_at IS NULL)")
+        result = await self.session.execute(query)
+        return result.scalar_one()
+
+    async def stream_rows(
+        self, partition: OutboxPartition, partition_size: int = STREAM_PARTITION_SIZE
+    ) -> AsyncIterator[list[dict]]:
+        query = text(
+            f"SELECT id, occurred_at, type, data, processed_at, partition_key FROM {partition.name} ORDER BY position"
+        )
+        result = await self.session.stream(query.execution_options(yield_per=partition_size))
+        async for rows in result.mappings().partitions():
+            yield [dict(row) for row in rows]
+
+    async def detach(self, partition: OutboxPartition) -> None:
+        await self.session.execute(text(f"ALTER TABLE {OUTBOX_TABLE} DETACH PARTITION {partition.name}"))
+
+    async def drop(self, partition: OutboxPartition) -> None:
+        await self.session.execute(text(f"DROP TABLE {partition.name}"))
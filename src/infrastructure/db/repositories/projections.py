@@ -0,0 +1,142 @@
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.infrastructure.db.models.schedules import Master, Order, Schedule, Service, ServiceToMaster, Slot
+from src.infrastructure.db.models.users import Users
+from src.logic.dto.schedule_dto import (
+    MasterDetailDTO,
+    OrderDetailDTO,
+    ScheduleDetailDTO,
+    ServiceDTO,
+    SlotDetailDTO,
+)
+from src.logic.dto.user_dto import UserDetailDTO
+
+# Колонки перечислены в порядке полей DTO, поэтому строка результата раскладывается срезом без обращения по имени
+
+MasterUser = aliased(Users, name="master_user")
+
+SERVICE_COLUMNS = (Service.id, Service.name, Service.description, Service.price)
+
+
+def get_user_columns(user=Users) -> tuple:
+    return (
+        user.id,
+        user.email,
+        user.first_name,
+        user.last_name,
+        user.telephone,
+        user.is_superuser,
+        user.date_birthday,
+    )
+
+
+USER_COLUMNS = get_user_columns()
+MASTER_USER_COLUMNS = get_user_columns(MasterUser)
+MASTER_COLUMNS = (Master.id, Master.description, *MASTER_USER_COLUMNS)
+SCHEDULE_COLUMNS = (Schedule.id, Schedule.day, *MASTER_COLUMNS)
+ORDER_COLUMNS = (
+    Order.id,
+    Order.date_add,
+    Order.photo_before,
+    Order.photo_after,
+    *SERVICE_COLUMNS,
+    *USER_COLUMNS,
+    Slot.id,
+    Slot.time_start,
+    *SCHEDULE_COLUMNS,
+)
+
+SERVICE_WIDTH = len(SERVICE_COLUMNS)
+USER_WIDTH = len(USER_COLUMNS)
+MASTER_WIDTH = len(MASTER_COLUMNS)
+
+
+def get_media_path(file) -> str | None:
+    if file:
+        return "media/" + file.get("path", "")
+    return None
+
+
+def service_from_row(row: Sequence, start: int = 0) -> ServiceDTO:
+    return ServiceDTO(*row[start : start + SERVICE_WIDTH])
+
+
+def user_from_row(row: Sequence, start: int = 0) -> UserDetailDTO:
+    return UserDetailDTO(*row[start : start + USER_WIDTH])
+
+
+def master_from_row(row: Sequence, services: dict[int, list[ServiceDTO]], start: int = 0) -> MasterDetailDTO:
+    master_id = row[start]
+    return MasterDetailDTO(
+        id=master_id,
+        description=row[start + 1],
+        user=user_from_row(row, start + 2),
+        services=services.get(master_id, []),
+    )
+
+
+def schedule_from_row(row: Sequence, services: dict[int, list[ServiceDTO]], start: int = 0) -> ScheduleDetailDTO:
+    return ScheduleDetailDTO(id=row[start], day=row[start + 1], master=master_from_row(row, services, start + 2))
+
+
+def order_from_row(row: Row, services: dict[int, list[ServiceDTO]]) -> OrderDetailDTO:
+    slot_start = 4 + SERVICE_WIDTH + USER_WIDTH
+    return OrderDetailDTO(
+        id=row[0],
+        date_add=row[1],
+        service=service_from_row(row, 4),
+        user=user_from_row(row, 4 + SERVICE_WIDTH),
+        slot=SlotDetailDTO(
+            id=row[slot_start],
+            time_start=row[slot_start + 1],
+            schedule=schedule_from_row(row, services, slot_start + 2),
+        ),
+        photo_before_path=get_media_path(row[2]),
+        photo_after_path=get_media_path(row[3]),
+    )
+
+
+def get_masters_projection_query():
+    return select(*MASTER_COLUMNS).join(MasterUser, MasterUser.id == Master.user_id)
+
+
+def get_schedules_projection_query():
+    return (
+        select(*SCHEDULE_COLUMNS)
+        .join(Master, Master.id == Schedule.master_id)
+        .join(MasterUser, MasterUser.id == Master.user_id)
+    )
+
+
+def get_orders_projection_query():
+    return (
+        select(*ORDER_COLUMNS)
+        .join(Service, Service.id == Order.service_id)
+        .join(Users, Users.id == Order.user_id)
+        .join(Slot, Slot.id == Order.slot_id)
+        .join(Schedule, Schedule.id == Slot.schedule_id)
+        .join(Master, Master.id == Schedule.master_id)
+        .join(MasterUser, MasterUser.id == Master.user_id)
+    )
+
+
+async def find_services_by_masters(session: AsyncSession, master_ids: Iterable[int]) -> dict[int, list[ServiceDTO]]:
+    master_ids = set(master_ids)
+    if not master_ids:
+        return {}
+    query = (
+        select(ServiceToMaster.master_id, *SERVICE_COLUMNS)
+        .join(Service, Service.id == ServiceToMaster.service_id)
+        .where(ServiceToMaster.master_id.in_(master_ids))
+        .order_by(ServiceToMaster.master_id, Service.id)
+    )
+    result = await session.execute(query)
+    services = defaultdict(list)
+    for row in result:
+        services[row[0]].append(service_from_row(row, 1))
+    return services
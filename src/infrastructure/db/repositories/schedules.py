@@ -1,7 +1,26 @@
-from datetime import date
-
-from sqlalchemy import and_, extract, func, null, or_, select
+from collections.abc import AsyncIterator
+from datetime import date, datetime, time, timedelta
+from uuid import UUID
+
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    cast,
+    exists,
+    extract,
+    false,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy_file import File
 from sqlalchemy_file.exceptions import ContentTypeValidationError
@@ -9,31 +28,159 @@ from sqlalchemy_file.exceptions import ContentTypeValidationError
 from src.domain.schedules import entities
 from src.domain.schedules.entities import OrderStatus
 from src.infrastructure.db.exceptions import InsertException, UpdateException
-from src.infrastructure.db.models.schedules import Master, Order, Schedule, Service, Slot
+from src.infrastructure.db.models.orders import ORDER_PAYMENT_REVISION_SEQ, OrderPayment
+from src.infrastructure.db.models.schedules import (
+    Master,
+    MasterMonthReport,
+    Order,
+    OrderReportEvent,
+    Schedule,
+    ScheduleTemplate,
+    Service,
+    ServiceMonthReport,
+    ServiceToMaster,
+    Slot,
+)
 from src.infrastructure.db.models.users import Users
-from src.infrastructure.db.repositories.base import GenericSQLAlchemyQueryRepository, GenericSQLAlchemyRepository
-from src.logic.dto.mappers.schedule_mappers import (
-    master_to_detail_dto_mapper,
-    order_to_detail_dto_mapper,
-    schedule_to_detail_dto_mapper,
-    schedule_to_short_dto_mapper,
-    service_to_detail_dto_mapper,
-    slot_to_short_dto_mapper,
-    user_to_detail_dto_mapper,
+from src.infrastructure.db.repositories.base import (
+    BaseRepository,
+    GenericSQLAlchemyQueryRepository,
+    GenericSQLAlchemyRepository,
+)
+from src.infrastructure.db.repositories.projections import (
+    MASTER_WIDTH,
+    ORDER_COLUMNS,
+    SERVICE_COLUMNS,
+    USER_COLUMNS,
+    find_services_by_masters,
+    get_masters_projection_query,
+    get_orders_projection_query,
+    get_schedules_projection_query,
+    master_from_row,
+    order_from_row,
+    schedule_from_row,
+    service_from_row,
+    user_from_row,
 )
 from src.logic.dto.schedule_dto import (
+    FreeSlotDTO,
     MasterDetailDTO,
     MasterReportDTO,
+    OrderCursorDTO,
     OrderDetailDTO,
     ScheduleDetailDTO,
     ScheduleShortDTO,
     ServiceDTO,
     ServiceReportDTO,
+    SlotBookingDTO,
     SlotShortDTO,
 )
 from src.logic.dto.user_dto import UserDetailDTO
 
 
+BULK_INSERT_CHUNK_SIZE = 5000
+
+
+def get_active_order_for_slot_clause():
+    return exists().where(
+        Order.slot_id == Slot.id,
+        or_(Order.status != OrderStatus.CANCELLED.value, Order.status == null()),
+    )
+
+
+def get_order_filter_clauses(
+    user_id: int | None = None,
+    status: OrderStatus | None = None,
+    master_id: int | None = None,
+    service_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list:
+    # запросы страницы и выгрузки заказов уже соединяют Slot и Schedule, фильтр по мастеру идет по ним
+    clauses = []
+    if user_id:
+        clauses.append(Order.user_id == user_id)
+    if status:
+        clauses.append(Order.status == status.value)
+    if master_id:
+        clauses.append(Schedule.master_id == master_id)
+    if service_id:
+        clauses.append(Order.service_id == service_id)
+    if date_from:
+        clauses.append(Order.date_add >= datetime.combine(date_from, time.min))
+    if date_to:
+        clauses.append(Order.date_add < datetime.combine(date_to + timedelta(days=1), time.min))
+    return clauses
+
+
+def get_order_report_by_master_query(year: int, month: int):
+    return (
+        select(
+            Users.last_name,
+            Users.first_name,
+            MasterMonthReport.total_count,
+            MasterMonthReport.total_sum,
+            MasterMonthReport.master_id.label("id"),
+        )
+        .join(Master, Master.id == MasterMonthReport.master_id)
+        .join(Users, Users.id == Master.user_id)
+        .where(MasterMonthReport.year == year, MasterMonthReport.month == month)
+        .order_by(MasterMonthReport.master_id)
+    )
+
+
+def get_order_report_by_service_query(year: int | None = None, month: int | None = None):
+    query = (
+        select(
+            Service.id,
+            Service.name,
+            Service.price,
+            cast(func.sum(ServiceMonthReport.total_count), BigInteger).label("total_count"),
+            cast(func.sum(ServiceMonthReport.total_sum), BigInteger).label("total_sum"),
+        )
+        .join(ServiceMonthReport, ServiceMonthReport.service_id == Service.id)
+        .group_by(Service.id)
+        .order_by(Service.id)
+    )
+    if year:
+        query = query.where(ServiceMonthReport.year == year)
+    if month:
+        query = query.where(ServiceMonthReport.month == month)
+    return query
+
+
+def get_order_report_source_query(order_id: int, sign: int, schedule_id: int | None = None):
+    # с schedule_id мастер берется из расписания на момент события, а не из текущего слота заказа
+    schedule_clause = Schedule.id == schedule_id if schedule_id else Schedule.id == Slot.schedule_id
+    return (
+        select(
+            cast(extract("year", Order.date_add), Integer).label("year"),
+            cast(extract("month", Order.date_add), Integer).label("month"),
+            Schedule.master_id,
+            Order.service_id,
+            literal(sign, BigInteger).label("total_count"),
+            (Service.price * sign).label("total_sum"),
+        )
+        .join(Slot, Slot.id == Order.slot_id)
+        .join(Schedule, schedule_clause)
+        .join(Service, Service.id == Order.service_id)
+        .where(Order.id == order_id)
+        .subquery("order_report_source")
+    )
+
+
+def get_month_report_upsert(model, key_column: str, source):
+    columns = ["year", "month", key_column, "total_count", "total_sum"]
+    query = insert(model).from_select(columns, select(*[source.c[column] for column in columns]))
+    return query.on_conflict_do_update(
+        index_elements=["year", "month", key_column],
+        set_={
+            "total_count": model.total_count + query.excluded.total_count,
+            "total_sum": model.total_sum + query.excluded.total_sum,
+        },
+    )
+
+
 class ServiceRepository(GenericSQLAlchemyRepository[Service, entities.Service]):
     model = Service
 
@@ -63,6 +210,11 @@ class MasterRepository(GenericSQLAlchemyRepository[Master, entities.Master]):
         scalar = result.scalar_one_or_none()
         return scalar.to_domain() if scalar else None
 
+    async def find_existing_ids(self, ids: list[int]) -> list[int]:
+        query = select(self.model.id).where(self.model.id.in_(ids))
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
 
 class ScheduleRepository(GenericSQLAlchemyRepository[Schedule, entities.Schedule]):
     model = Schedule
@@ -78,6 +230,47 @@ class ScheduleRepository(GenericSQLAlchemyRepository[Schedule, entities.Schedule
             raise InsertException(entity=entity, detail=str(err.args))
         return model.to_domain()
 
+    async def bulk_add(self, entities_list: list[entities.Schedule]) -> list[entities.Schedule]:
+        created: list[entities.Schedule] = []
+        for start in range(0, len(entities_list), BULK_INSERT_CHUNK_SIZE):
+            chunk = entities_list[start : start + BULK_INSERT_CHUNK_SIZE]
+            query = (
+                insert(Schedule)
+                .values([{"day": entity.day, "master_id": entity.master_id} for entity in chunk])
+                .on_conflict_do_nothing(index_elements=[Schedule.day, Schedule.master_id])
+                .returning(Schedule.id, Schedule.day, Schedule.master_id)
+            )
+            result = await self.session.execute(query)
+            created_ids = {(row.day, row.master_id): row.id for row in result}
+            for entity in chunk:
+                if (entity.day, entity.master_id) in created_ids:
+                    entity.id = created_ids[(entity.day, entity.master_id)]
+                    created.append(entity)
+
+        slot_rows = [
+            {
+                "schedule_id": entity.id,
+                "time_start": time.fromisoformat(slot.time_start.as_generic_type()),
+                "is_occupied": False,
+            }
+            for entity in created
+            for slot in entity.slots
+        ]
+        for start in range(0, len(slot_rows), BULK_INSERT_CHUNK_SIZE):
+            query = insert(Slot).values(slot_rows[start : start + BULK_INSERT_CHUNK_SIZE]).on_conflict_do_nothing()
+            await self.session.execute(query)
+        return created
+
+    async def find_schedule_id(self, master_id: int, day: date) -> int | None:
+        query = select(Schedule.id).where(Schedule.master_id == master_id, Schedule.day == day)
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def find_slot_id(self, schedule_id: int, time_start: time) -> int | None:
+        query = select(Slot.id).where(Slot.schedule_id == schedule_id, Slot.time_start == time_start)
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
     async def find_master_services_by_schedule(self, schedule_id: int) -> list[int]:
         query = select(Service.id).join(Service.masters).join(Master.schedules).where(Schedule.id == schedule_id)
         result = await self.session.execute(query)
@@ -90,19 +283,73 @@ class ScheduleRepository(GenericSQLAlchemyRepository[Schedule, entities.Schedule
         scalar = result.scalar_one_or_none()
         return scalar.to_domain() if scalar else None
 
-    async def find_occupied_slots(self, schedule_id: int) -> list[entities.Slot]:
+    async def update_slots_occupancy(
+        self, occupied_ids: list[int] | None = None, free_ids: list[int] | None = None
+    ) -> set[int]:
+        occupied_ids, free_ids = occupied_ids or [], free_ids or []
+        slot_ids = [*occupied_ids, *free_ids]
+        if not slot_ids:
+            return set()
         query = (
-            select(Slot)
-            .join(Slot.orders)
-            .where(
-                and_(
-                    Slot.schedule_id == schedule_id,
-                    or_(Order.status != OrderStatus.CANCELLED.value, Order.status == null()),  # noqa: E711
-                )
+            update(Slot)
+            .where(Slot.id.in_(slot_ids))
+            .values(is_occupied=Slot.id.in_(occupied_ids) if occupied_ids else false())
+            .returning(Slot.schedule_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return set(result.scalars().all())
+
+    async def claim_slot(self, slot_id: int) -> int | None:
+        # условный захват: строка слота блокируется, и конкурентный перенос после ожидания видит is_occupied
+        query = (
+            update(Slot)
+            .where(Slot.id == slot_id, Slot.is_occupied == false(), ~get_active_order_for_slot_clause())
+            .values(is_occupied=True)
+            .returning(Slot.schedule_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def rebuild_slots_occupancy(self, schedule_ids: list[int]) -> list[int]:
+        has_active_order = get_active_order_for_slot_clause()
+        query = (
+            update(Slot)
+            .where(Slot.schedule_id.in_(schedule_ids), Slot.is_occupied.is_distinct_from(has_active_order))
+            .values(is_occupied=has_active_order)
+            .returning(Slot.schedule_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+
+class ScheduleTemplateRepository(GenericSQLAlchemyRepository[ScheduleTemplate, entities.ScheduleTemplate]):
+    model = ScheduleTemplate
+
+    async def upsert(self, entity: entities.ScheduleTemplate) -> entities.ScheduleTemplate:
+        query = (
+            insert(self.model)
+            .values(
+                master_id=entity.master_id,
+                weekday=entity.weekday,
+                start_hour=entity.grid.start_hour,
+                end_hour=entity.grid.end_hour,
+                slot_delta=entity.grid.slot_delta,
             )
+            .returning(self.model)
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[self.model.master_id, self.model.weekday],
+            set_={
+                "start_hour": query.excluded.start_hour,
+                "end_hour": query.excluded.end_hour,
+                "slot_delta": query.excluded.slot_delta,
+            },
         )
         result = await self.session.execute(query)
-        return [el.to_domain() for el in result.scalars().all()]
+        return result.scalar_one().to_domain()
 
 
 class OrderRepository(GenericSQLAlchemyRepository[Order, entities.Order]):
@@ -114,6 +361,84 @@ class OrderRepository(GenericSQLAlchemyRepository[Order, entities.Order]):
         scalar = result.scalar_one_or_none()
         return scalar.to_domain() if scalar else None
 
+    async def touch_payment(self, order_id: int) -> None:
+        # новая ревизия оплаты отправляет ее в следующий пересчет выручки с текущим мастером заказа
+        query = (
+            update(OrderPayment)
+            .where(OrderPayment.order_id == order_id)
+            .values(revision=func.nextval(ORDER_PAYMENT_REVISION_SEQ))
+        )
+        await self.session.execute(query)
+
+    async def book_slot(self, entity: entities.Order) -> SlotBookingDTO | None:
+        target = (
+            select(
+                Slot.id.label("slot_id"),
+                Slot.schedule_id,
+                Slot.time_start,
+                Service.name.label("service_name"),
+                Service.price.label("service_price"),
+                exists()
+                .where(
+                    ServiceToMaster.master_id == Schedule.master_id,
+                    ServiceToMaster.service_id == entity.service_id,
+                )
+                .label("service_is_valid"),
+                ~get_active_order_for_slot_clause().label("slot_is_free"),
+            )
+            .join(Schedule, Schedule.id == Slot.schedule_id)
+            .outerjoin(Service, Service.id == entity.service_id)
+            .where(Slot.id == entity.slot_id)
+            .cte("target")
+        )
+        order_table = Order.__table__
+        inserted = (
+            insert(order_table)
+            .from_select(
+                ["slot_id", "service_id", "user_id", "status", "date_add"],
+                select(
+                    target.c.slot_id,
+                    literal(entity.service_id, BigInteger),
+                    literal(entity.user_id, BigInteger),
+                    literal(entity.status.value, Integer),
+                    literal(entity.date_add, order_table.c.date_add.type),
+                ).where(
+                    target.c.service_name != null(),
+                    target.c.service_is_valid,
+                    target.c.slot_is_free,
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(order_table.c.id, order_table.c.slot_id)
+            .cte("inserted")
+        )
+        slot_table = Slot.__table__
+        occupied = (
+            update(slot_table)
+            .where(slot_table.c.id.in_(select(inserted.c.slot_id)))
+            .values(is_occupied=True)
+            .returning(slot_table.c.id)
+            .cte("occupied")
+        )
+        query = select(target, inserted.c.id.label("order_id")).select_from(
+            target.outerjoin(inserted, true()).outerjoin(occupied, true())
+        )
+        result = await self.session.execute(query)
+        row = result.mappings().one_or_none()
+        if not row:
+            return None
+        # проверки прошли, но вставку опередил конкурентный заказ на тот же слот (uq_order_active_slot)
+        lost_race = row["order_id"] is None and row["service_name"] is not None and row["service_is_valid"]
+        return SlotBookingDTO(
+            order_id=row["order_id"],
+            schedule_id=row["schedule_id"],
+            slot_time_start=row["time_start"],
+            service_name=row["service_name"],
+            service_price=row["service_price"],
+            service_is_valid=row["service_is_valid"],
+            slot_is_free=row["slot_is_free"] and not lost_race,
+        )
+
     def get_query_to_find_all(self, **filter_by):
         query = select(self.model).options(joinedload(self.model.user, innerjoin=True)).filter_by(**filter_by)
         return query
@@ -135,186 +460,264 @@ class OrderRepository(GenericSQLAlchemyRepository[Order, entities.Order]):
         return model.to_domain()
 
 
+class OrderReportRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _claim_event(self, event_id: UUID) -> bool:
+        query = (
+            insert(OrderReportEvent)
+            .values(event_id=str(event_id))
+            .on_conflict_do_nothing()
+            .returning(OrderReportEvent.event_id)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none() is not None
+
+    async def apply_order_event(self, event_id: UUID, order_id: int, sign: int, schedule_id: int | None = None) -> bool:
+        """Добавляет заказ в месячные отчеты (sign=1) или вычитает его (sign=-1), повторное событие пропускается"""
+        if not await self._claim_event(event_id):
+            return False
+        source = get_order_report_source_query(order_id=order_id, sign=sign, schedule_id=schedule_id)
+        await self.session.execute(get_month_report_upsert(MasterMonthReport, "master_id", source))
+        await self.session.execute(get_month_report_upsert(ServiceMonthReport, "service_id", source))
+        return True
+
+    async def apply_order_move(
+        self, event_id: UUID, order_id: int, previous_schedule_id: int, schedule_id: int
+    ) -> bool:
+        """Переносит заказ в отчете мастеров со старого расписания на новое, услуга и месяц заказа не меняются"""
+        if not await self._claim_event(event_id):
+            return False
+        for sign, source_schedule_id in ((-1, previous_schedule_id), (1, schedule_id)):
+            source = get_order_report_source_query(order_id=order_id, sign=sign, schedule_id=source_schedule_id)
+            await self.session.execute(get_month_report_upsert(MasterMonthReport, "master_id", source))
+        return True
+
+
 class ServiceQueryRepository(GenericSQLAlchemyQueryRepository[Service]):
     async def find_all(self, services_id: list[int] | None = None) -> list[ServiceDTO]:
-        query = select(Service)
+        query = select(*SERVICE_COLUMNS)
         if services_id:
             query = query.where(Service.id.in_(services_id))
         result = await self.session.execute(query)
-        return [service_to_detail_dto_mapper(el) for el in result.scalars().all()]
+        return [service_from_row(row) for row in result]
 
     async def get_services_by_master(self, master_id: int) -> list[ServiceDTO]:
-        query = select(Service).join(Service.masters).where(Master.id == master_id)
-        result = await self.session.execute(query)
-        return [service_to_detail_dto_mapper(el) for el in result.scalars().all()]
+        services = await find_services_by_masters(self.session, [master_id])
+        return services.get(master_id, [])
 
 
 class MasterQueryRepository(GenericSQLAlchemyQueryRepository[Master]):
     async def find_one_or_none(self, **filter_by) -> MasterDetailDTO | None:
-        query = (
-            select(Master)
-            .options(joinedload(Master.user))
-            .options(selectinload(Master.services))
-            .filter_by(**filter_by)
-        )
-        result = await self.session.execute(query)
-        scalar = result.scalar_one_or_none()
-        return master_to_detail_dto_mapper(scalar) if scalar else None
+        masters = await self.find_all(**filter_by)
+        return masters[0] if masters else None
 
     async def find_all(self, **filter_by) -> list[MasterDetailDTO]:
-        query = (
-            select(Master)
-            .options(selectinload(Master.services))
-            .options(joinedload(Master.user))
-            .filter_by(**filter_by)
+        query = get_masters_projection_query().where(
+            *[getattr(Master, key) == value for key, value in filter_by.items()]
         )
-        result = await self.session.execute(query)
-        return [master_to_detail_dto_mapper(el) for el in result.scalars().all()]
+        return await self._find_masters(query)
+
+    async def _find_masters(self, query) -> list[MasterDetailDTO]:
+        rows = (await self.session.execute(query)).all()
+        services = await find_services_by_masters(self.session, (row[0] for row in rows))
+        return [master_from_row(row, services) for row in rows]
 
     async def get_all_user_to_add_masters(self) -> list[UserDetailDTO]:
-        query = select(Users).where(~Users.master.has())
+        query = select(*USER_COLUMNS).where(~Users.master.has())
         result = await self.session.execute(query)
-        return [user_to_detail_dto_mapper(el) for el in result.scalars().all()]
+        return [user_from_row(row) for row in result]
 
     async def filter_by_service(self, service_id: int) -> list[MasterDetailDTO]:
         query = (
-            select(Master)
-            .options(joinedload(Master.user))
-            .options(selectinload(Master.services))
-            .where(Service.id == service_id)
+            get_masters_projection_query()
+            .join(ServiceToMaster, ServiceToMaster.master_id == Master.id)
+            .where(ServiceToMaster.service_id == service_id)
         )
-        result = await self.session.execute(query)
-        return [master_to_detail_dto_mapper(el) for el in result.scalars().all()]
+        return await self._find_masters(query)
 
-    async def get_order_report_by_master(self, month: int | None = None) -> list[MasterReportDTO]:
-        month = month if month else date.today().month
-        master_with_reports = (
-            select(
-                Master.id,
-                Master.user_id,
-                func.count(Master.id).label("total_count"),
-                # func.sum(Order.total_amount).label("total_sum"),
-            )
-            .join(Schedule)
-            .join(Slot)
-            .join(Order)
-            .join(Service)
-            .where(extract("month", Order.date_add) == month)
-            .group_by(Master.id)
-            .cte("master_with_reports")
-        )
-        query = (
-            select(
-                Users.last_name,
-                Users.first_name,
-                master_with_reports.c.total_count,
-                # master_with_reports.c.total_sum,
-                master_with_reports.c.id,
-            )
-            .select_from(Users)
-            .join(master_with_reports, master_with_reports.c.user_id == Users.id)
-        )
-        result = await self.session.execute(query)
+    async def get_order_report_by_master(self, year: int, month: int) -> list[MasterReportDTO]:
+        result = await self.session.execute(get_order_report_by_master_query(year=year, month=month))
         return [MasterReportDTO(**el) for el in result.mappings().all()]
 
+    def stream_order_report_by_master(self, year: int, month: int) -> AsyncIterator[list[dict]]:
+        return self.stream_mappings(get_order_report_by_master_query(year=year, month=month))
+
 
 class ScheduleQueryRepository(GenericSQLAlchemyQueryRepository[Schedule]):
     async def find_all(self, **filter_by) -> list[ScheduleDetailDTO]:
-        query = (
-            select(Schedule)
-            .options(
-                joinedload(Schedule.master).options(selectinload(Master.services)).options(joinedload(Master.user))
-            )
-            .filter_by(**filter_by)
+        query = get_schedules_projection_query().where(
+            *[getattr(Schedule, key) == value for key, value in filter_by.items()]
         )
-        result = await self.session.execute(query)
-        return [schedule_to_detail_dto_mapper(el) for el in result.scalars().all()]
+        rows = (await self.session.execute(query)).all()
+        services = await find_services_by_masters(self.session, (row[2] for row in rows))
+        return [schedule_from_row(row, services) for row in rows]
 
     async def find_occupied_slots(self, schedule_id: int) -> list[SlotShortDTO]:
         query = (
-            select(Slot)
-            .join(Slot.orders)
-            .where(
-                and_(
-                    Slot.schedule_id == schedule_id,
-                    or_(Order.status != OrderStatus.CANCELLED.value, Order.status == None),  # noqa: E711
-                )
-            )
+            select(Slot.id, Slot.time_start)
+            .where(Slot.schedule_id == schedule_id, Slot.is_occupied)
+            .order_by(Slot.time_start)
         )
         result = await self.session.execute(query)
-        return [slot_to_short_dto_mapper(el) for el in result.scalars().all()]
+        return [SlotShortDTO(*row) for row in result]
 
     async def find_free_slots(self, schedule_id: int) -> list[SlotShortDTO]:
         query = (
-            select(Slot)
-            .join(Slot.orders, isouter=True)
+            select(Slot.id, Slot.time_start)
+            .where(Slot.schedule_id == schedule_id, ~Slot.is_occupied)
+            .order_by(Slot.time_start)
+        )
+        result = await self.session.execute(query)
+        return [SlotShortDTO(*row) for row in result]
+
+    async def find_earliest_free_slots(
+        self,
+        service_id: int,
+        date_from: date,
+        date_to: date,
+        masters_id: list[int] | None = None,
+        limit: int = 10,
+    ) -> list[FreeSlotDTO]:
+        query = (
+            select(
+                Slot.id,
+                Slot.time_start,
+                Slot.schedule_id,
+                Schedule.day,
+                Schedule.master_id,
+            )
+            .join(Schedule, Schedule.id == Slot.schedule_id)
+            .join(ServiceToMaster, ServiceToMaster.master_id == Schedule.master_id)
             .where(
-                and_(
-                    Slot.schedule_id == schedule_id,
-                    ~Slot.orders.any(),  # noqa: E711
-                )
+                ServiceToMaster.service_id == service_id,
+                Schedule.day.between(date_from, date_to),
+                ~Slot.is_occupied,
+            )
+            .order_by(Schedule.day, Slot.time_start, Schedule.master_id)
+            .limit(limit)
+        )
+        if masters_id:
+            query = query.where(Schedule.master_id.in_(masters_id))
+        result = await self.session.execute(query)
+        return [FreeSlotDTO(**el) for el in result.mappings().all()]
+
+    async def find_templates(
+        self, master_ids: list[int] | None = None, service_id: int | None = None
+    ) -> list[entities.ScheduleTemplate]:
+        query = select(ScheduleTemplate)
+        if master_ids:
+            query = query.where(ScheduleTemplate.master_id.in_(master_ids))
+        if service_id:
+            query = query.join(ServiceToMaster, ServiceToMaster.master_id == ScheduleTemplate.master_id).where(
+                ServiceToMaster.service_id == service_id
             )
+        result = await self.session.execute(query)
+        return [el.to_domain() for el in result.scalars().all()]
+
+    async def find_existing_days(self, master_ids: list[int], date_from: date, date_to: date) -> set[tuple[int, date]]:
+        query = select(Schedule.master_id, Schedule.day).where(
+            Schedule.master_id.in_(master_ids), Schedule.day.between(date_from, date_to)
         )
         result = await self.session.execute(query)
-        return [slot_to_short_dto_mapper(el) for el in result.scalars().all()]
+        return {(row.master_id, row.day) for row in result}
+
+    async def find_free_slots_for_day(self, master_id: int, day: date) -> list[SlotShortDTO]:
+        query = (
+            select(Slot.id, Slot.time_start)
+            .join(Schedule, Schedule.id == Slot.schedule_id)
+            .where(Schedule.master_id == master_id, Schedule.day == day, ~Slot.is_occupied)
+            .order_by(Slot.time_start)
+        )
+        result = await self.session.execute(query)
+        return [SlotShortDTO(*row) for row in result]
 
     async def get_schedule_for_master(self, master_id: int) -> list[ScheduleShortDTO]:
-        query = select(Schedule).filter_by(master_id=master_id).order_by(Schedule.day)
+        query = select(Schedule.id, Schedule.day).where(Schedule.master_id == master_id).order_by(Schedule.day)
         result = await self.session.execute(query)
-        return [schedule_to_short_dto_mapper(el) for el in result.scalars().all()]
+        return [ScheduleShortDTO(*row) for row in result]
 
 
 class OrderQueryRepository(GenericSQLAlchemyQueryRepository[Order]):
     async def find_one_or_none(self, **filter_by) -> OrderDetailDTO | None:
-        query = (
-            select(Order)
-            .options(
-                joinedload(Order.slot, innerjoin=True)
-                .joinedload(Slot.schedule, innerjoin=True)
-                .options(
-                    joinedload(Schedule.master, innerjoin=True)
-                    .options(joinedload(Master.user, innerjoin=True))
-                    .options(selectinload(Master.services))
-                )
-            )
-            .options(joinedload(Order.service, innerjoin=True))
-            .options(joinedload(Order.user, innerjoin=True))
-            .filter_by(**filter_by)
-        )
-        result = await self.session.execute(query)
-        scalar = result.scalar_one_or_none()
-        return order_to_detail_dto_mapper(scalar) if scalar else None
+        orders = await self.find_all(**filter_by)
+        return orders[0] if orders else None
 
     async def find_all(self, **filter_by) -> list[OrderDetailDTO]:
+        query = get_orders_projection_query().where(
+            *[getattr(Order, key) == value for key, value in filter_by.items()]
+        )
+        return await self._find_orders(query)
+
+    async def _find_orders(self, query) -> list[OrderDetailDTO]:
+        rows = (await self.session.execute(query)).all()
+        master_column = len(ORDER_COLUMNS) - MASTER_WIDTH
+        services = await find_services_by_masters(self.session, (row[master_column] for row in rows))
+        return [order_from_row(row, services) for row in rows]
+
+    async def find_page(
+        self,
+        limit: int,
+        after: OrderCursorDTO | None = None,
+        user_id: int | None = None,
+        status: OrderStatus | None = None,
+        master_id: int | None = None,
+        service_id: int | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> list[OrderDetailDTO]:
         query = (
-            select(Order)
-            .options(
-                joinedload(Order.slot, innerjoin=True)
-                .joinedload(Slot.schedule, innerjoin=True)
-                .options(
-                    joinedload(Schedule.master, innerjoin=True)
-                    .options(joinedload(Master.user, innerjoin=True))
-                    .options(selectinload(Master.services))
+            get_orders_projection_query()
+            .where(
+                *get_order_filter_clauses(
+                    user_id=user_id,
+                    status=status,
+                    master_id=master_id,
+                    service_id=service_id,
+                    date_from=date_from,
+                    date_to=date_to,
                 )
             )
-            .options(joinedload(Order.service, innerjoin=True))
-            .options(joinedload(Order.user, innerjoin=True))
-            .filter_by(**filter_by)
+            .order_by(Order.date_add.desc(), Order.id.desc())
+            .limit(limit)
         )
-        result = await self.session.execute(query)
-        return [order_to_detail_dto_mapper(el) for el in result.scalars().all()]
+        if after:
+            query = query.where(tuple_(Order.date_add, Order.id) < tuple_(after.date_add, after.id))
+        return await self._find_orders(query)
 
-    async def get_order_report_by_service(self) -> list[ServiceReportDTO]:
+    def stream_export(self, **filters) -> AsyncIterator[list[dict]]:
         query = (
             select(
-                Service.id,
-                Service.name,
-                Service.price,
-                func.count(Service.id).label("total_count"),
-                # func.sum(Order.total_amount).label("total_sum"),
+                Order.id,
+                Order.date_add,
+                Order.status,
+                Order.user_id,
+                Users.last_name.label("user_last_name"),
+                Users.first_name.label("user_first_name"),
+                Order.service_id,
+                Service.name.label("service_name"),
+                Service.price.label("service_price"),
+                Schedule.master_id,
+                Schedule.day,
+                Slot.time_start,
             )
-            .join(Order)
-            .group_by(Service.id)
+            .join(Slot, Slot.id == Order.slot_id)
+            .join(Schedule, Schedule.id == Slot.schedule_id)
+            .join(Users, Users.id == Order.user_id)
+            .outerjoin(Service, Service.id == Order.service_id)
+            .where(*get_order_filter_clauses(**filters))
+            .order_by(Order.date_add.desc(), Order.id.desc())
         )
-        result = await self.session.execute(query)
+        return self.stream_mappings(query)
+
+    async def get_order_report_by_service(
+        self, year: int | None = None, month: int | None = None
+    ) -> list[ServiceReportDTO]:
+        result = await self.session.execute(get_order_report_by_service_query(year=year, month=month))
         return [ServiceReportDTO(**el) for el in result.mappings().all()]
+
+    def stream_order_report_by_service(
+        self, year: int | None = None, month: int | None = None
+    ) -> AsyncIterator[list[dict]]:
+        return self.stream_mappings(get_order_report_by_service_query(year=year, month=month))
@@ -0,0 +1,106 @@
+import math
+import random
+
+from typing import Self
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.infrastructure.logger_adapter.logger import init_logger
+
+logger = init_logger(__name__)
+
+# ключ членства одинаков для всех воркеров и берется в shared режиме, число держателей равно числу живых воркеров
+MEMBERSHIP_KEY = 0
+
+
+class AdvisoryShardOwnership:
+    """
+    Распределение шардов между процессами через сессионные advisory locks postgres.
+
+    Воркер держит shared lock членства и exclusive lock на каждый свой шард на отдельном соединении.
+    rebalance отпускает лишние шарды и добирает свободные до равной доли, поэтому при входе и выходе воркеров
+    шарды перераспределяются; блокировки упавшего воркера postgres снимает вместе с его соединением.
+    """
+
+    def __init__(self, engine: AsyncEngine, shard_count: int, membership_class: int, shard_class: int):
+        self.engine = engine
+        self.shard_count = shard_count
+        self.membership_class = membership_class
+        self.shard_class = shard_class
+        self.owned: frozenset[int] = frozenset()
+        self._connection: AsyncConnection | None = None
+
+    async def _connect(self) -> AsyncConnection:
+        if self._connection is None:
+            connection = await self.engine.connect()
+            # каждый запрос фиксируется сразу, сессионные блокировки транзакцией не удерживаются
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await connection.execute(
+                text("SELECT pg_advisory_lock_shared(:cls, :key)"),
+                {"cls": self.membership_class, "key": MEMBERSHIP_KEY},
+            )
+            self._connection = connection
+        return self._connection
+
+    async def _count_members(self, connection: AsyncConnection) -> int:
+        query = text(
+            "SELECT count(*) FROM pg_locks "
+            "WHERE locktype = 'advisory' AND granted AND objsubid = 2 "
+            "AND classid = CAST(:cls AS oid) AND objid = CAST(:key AS oid) "
+            "AND database = (SELECT oid FROM pg_database WHERE datname = current_database())"
+        )
+        result = await connection.execute(query, {"cls": self.membership_class, "key": MEMBERSHIP_KEY})
+        return max(result.scalar_one(), 1)
+
+    async def rebalance(self) -> frozenset[int]:
+        try:
+            connection = await self._connect()
+            share = math.ceil(self.shard_count / await self._count_members(connection))
+            owned = set(self.owned)
+            for shard in sorted(owned)[share:]:
+                await connection.execute(
+                    text("SELECT pg_advisory_unlock(:cls, :shard)"), {"cls": self.shard_class, "shard": shard}
+                )
+                owned.discard(shard)
+            # обход с случайного шарда, чтобы одновременно стартующие воркеры не спорили за одни и те же шарды
+            offset = random.randrange(self.shard_count)
+            for step in range(self.shard_count):
+                if len(owned) >= share:
+                    break
+                shard = (offset + step) % self.shard_count
+                if shard in owned:
+                    continue
+                result = await connection.execute(
+                    text("SELECT pg_try_advisory_lock(:cls, :shard)"), {"cls": self.shard_class, "shard": shard}
+                )
+                if result.scalar_one():
+                    owned.add(shard)
+        except Exception as err:
+            # вместе с соединением теряются и блокировки, поэтому шарды больше не считаются своими
+            logger.error(f"{self.__class__.__name__}: ошибка перераспределения шардов: {err}")
+            await self.close()
+            return self.owned
+        if owned != self.owned:
+            logger.info(f"{self.__class__.__name__}: owns {len(owned)} of {self.shard_count} shards")
+        self.owned = frozenset(owned)
+        return self.owned
+
+    async def close(self) -> None:
+        self.owned = frozenset()
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            # сессионные блокировки переживают возврат соединения в пул, поэтому снимаются явно
+            await connection.execute(text("SELECT pg_advisory_unlock_all()"))
+            await connection.close()
+        except Exception as err:
+            logger.error(f"{self.__class__.__name__}: ошибка закрытия соединения: {err}")
+            await connection.invalidate()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args, **kwargs) -> None:
+        await self.close()
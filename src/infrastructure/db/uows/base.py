@@ -2,10 +2,18 @@ from __future__ import annotations
 
 import abc
 
-from typing import Self
+from collections.abc import Callable
+from typing import Any, Self
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.infrastructure.logger_adapter.logger import init_logger
+
+logger = init_logger(__name__)
+
+# хуки хранятся в info сессии: они принадлежат транзакции этой сессии, а не объекту uow
+AFTER_COMMIT_HOOKS = "after_commit_hooks"
+
 # from src.infrastructure.db.config import AsyncSessionFactory
 
 
@@ -16,6 +24,10 @@ class AbstractUnitOfWork(abc.ABC):
     async def __aexit__(self, *args, **kwargs) -> None:
         await self.rollback()
 
+    @abc.abstractmethod
+    def clone(self) -> Self:
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def commit(self) -> None:
         raise NotImplementedError
@@ -38,9 +50,25 @@ class SQLAlchemyAbstractUnitOfWork(AbstractUnitOfWork):
         await super().__aexit__(*args, **kwargs)
         await self._session.close()
 
+    def clone(self) -> Self:
+        return self.__class__(self._session_factory)
+
+    def after_commit(self, hook: Callable[[], Any]) -> None:
+        """Вызывает hook после успешного коммита; при откате hook отбрасывается"""
+        self._session.info.setdefault(AFTER_COMMIT_HOOKS, []).append(hook)
+
     async def commit(self) -> None:
-        await self._session.commit()
+        session = self._session
+        await session.commit()
+        hooks: list[Callable[[], Any]] = session.info.pop(AFTER_COMMIT_HOOKS, [])
+        for hook in hooks:
+            # данные уже зафиксированы, поэтому ошибка хука не должна выглядеть как ошибка коммита
+            try:
+                hook()
+            except Exception as err:
+                logger.error(f"{self.__class__.__name__}: after commit hook {hook} failed: {err}")
 
     async def rollback(self) -> None:
+        self._session.info.pop(AFTER_COMMIT_HOOKS, None)
         self._session.expunge_all()
         await self._session.rollback()
@@ -5,6 +5,8 @@ from src.infrastructure.db.repositories.orders import (
     OrderPaymentRepository,
     PromotionQueryRepository,
     PromotionRepository,
+    RevenueReportQueryRepository,
+    RevenueReportRepository,
     UserPointQueryRepository,
     UserPointRepository,
 )
@@ -20,6 +22,7 @@ class SQLAlchemyOrderUnitOfWork(SQLAlchemyAbstractUnitOfWork):
         self.promotions = PromotionRepository(session=self._session)
         self.order_payments = OrderPaymentRepository(session=self._session)
         self.user_points = UserPointRepository(session=self._session)
+        self.revenue_reports = RevenueReportRepository(session=self._session)
         self.outbox = OutboxMessageRepository(session=self._session)
         return uow
 
@@ -30,4 +33,5 @@ class SQLAlchemyOrderQueryUnitOfWork(SQLAlchemyAbstractUnitOfWork):
         self.promotions = PromotionQueryRepository(session=self._session)
         self.user_points = UserPointQueryRepository(session=self._session)
         self.order_payments = OrderPaymentQueryRepository(session=self._session)
+        self.revenue_reports = RevenueReportQueryRepository(session=self._session)
         return uow
@@ -1,6 +1,6 @@
 from typing import Self
 
-from src.infrastructure.db.repositories.outbox import OutboxMessageRepository
+from src.infrastructure.db.repositories.outbox import OutboxMessageRepository, OutboxPartitionRepository
 from src.infrastructure.db.uows.base import SQLAlchemyAbstractUnitOfWork
 
 
@@ -8,4 +8,5 @@ class SQLAlchemyOutboxUnitOfWork(SQLAlchemyAbstractUnitOfWork):
     async def __aenter__(self) -> Self:
         uow = await super().__aenter__()
         self.outbox = OutboxMessageRepository(session=self._session)
+        self.outbox_partitions = OutboxPartitionRepository(session=self._session)
         return uow
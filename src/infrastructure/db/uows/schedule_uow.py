@@ -5,9 +5,11 @@ from src.infrastructure.db.repositories.schedules import (
     MasterQueryRepository,
     MasterRepository,
     OrderQueryRepository,
+    OrderReportRepository,
     OrderRepository,
     ScheduleQueryRepository,
     ScheduleRepository,
+    ScheduleTemplateRepository,
     ServiceQueryRepository,
     ServiceRepository,
 )
@@ -20,8 +22,10 @@ class SQLAlchemyScheduleUnitOfWork(SQLAlchemyAbstractUnitOfWork):
         uow = await super().__aenter__()
         self.masters = MasterRepository(session=self._session)
         self.schedules = ScheduleRepository(session=self._session)
+        self.schedule_templates = ScheduleTemplateRepository(session=self._session)
         self.services = ServiceRepository(session=self._session)
         self.orders = OrderRepository(session=self._session)
+        self.reports = OrderReportRepository(session=self._session)
         self.users = UserRepository(session=self._session)
         self.outbox = OutboxMessageRepository(session=self._session)
         return uow
@@ -0,0 +1,125 @@
+import asyncio
+import uuid
+
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import asdict
+from typing import Any, TypeVar
+
+import orjson
+import redis.exceptions
+
+from redis.asyncio import Redis as AsyncRedis
+
+from src.infrastructure.logger_adapter.logger import init_logger
+from src.infrastructure.redis_adapter.redis_connector import RedisConnector
+
+logger = init_logger(__name__)
+
+DTO = TypeVar("DTO")
+
+SCHEDULE_SLOTS_KIND = "schedule_slots"
+MASTER_SCHEDULES_KIND = "master_schedules"
+
+# запись живет до инвалидации, ttl только страхует от мусора в редисе
+ENTRY_TTL_SECONDS = 24 * 60 * 60
+LOCK_TTL_MILLISECONDS = 5000
+LOCK_WAIT_STEP_SECONDS = 0.05
+
+
+class AvailabilityCache:
+    """
+    Read-through кэш свободного времени.
+
+    Запись хранится вместе с поколением ключа, инвалидация увеличивает поколение,
+    поэтому значение, посчитанное до инвалидации, не может быть прочитано после нее.
+    """
+
+    def __init__(self, connector: RedisConnector, prefix: str = "availability"):
+        self.connector = connector
+        self.prefix = prefix
+        self.stats: Counter[str] = Counter()
+        self._connection: AsyncRedis | None = None
+
+    async def _get_connection(self) -> AsyncRedis | None:
+        if self._connection is None:
+            self._connection = await self.connector.get_async_connection()
+        return self._connection
+
+    def _key(self, kind: str, key_id: int) -> str:
+        return f"{self.prefix}:{kind}:{key_id}"
+
+    async def get_or_compute(
+        self,
+        kind: str,
+        key_id: int,
+        compute: Callable[[], Awaitable[list[DTO]]],
+        loader: Callable[[dict[str, Any]], DTO],
+    ) -> list[DTO]:
+        connection = await self._get_connection()
+        if connection is None:
+            return await compute()
+        key = self._key(kind, key_id)
+        try:
+            generation, entry = await connection.mget(f"{key}:gen", f"{key}:data")
+            cached = self._read_entry(entry, generation)
+            if cached is not None:
+                self.stats[f"{kind}:hit"] += 1
+                return [loader(row) for row in cached]
+            self.stats[f"{kind}:miss"] += 1
+
+            token = uuid.uuid4().hex
+            if not await connection.set(f"{key}:lock", token, nx=True, px=LOCK_TTL_MILLISECONDS):
+                cached = await self._wait_for_entry(connection, key)
+                if cached is not None:
+                    return [loader(row) for row in cached]
+                return await compute()
+            try:
+                result = await compute()
+                payload = orjson.dumps({"gen": generation or "0", "rows": [asdict(dto) for dto in result]})
+                await connection.set(f"{key}:data", payload.decode(), ex=ENTRY_TTL_SECONDS)
+            finally:
+                if await connection.get(f"{key}:lock") == token:
+                    await connection.delete(f"{key}:lock")
+            return result
+        except redis.exceptions.RedisError as err:
+            logger.error(f"{self.__class__.__name__}: ошибка работы с редисом: {err}")
+            return await compute()
+
+    async def _wait_for_entry(self, connection: AsyncRedis, key: str) -> list[dict] | None:
+        for _ in range(int(LOCK_TTL_MILLISECONDS / 1000 / LOCK_WAIT_STEP_SECONDS)):
+            await asyncio.sleep(LOCK_WAIT_STEP_SECONDS)
+            generation, entry, lock = await connection.mget(f"{key}:gen", f"{key}:data", f"{key}:lock")
+            cached = self._read_entry(entry, generation)
+            if cached is not None or lock is None:
+                return cached
+        return None
+
+    @staticmethod
+    def _read_entry(entry: str | None, generation: str | None) -> list[dict] | None:
+        if entry is None:
+            return None
+        data = orjson.loads(entry)
+        if data["gen"] != (generation or "0"):
+            return None
+        return data["rows"]
+
+    async def invalidate(self, kind: str, key_ids: Iterable[int]) -> None:
+        key_ids = set(key_ids)
+        connection = await self._get_connection()
+        if connection is None or not key_ids:
+            return
+        try:
+            async with connection.pipeline(transaction=False) as pipe:
+                for key_id in key_ids:
+                    pipe.incr(f"{self._key(kind, key_id)}:gen")
+                await pipe.execute()
+        except redis.exceptions.RedisError as err:
+            logger.error(f"{self.__class__.__name__}: не удалось инвалидировать {kind} {key_ids}: {err}")
+        self.stats[f"{kind}:invalidate"] += len(key_ids)
+
+    async def invalidate_schedule_slots(self, schedule_ids: Iterable[int]) -> None:
+        await self.invalidate(SCHEDULE_SLOTS_KIND, schedule_ids)
+
+    async def invalidate_master_schedules(self, master_ids: Iterable[int]) -> None:
+        await self.invalidate(MASTER_SCHEDULES_KIND, master_ids)
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+from bisect import bisect_left
+from collections import Counter
+
+import redis.exceptions
+
+from redis.asyncio import Redis as AsyncRedis
+
+from src.infrastructure.logger_adapter.logger import init_logger
+from src.infrastructure.redis_adapter.redis_connector import RedisConnector
+
+logger = init_logger(__name__)
+
+# верхние границы корзин гистограмм в миллисекундах, последняя корзина "inf" собирает все остальное
+PUBLISH_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+DELIVERY_DELAY_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 15000, 60000, 300000)
+
+PUBLISH_LATENCY = "publish_latency"
+DELIVERY_DELAY = "delivery_delay"
+PUBLISHED = "published"
+FAILED = "failed"
+
+FLUSH_INTERVAL_SECONDS = 5
+RATE_WINDOW_MINUTES = 5
+MINUTE_TTL_SECONDS = (RATE_WINDOW_MINUTES + 2) * 60
+
+
+def get_bucket(buckets_ms: tuple[int, ...], value_ms: float) -> str:
+    index = bisect_left(buckets_ms, value_ms)
+    return str(buckets_ms[index]) if index < len(buckets_ms) else "inf"
+
+
+class OutboxMetrics:
+    """
+    Метрики доставки событий.
+
+    Процессы (релей, API с быстрым путем и консьюмерами) копят счетчики в памяти и раз в несколько секунд
+    прибавляют их к общему хэшу в редисе, поэтому снимок отражает сумму по всем процессам.
+    Поля хэша: "<метрика>|<тип события>[|<корзина>]".
+    """
+
+    def __init__(self, connector: RedisConnector, prefix: str = "outbox_metrics"):
+        self.connector = connector
+        self.prefix = prefix
+        self._pending: Counter[str] = Counter()
+        self._pending_minute: Counter[str] = Counter()
+        self._connection: AsyncRedis | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    def _observe(self, metric: str, event_type: str, buckets_ms: tuple[int, ...], seconds: float) -> None:
+        value_ms = seconds * 1000
+        self._pending[f"{metric}|{event_type}|{get_bucket(buckets_ms, value_ms)}"] += 1
+        self._pending[f"{metric}_sum_ms|{event_type}"] += round(value_ms)
+
+    def record_publish(self, event_type: str, seconds: float, success: bool) -> None:
+        counter = PUBLISHED if success else FAILED
+        self._pending[f"{counter}|{event_type}"] += 1
+        self._pending_minute[f"{counter}|{event_type}"] += 1
+        if success:
+            self._observe(PUBLISH_LATENCY, event_type, PUBLISH_LATENCY_BUCKETS_MS, seconds)
+
+    def record_delivery(self, event_type: str, occurred_at: float) -> None:
+        """Задержка от occurred_at события (unix time) до завершения обработки консьюмером"""
+        self._observe(DELIVERY_DELAY, event_type, DELIVERY_DELAY_BUCKETS_MS, max(time.time() - occurred_at, 0))
+
+    def _minute_key(self, minute: int) -> str:
+        return f"{self.prefix}:minute:{minute}"
+
+    async def _get_connection(self) -> AsyncRedis | None:
+        if self._connection is None:
+            self._connection = await self.connector.get_async_connection()
+        return self._connection
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, Counter()
+        pending_minute, self._pending_minute = self._pending_minute, Counter()
+        if not pending:
+            return
+        connection = await self._get_connection()
+        if connection is None:
+            return
+        minute_key = self._minute_key(int(time.time() // 60))
+        try:
+            async with connection.pipeline(transaction=False) as pipe:
+                for field, value in pending.items():
+                    pipe.hincrby(f"{self.prefix}:totals", field, value)
+                for field, value in pending_minute.items():
+                    pipe.hincrby(minute_key, field, value)
+                pipe.expire(minute_key, MINUTE_TTL_SECONDS)
+                await pipe.execute()
+        except redis.exceptions.RedisError as err:
+            # метрики не должны мешать доставке, несброшенные значения теряются
+            logger.error(f"{self.__class__.__name__}: не удалось сохранить метрики: {err}")
+
+    async def read_totals(self) -> dict[str, int]:
+        connection = await self._get_connection()
+        if connection is None:
+            return {}
+        try:
+            totals = await connection.hgetall(f"{self.prefix}:totals")
+        except redis.exceptions.RedisError as err:
+            # без редиса снимок все равно показывает отставание outbox из базы
+            logger.error(f"{self.__class__.__name__}: не удалось прочитать метрики: {err}")
+            return {}
+        return {field: int(value) for field, value in totals.items()}
+
+    async def read_rates(self) -> dict[str, float]:
+        """Среднее число в секунду по полным минутам окна RATE_WINDOW_MINUTES"""
+        connection = await self._get_connection()
+        if connection is None:
+            return {}
+        current_minute = int(time.time() // 60)
+        try:
+            async with connection.pipeline(transaction=False) as pipe:
+                for minute in range(current_minute - RATE_WINDOW_MINUTES, current_minute):
+                    pipe.hgetall(self._minute_key(minute))
+                minutes = await pipe.execute()
+        except redis.exceptions.RedisError as err:
+            logger.error(f"{self.__class__.__name__}: не удалось прочитать скорости: {err}")
+            return {}
+        counts: Counter[str] = Counter()
+        for values in minutes:
+            counts.update({field: int(value) for field, value in values.items()})
+        return {field: count / (RATE_WINDOW_MINUTES * 60) for field, count in counts.items()}
+
+    async def _flush_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def start(self, interval: float = FLUSH_INTERVAL_SECONDS) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically(interval))
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
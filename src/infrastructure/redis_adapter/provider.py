@@ -0,0 +1,21 @@
+from dishka import Provider, Scope, from_context, provide
+
+from src.infrastructure.redis_adapter.availability_cache import AvailabilityCache
+from src.infrastructure.redis_adapter.outbox_metrics import OutboxMetrics
+from src.infrastructure.redis_adapter.redis_connector import RedisConnector
+from src.presentation.api.settings import Settings
+
+
+class RedisProvider(Provider):
+    scope = Scope.APP
+
+    settings = from_context(provides=Settings)
+
+    @provide()
+    def connector(self, settings: Settings) -> RedisConnector:
+        return RedisConnector(
+            host=settings.redis.REDIS_HOST, port=settings.redis.REDIS_PORT, db=settings.redis.REDIS_DB
+        )
+
+    availability_cache = provide(AvailabilityCache)
+    outbox_metrics = provide(OutboxMetrics)
@@ -1,5 +1,7 @@
 import taskiq_fastapi
 
+from taskiq import TaskiqScheduler
+from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_aio_pika import AioPikaBroker
 
 from src.infrastructure.logger_adapter.logger import init_logger
@@ -11,5 +13,6 @@ logger = init_logger(__name__)
 
 url = f"amqp://{config.RABBIT_USER}:{config.RABBIT_PASS}@{config.RABBIT_HOST}:{config.RABBIT_PORT}"
 taskiq_broker = AioPikaBroker(url)
+taskiq_scheduler = TaskiqScheduler(broker=taskiq_broker, sources=[LabelScheduleSource(taskiq_broker)])
 
 taskiq_fastapi.init(taskiq_broker, "src.presentation.api.main:create_fastapi_app")
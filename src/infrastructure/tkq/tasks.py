@@ -1,7 +1,17 @@
 import asyncio
 
+from typing import Annotated
+
+from fastapi import Request
+from taskiq import TaskiqDepends
+
 from src.infrastructure.logger_adapter.logger import init_logger
 from src.infrastructure.tkq.broker import taskiq_broker
+from src.logic.commands.order_commands import BuildRevenueReportCommand
+from src.logic.commands.outbox_commands import MaintainOutboxPartitionsCommand
+from src.logic.commands.schedule_commands import RebuildSlotsOccupancyCommand
+from src.logic.mediator.base import Mediator
+from src.presentation.api.settings import Settings
 
 logger = init_logger(__name__)
 
@@ -15,6 +25,39 @@ async def add_one(value: int) -> int:
     return value
 
 
+@taskiq_broker.task(schedule=[{"cron": "*/15 * * * *"}])
+async def build_revenue_report(request: Annotated[Request, TaskiqDepends()]) -> int:
+    mediator: Mediator = await request.app.state.dishka_container.get(Mediator)
+    results = await mediator.handle_command(BuildRevenueReportCommand())
+    logger.debug(f"build_revenue_report: processed {results[0]} order payments")
+    return results[0]
+
+
+@taskiq_broker.task
+async def rebuild_slots_occupancy(request: Annotated[Request, TaskiqDepends()], schedule_ids: list[int]) -> int:
+    # флаг занятости слота сверяется с активными заказами только в указанных расписаниях,
+    # задача запускается вручную после правки заказов в обход команд
+    mediator: Mediator = await request.app.state.dishka_container.get(Mediator)
+    results = await mediator.handle_command(RebuildSlotsOccupancyCommand(schedule_ids=schedule_ids))
+    logger.debug(f"rebuild_slots_occupancy: fixed {results[0]} slots")
+    return results[0]
+
+
+@taskiq_broker.task(schedule=[{"cron": "0 3 * * *"}])
+async def maintain_outbox_partitions(request: Annotated[Request, TaskiqDepends()]) -> list[str]:
+    container = request.app.state.dishka_container
+    mediator: Mediator = await container.get(Mediator)
+    config = (await container.get(Settings)).outbox
+    command = MaintainOutboxPartitionsCommand(
+        weeks_ahead=config.OUTBOX_PARTITIONS_AHEAD_WEEKS,
+        retention_days=config.OUTBOX_RETENTION_DAYS,
+        archive_dir=config.OUTBOX_ARCHIVE_DIR,
+    )
+    results = await mediator.handle_command(command)
+    logger.debug(f"maintain_outbox_partitions: dropped {results[0]}")
+    return results[0]
+
+
 # @taskiq_broker.task
 # async def add_two():
 #     print("in add_two")
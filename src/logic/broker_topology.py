@@ -0,0 +1,54 @@
+import asyncio
+
+from src.infrastructure.broker.rabbit.connector import RabbitConnector
+from src.infrastructure.broker.rabbit.topology import RabbitTopology
+from src.logic.event_consumers.orders_consumers import (
+    OrderCancelledEventConsumer,
+    OrderCreatedEventConsumer,
+    OrderPayedEventConsumer,
+    OrderPaymentCancelledEventConsumer,
+    UserCreatedEventConsumer,
+)
+from src.logic.events.order_events import OrderPayedEventHandler, OrderPaymentCanceledEventHandler
+from src.logic.events.schedule_events import OrderCanceledBrokerEventHandler, OrderCreatedBrokerEventHandler
+from src.logic.events.user_events import UserCreatedEventHandler
+from src.presentation.api.settings import settings
+
+BROKER_EVENT_HANDLERS = (
+    OrderCanceledBrokerEventHandler,
+    OrderCreatedBrokerEventHandler,
+    OrderPayedEventHandler,
+    OrderPaymentCanceledEventHandler,
+    UserCreatedEventHandler,
+)
+
+EVENT_CONSUMERS = (
+    OrderCancelledEventConsumer,
+    OrderCreatedEventConsumer,
+    OrderPayedEventConsumer,
+    OrderPaymentCancelledEventConsumer,
+    UserCreatedEventConsumer,
+)
+
+
+def build_topology() -> RabbitTopology:
+    topology = RabbitTopology()
+    for handler in BROKER_EVENT_HANDLERS:
+        topology.add_exchange(handler.exchange_name)
+    for consumer in EVENT_CONSUMERS:
+        topology.add_queue(
+            exchange_name=consumer.exchange_name,
+            queue_name=consumer.queue_name,
+            routing_key=consumer.routing_key,
+        )
+    return topology
+
+
+async def declare_topology():
+    connector = RabbitConnector(settings)
+    async with connector:
+        await build_topology().ensure_declared(connector.connection)
+
+
+if __name__ == "__main__":
+    asyncio.run(declare_topology())
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from functools import partial
 from typing import Any, Generic, TypeVar
 
 from pydantic import BaseModel
 
+from src.domain.base.events import BaseEvent
 from src.infrastructure.db.uows.base import AbstractUnitOfWork
 from src.logic.mediator.event import EventMediator
 
@@ -24,3 +26,17 @@ class CommandHandler(ABC, Generic[CT, CR]):
 
     @abstractmethod
     async def handle(self, command: CT) -> CR: ...
+
+    async def add_events_to_outbox(self, events: list[BaseEvent]) -> None:
+        messages = await self.uow.outbox.bulk_add(events)
+        # если по ключу уже ждет более старое сообщение (например, упавшее на быстром пути), событие не должно
+        # его обогнать: такие ключи целиком остаются релею, который отправляет их по порядку
+        pending_keys = await self.uow.outbox.find_pending_keys(messages)
+        fast = [
+            (message, event)
+            for message, event in zip(messages, events)
+            if message.partition_key is None or message.partition_key not in pending_keys
+        ]
+        if fast:
+            fast_messages, fast_events = zip(*fast)
+            self.uow.after_commit(partial(self.mediator.publish_after_commit, fast_messages, fast_events))
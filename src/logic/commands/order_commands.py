@@ -1,3 +1,5 @@
+from collections import defaultdict
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import date
 from typing import Annotated, Literal
@@ -11,6 +13,7 @@ from src.infrastructure.db.uows.order_uow import SQLAlchemyOrderUnitOfWork
 from src.infrastructure.logger_adapter.logger import init_logger
 from src.infrastructure.other_service_integration.schedule_service import ScheduleServiceIntegration
 from src.logic.commands.base import BaseCommand, CommandHandler
+from src.logic.dto.order_dto import RevenueDimension, RevenuePaymentDTO, RevenueReportDTO
 from src.logic.events.order_events import OrderPayedEvent, OrderPaymentCanceledEvent
 from src.logic.exceptions.order_exceptions import (
     OrderPaymentNotFoundLogicException,
@@ -91,6 +94,7 @@ class OrderPayCommandHandler(CommandHandler[OrderPayCommand, OrderPayment]):
                 promotion_sale=promotion_sale,
                 user_point_count=user_point_count,
                 input_user_point=command.input_point,
+                promotion_id=promotion.id if promotion else None,
             )
             await self.uow.order_payments.update(entity=order_payment)
             logger.debug(f"{self.__class__.__name__}: uow.commit(); starting pulling events")
@@ -103,7 +107,7 @@ class OrderPayCommandHandler(CommandHandler[OrderPayCommand, OrderPayment]):
                 )
                 events.append(payed_event)
                 logger.debug(f"{self.__class__.__name__}: events: {events}, publushing ...")
-                await self.uow.outbox.bulk_add(events)
+                await self.add_events_to_outbox(events)
                 logger.debug(f"{self.__class__.__name__}: after mediator publish")
             await self.uow.commit()
         return order_payment
@@ -136,7 +140,7 @@ class OrderPaymentCancelCommandHandler(CommandHandler[OrderPaymentCancelCommand,
                 )
                 events.append(payed_event)
                 logger.debug(f"{self.__class__.__name__}: events: {events}, publushing ...")
-                await self.uow.outbox.bulk_add(events)
+                await self.add_events_to_outbox(events)
                 logger.debug(f"{self.__class__.__name__}: after mediator publish")
             await self.uow.commit()
         return order_payment
@@ -192,6 +196,78 @@ class CalculateOrderCommandHandler(CommandHandler[CalculateOrderCommand, TotalAm
             return amount_result
 
 
+REVENUE_REPORT_WATERMARK = "revenue_report"
+REVENUE_REPORT_CHUNK_SIZE = 1000
+# revision берется из последовательности при записи, а видна оплата после коммита: оплата с меньшей revision
+# может закоммититься позже прочитанной большей. Поэтому запуск перечитывает окно под отметкой,
+# повторное применение оплаты отчет не меняет
+REVENUE_REPORT_REVISION_WINDOW = 1000
+
+
+def get_revenue_keys(payment: RevenuePaymentDTO) -> list[tuple[RevenueDimension, int]]:
+    keys: list[tuple[RevenueDimension, int]] = [("master", payment.master_id), ("service", payment.service_id)]
+    if payment.promotion_id:
+        keys.append(("promotion", payment.promotion_id))
+    return keys
+
+
+def get_revenue_report_deltas(
+    removed: Iterable[RevenuePaymentDTO], added: Iterable[RevenuePaymentDTO]
+) -> list[RevenueReportDTO]:
+    # изменение оплаты = вычитание учтенного ранее вклада и добавление текущего
+    totals: dict[tuple, list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+    for payments, sign in ((removed, -1), (added, 1)):
+        for payment in payments:
+            for dimension, key_id in get_revenue_keys(payment):
+                total = totals[(dimension, key_id, payment.year, payment.month)]
+                total[0] += sign
+                total[1] += sign * payment.total_amount
+                total[2] += sign * payment.point_uses
+                total[3] += sign * payment.promotion_sale
+    return [RevenueReportDTO(*key, *total) for key, total in totals.items() if any(total)]
+
+
+class BuildRevenueReportCommand(BaseCommand):
+    chunk_size: PositiveInt = REVENUE_REPORT_CHUNK_SIZE
+    revision_window: int = Field(REVENUE_REPORT_REVISION_WINDOW, ge=0)
+
+
+@dataclass(frozen=True)
+class BuildRevenueReportCommandHandler(CommandHandler[BuildRevenueReportCommand, int]):
+    uow: SQLAlchemyOrderUnitOfWork
+
+    async def handle(self, command: BuildRevenueReportCommand) -> int:
+        processed = 0
+        cursor: int | None = None
+        while True:
+            # каждая пачка коммитится вместе с отметкой, поэтому прерванный запуск продолжится с нее
+            async with self.uow.clone() as uow:
+                watermark = await uow.revenue_reports.lock_watermark(REVENUE_REPORT_WATERMARK)
+                if cursor is None:
+                    cursor = max(watermark - command.revision_window, 0)
+                payments = await uow.revenue_reports.find_changed_payments(
+                    after_revision=cursor, limit=command.chunk_size
+                )
+                if not payments:
+                    break
+                applied = await uow.revenue_reports.find_applied_payments(payment.id for payment in payments)
+                payed = [payment for payment in payments if payment.is_payed and payment.year]
+                payed_ids = {payment.id for payment in payed}
+                await uow.revenue_reports.apply(
+                    deltas=get_revenue_report_deltas(removed=applied, added=payed),
+                    payed=payed,
+                    unpayed_ids=[payment.id for payment in payments if payment.id not in payed_ids],
+                )
+                cursor = payments[-1].revision
+                await uow.revenue_reports.set_watermark(REVENUE_REPORT_WATERMARK, max(watermark, cursor))
+                await uow.commit()
+            processed += len(payments)
+            if len(payments) < command.chunk_size:
+                break
+        logger.info(f"{self.__class__.__name__}: processed {processed} order payments")
+        return processed
+
+
 # Promotions
 class AddPromotionCommand(BaseCommand):
     code: str = Field(..., max_length=15)
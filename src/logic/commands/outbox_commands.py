@@ -0,0 +1,80 @@
+import asyncio
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from pydantic import PositiveInt
+
+from src.infrastructure.db.outbox_archive import OutboxArchive
+from src.infrastructure.db.repositories.outbox import OutboxPartition
+from src.infrastructure.db.uows.outbox_uow import SQLAlchemyOutboxUnitOfWork
+from src.infrastructure.logger_adapter.logger import init_logger
+from src.logic.commands.base import BaseCommand, CommandHandler
+
+logger = init_logger(__name__)
+
+
+class MaintainOutboxPartitionsCommand(BaseCommand):
+    weeks_ahead: PositiveInt = 4
+    retention_days: PositiveInt = 14
+    archive_dir: Path | None = None
+
+
+@dataclass(frozen=True)
+class MaintainOutboxPartitionsCommandHandler(CommandHandler[MaintainOutboxPartitionsCommand, list[str]]):
+    uow: SQLAlchemyOutboxUnitOfWork
+
+    async def handle(self, command: MaintainOutboxPartitionsCommand) -> list[str]:
+        today = date.today()
+        async with self.uow.clone() as uow:
+            default_weeks = await uow.outbox_partitions.find_default_weeks()
+            if default_weeks:
+                # сообщения пришли без партиции своей недели (обслуживание не запускалось или часы ушли вперед):
+                # их недели получают партиции, иначе строки не попадут под очистку
+                logger.error(f"{self.__class__.__name__}: default partition holds weeks {default_weeks}")
+            await uow.outbox_partitions.create_partitions(
+                [OutboxPartition.for_week(week_start) for week_start in default_weeks]
+                + [OutboxPartition.for_week(today + timedelta(weeks=week)) for week in range(command.weeks_ahead + 1)]
+            )
+            partitions = await uow.outbox_partitions.find_partitions()
+            await uow.commit()
+        expired_before = today - timedelta(days=command.retention_days)
+        dropped = []
+        for partition in partitions:
+            if partition.week_end > expired_before:
+                break
+            if await self._drop_partition(partition, command.archive_dir):
+                dropped.append(partition.name)
+        logger.info(f"{self.__class__.__name__}: dropped outbox partitions: {dropped}")
+        return dropped
+
+    async def _drop_partition(self, partition: OutboxPartition, archive_dir: Path | None) -> bool:
+        async with self.uow.clone() as uow:
+            if await uow.outbox_partitions.has_unprocessed(partition):
+                logger.info(f"{self.__class__.__name__}: {partition.name} has unprocessed messages, skipped")
+                return False
+            if archive_dir:
+                path = await self._archive_partition(uow, partition, OutboxArchive(archive_dir))
+                logger.info(f"{self.__class__.__name__}: {partition.name} archived to {path}")
+        async with self.uow.clone() as uow:
+            await uow.outbox_partitions.detach(partition)
+            # отцепленная партиция больше не принимает вставки, поэтому повторная проверка окончательная;
+            # при выходе без коммита партиция остается на месте
+            if await uow.outbox_partitions.has_unprocessed(partition):
+                return False
+            await uow.outbox_partitions.drop(partition)
+            await uow.commit()
+        return True
+
+    @staticmethod
+    async def _archive_partition(
+        uow: SQLAlchemyOutboxUnitOfWork, partition: OutboxPartition, archive: OutboxArchive
+    ) -> Path:
+        file = await asyncio.to_thread(archive.open, partition.name)
+        try:
+            async for rows in uow.outbox_partitions.stream_rows(partition):
+                await asyncio.to_thread(archive.write, file, rows)
+        finally:
+            await asyncio.to_thread(file.close)
+        return await asyncio.to_thread(archive.commit, partition.name)
@@ -1,19 +1,24 @@
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, time, timedelta
 from tempfile import SpooledTemporaryFile
-from typing import Annotated, BinaryIO
+from typing import Annotated, BinaryIO, Self
 
-from pydantic import BaseModel, Field, PositiveInt
+from pydantic import BaseModel, Field, PositiveInt, model_validator
 
-from src.domain.schedules.entities import Master, Order, Schedule
+from src.domain.schedules.entities import Master, Order, Schedule, ScheduleTemplate
+from src.domain.schedules.exceptions import SlotOccupiedException
+from src.infrastructure.db.exceptions import UpdateException
 from src.infrastructure.db.uows.schedule_uow import SQLAlchemyScheduleUnitOfWork
 from src.infrastructure.logger_adapter.logger import init_logger
+from src.infrastructure.redis_adapter.availability_cache import AvailabilityCache
 from src.logic.commands.base import BaseCommand, CommandHandler
-from src.logic.events.schedule_events import OrderCreatedEvent
+from src.logic.dto.schedule_dto import ScheduleDayDTO, ScheduleGenerationDTO
+from src.logic.events.schedule_events import OrderCreatedEvent, OrderRescheduledEvent
 from src.logic.exceptions.order_exceptions import NotUserOrderLogicException
 from src.logic.exceptions.schedule_exceptions import (
     MasterNotFoundLogicException,
     OrderNotFoundLogicException,
+    ScheduleNotFoundLogicException,
     ServiceNotFoundLogicException,
     SlotNotFoundLogicException,
 )
@@ -21,6 +26,9 @@ from src.logic.exceptions.user_exceptions import UserNotFoundLogicException
 
 logger = init_logger(__name__)
 
+# на сколько дней вперед расписания строятся из шаблонов
+SCHEDULE_HORIZON_DAYS = 30
+
 
 class AddMasterCommand(BaseCommand):
     description: str
@@ -58,6 +66,7 @@ class AddScheduleCommand(BaseCommand):
 @dataclass(frozen=True)
 class AddScheduleCommandHandler(CommandHandler[AddScheduleCommand, Schedule]):
     uow: SQLAlchemyScheduleUnitOfWork
+    cache: AvailabilityCache
 
     async def handle(self, command: AddScheduleCommand) -> Schedule:
         async with self.uow:
@@ -67,60 +76,224 @@ class AddScheduleCommandHandler(CommandHandler[AddScheduleCommand, Schedule]):
             schedule = Schedule.add(day=command.day, master_id=command.master_id)
             schedule_from_repo = await self.uow.schedules.add(entity=schedule)
             await self.uow.commit()
+        await self.cache.invalidate_master_schedules([command.master_id])
         return schedule_from_repo
 
 
+weekday_type = Annotated[int, Field(ge=0, le=6)]
+
+
+class GenerateSchedulesCommand(BaseCommand):
+    master_ids: list[PositiveInt] = Field(..., min_length=1)
+    date_from: date
+    date_to: date
+    weekdays: list[weekday_type] | None = None
+
+
+@dataclass(frozen=True)
+class GenerateSchedulesCommandHandler(CommandHandler[GenerateSchedulesCommand, ScheduleGenerationDTO]):
+    uow: SQLAlchemyScheduleUnitOfWork
+    cache: AvailabilityCache
+
+    async def handle(self, command: GenerateSchedulesCommand) -> ScheduleGenerationDTO:
+        master_ids = list(dict.fromkeys(command.master_ids))
+        days = Schedule.get_days(date_from=command.date_from, date_to=command.date_to, weekdays=command.weekdays)
+        async with self.uow:
+            existing_master_ids = await self.uow.masters.find_existing_ids(master_ids)
+            missing_master_ids = set(master_ids) - set(existing_master_ids)
+            if missing_master_ids:
+                raise MasterNotFoundLogicException(id=sorted(missing_master_ids))
+            schedules = Schedule.generate(master_ids=master_ids, days=days)
+            created_schedules = await self.uow.schedules.bulk_add(schedules)
+            await self.uow.commit()
+        await self.cache.invalidate_master_schedules(schedule.master_id for schedule in created_schedules)
+        created_keys = {(schedule.master_id, schedule.day) for schedule in created_schedules}
+        created, skipped = [], []
+        for schedule in schedules:
+            schedule_day = ScheduleDayDTO(master_id=schedule.master_id, day=schedule.day)
+            (created if (schedule.master_id, schedule.day) in created_keys else skipped).append(schedule_day)
+        logger.info(f"{self.__class__.__name__}: created {len(created)} schedules, skipped {len(skipped)}")
+        return ScheduleGenerationDTO(created=created, skipped=skipped)
+
+
+hour_type = Annotated[int, Field(ge=0, le=23)]
+
+
+class SetScheduleTemplateCommand(BaseCommand):
+    master_id: PositiveInt
+    weekday: weekday_type
+    start_hour: hour_type
+    end_hour: hour_type
+    slot_delta: PositiveInt
+
+
+@dataclass(frozen=True)
+class SetScheduleTemplateCommandHandler(CommandHandler[SetScheduleTemplateCommand, ScheduleTemplate]):
+    uow: SQLAlchemyScheduleUnitOfWork
+
+    async def handle(self, command: SetScheduleTemplateCommand) -> ScheduleTemplate:
+        async with self.uow:
+            master = await self.uow.masters.find_one_or_none(id=command.master_id)
+            if not master:
+                raise MasterNotFoundLogicException(id=command.master_id)
+            template = ScheduleTemplate.add(
+                master_id=command.master_id,
+                weekday=command.weekday,
+                start_hour=command.start_hour,
+                end_hour=command.end_hour,
+                slot_delta=command.slot_delta,
+            )
+            template_from_repo = await self.uow.schedule_templates.upsert(entity=template)
+            await self.uow.commit()
+        return template_from_repo
+
+
+def is_materializable(day: date) -> bool:
+    # прошлые дни и дни за горизонтом из шаблона не создаются
+    today = date.today()
+    return today <= day <= today + timedelta(days=SCHEDULE_HORIZON_DAYS)
+
+
+async def materialize_schedule_day(
+    uow: SQLAlchemyScheduleUnitOfWork, master_id: int, day: date
+) -> tuple[int | None, bool]:
+    """
+    Расписание мастера на день: существующее или созданное по шаблону дня недели.
+
+    Возвращает id расписания (None, если его нет и шаблон его не дает) и признак создания.
+    Создание идемпотентно: при параллельном первом обращении вставка проигравшего ничего не делает,
+    и он читает строку победителя.
+    """
+    schedule_id = await uow.schedules.find_schedule_id(master_id=master_id, day=day)
+    if schedule_id or not is_materializable(day):
+        return schedule_id, False
+    template = await uow.schedule_templates.find_one_or_none(master_id=master_id, weekday=day.weekday())
+    if not template:
+        return None, False
+    created = await uow.schedules.bulk_add([template.materialize(day)])
+    if created:
+        return created[0].id, True
+    return await uow.schedules.find_schedule_id(master_id=master_id, day=day), False
+
+
+class MaterializeScheduleDayCommand(BaseCommand):
+    master_id: PositiveInt
+    day: date
+
+
+@dataclass(frozen=True)
+class MaterializeScheduleDayCommandHandler(CommandHandler[MaterializeScheduleDayCommand, int | None]):
+    uow: SQLAlchemyScheduleUnitOfWork
+    cache: AvailabilityCache
+
+    async def handle(self, command: MaterializeScheduleDayCommand) -> int | None:
+        async with self.uow:
+            schedule_id, created = await materialize_schedule_day(self.uow, command.master_id, command.day)
+            if created:
+                await self.uow.commit()
+        if created:
+            await self.cache.invalidate_master_schedules([command.master_id])
+            logger.debug(f"{self.__class__.__name__}: materialized schedule {schedule_id}")
+        return schedule_id
+
+
 slot_type = Annotated[str, Field(pattern=r"^(?:[01][0-9]|2?[0-3]):[0-5]\d$")]
 
 
 class AddOrderCommand(BaseCommand):
-    slot_id: PositiveInt
     service_id: PositiveInt
     user_id: PositiveInt
+    # слот созданного расписания либо время дня мастера, расписание которого создается по шаблону при записи
+    slot_id: PositiveInt | None = None
+    master_id: PositiveInt | None = None
+    day: date | None = None
+    time_start: time | None = None
+
+    @model_validator(mode="after")
+    def check_slot(self) -> Self:
+        if self.slot_id is None and None in (self.master_id, self.day, self.time_start):
+            raise ValueError("slot_id or master_id, day and time_start are required")
+        return self
 
 
 @dataclass(frozen=True)
 class AddOrderCommandHandler(CommandHandler[AddOrderCommand, Order]):
     uow: SQLAlchemyScheduleUnitOfWork
+    cache: AvailabilityCache
 
     async def handle(self, command: AddOrderCommand) -> Order:
+        materialized = False
         async with self.uow:
             logger.debug(f"{self.__class__.__name__}: async with uow: {self.uow}, {self.uow._session}")
-            service = await self.uow.services.find_one_or_none(id=command.service_id)
-            if not service:
-                raise ServiceNotFoundLogicException(id=command.service_id)
-            slot = await self.uow.schedules.find_one_or_none_slot(slot_id=command.slot_id)
-            if not slot:
-                raise SlotNotFoundLogicException(id=command.slot_id)
-            schedule_master_services_ids = await self.uow.schedules.find_master_services_by_schedule(
-                schedule_id=slot.schedule_id
-            )
-            occupied_slots = await self.uow.schedules.find_occupied_slots(schedule_id=slot.schedule_id)
-            occupied_slots_ids = [slot.id for slot in occupied_slots]
-            order_from_aggregate = Order.add(
+            slot_id = command.slot_id
+            if slot_id is None:
+                slot_id, materialized = await self._find_template_slot(command)
+            order_from_aggregate = Order(
                 user_id=command.user_id,
                 service_id=command.service_id,
-                slot_id=command.slot_id,
-                schedule_master_services_ids=schedule_master_services_ids,
-                occupied_slots_ids=occupied_slots_ids,
+                slot_id=slot_id,
             )
-            order_from_repo = await self.uow.orders.add(order_from_aggregate)
+            booking = await self.uow.orders.book_slot(order_from_aggregate)
+            if not booking:
+                raise SlotNotFoundLogicException(id=slot_id)
+            if booking.service_name is None:
+                raise ServiceNotFoundLogicException(id=command.service_id)
+            Order.check_slot_booking(slot_is_free=booking.slot_is_free, service_is_valid=booking.service_is_valid)
+            order_from_aggregate.id = booking.order_id
             logger.debug(f"{self.__class__.__name__}: uow.commit()")
             events = order_from_aggregate.pull_events()
             created_event = OrderCreatedEvent(
-                order_id=order_from_repo.id,
-                slot_time_start=slot.time_start.as_generic_type(),
-                schedule_id=slot.schedule_id,
-                user_id=order_from_repo.user_id,
-                service_name=service.name.as_generic_type(),
-                service_price=service.price.as_generic_type(),
+                order_id=order_from_aggregate.id,
+                slot_time_start=booking.slot_time_start.strftime("%H:%M"),
+                schedule_id=booking.schedule_id,
+                user_id=order_from_aggregate.user_id,
+                service_name=booking.service_name,
+                service_price=booking.service_price,
             )
             events.append(created_event)
             logger.debug(f"{self.__class__.__name__}: created_event, {created_event}")
-            await self.uow.outbox.bulk_add(events)
+            await self.add_events_to_outbox(events)
             logger.debug(f"{self.__class__.__name__}: после медиатор паблиш")
             await self.uow.commit()
-        return order_from_repo
+        await self.cache.invalidate_schedule_slots([booking.schedule_id])
+        if materialized:
+            await self.cache.invalidate_master_schedules([command.master_id])
+        return order_from_aggregate
+
+    async def _find_template_slot(self, command: AddOrderCommand) -> tuple[int, bool]:
+        # день создается в транзакции записи: если запись не прошла, пустое расписание тоже не остается
+        schedule_id, materialized = await materialize_schedule_day(self.uow, command.master_id, command.day)
+        if not schedule_id:
+            raise ScheduleNotFoundLogicException(id=command.master_id)
+        slot_id = await self.uow.schedules.find_slot_id(schedule_id=schedule_id, time_start=command.time_start)
+        if not slot_id:
+            raise SlotNotFoundLogicException(id=schedule_id)
+        return slot_id, materialized
+
+
+class RebuildSlotsOccupancyCommand(BaseCommand):
+    schedule_ids: list[PositiveInt] = Field(..., min_length=1)
+
+
+@dataclass(frozen=True)
+class RebuildSlotsOccupancyCommandHandler(CommandHandler[RebuildSlotsOccupancyCommand, int]):
+    uow: SQLAlchemyScheduleUnitOfWork
+    cache: AvailabilityCache
+
+    async def handle(self, command: RebuildSlotsOccupancyCommand) -> int:
+        async with self.uow:
+            # расписание каждого исправленного слота, по одному на слот
+            fixed_slot_schedule_ids = await self.uow.schedules.rebuild_slots_occupancy(
+                schedule_ids=command.schedule_ids
+            )
+            await self.uow.commit()
+        schedule_ids = set(fixed_slot_schedule_ids)
+        await self.cache.invalidate_schedule_slots(schedule_ids)
+        logger.info(
+            f"{self.__class__.__name__}: fixed occupancy of {len(fixed_slot_schedule_ids)} slots "
+            f"in {len(schedule_ids)} schedules"
+        )
+        return len(fixed_slot_schedule_ids)
 
 
 class UpdateOrderCommand(BaseCommand):
@@ -132,6 +305,7 @@ class UpdateOrderCommand(BaseCommand):
 @dataclass(frozen=True)
 class UpdateOrderCommandHandler(CommandHandler[UpdateOrderCommand, Order]):
     uow: SQLAlchemyScheduleUnitOfWork
+    cache: AvailabilityCache
 
     async def handle(self, command: UpdateOrderCommand) -> Order:
         async with self.uow:
@@ -143,12 +317,28 @@ class UpdateOrderCommandHandler(CommandHandler[UpdateOrderCommand, Order]):
             slot = await self.uow.schedules.find_one_or_none_slot(slot_id=command.slot_id)
             if not slot:
                 raise SlotNotFoundLogicException(id=command.slot_id)
-            occupied_slots = await self.uow.schedules.find_occupied_slots(schedule_id=slot.schedule_id)
-            order.update_slot_time(slot_id=command.slot_id, occupied_slots=occupied_slots)
-            await self.uow.orders.update(order)
+            previous_slot = await self.uow.schedules.find_one_or_none_slot(slot_id=order.slot_id)
+            claimed_schedule_id = await self.uow.schedules.claim_slot(slot_id=slot.id)
+            order.update_slot_time(slot_id=command.slot_id, slot_is_free=claimed_schedule_id is not None)
+            try:
+                await self.uow.orders.update(order)
+            except UpdateException:
+                # слот занят заказом, не отраженным в is_occupied: уникальный индекс uq_order_active_slot
+                raise SlotOccupiedException()
+            schedule_ids = await self.uow.schedules.update_slots_occupancy(free_ids=[previous_slot.id])
+            schedule_ids.add(claimed_schedule_id)
             events = order.pull_events()
-            await self.uow.outbox.bulk_add(events)
+            if previous_slot.schedule_id != slot.schedule_id:
+                # другое расписание может быть другим мастером: отчеты и выручка переносятся на новое
+                events.append(
+                    OrderRescheduledEvent(
+                        order_id=order.id, previous_schedule_id=previous_slot.schedule_id, schedule_id=slot.schedule_id
+                    )
+                )
+                await self.uow.orders.touch_payment(order_id=order.id)
+            await self.add_events_to_outbox(events)
             await self.uow.commit()
+        await self.cache.invalidate_schedule_slots(schedule_ids)
         return order
 
 
@@ -213,6 +403,7 @@ class CancelOrderCommand(BaseCommand):
 @dataclass(frozen=True)
 class CancelOrderCommandHandler(CommandHandler[CancelOrderCommand, Order]):
     uow: SQLAlchemyScheduleUnitOfWork
+    cache: AvailabilityCache
 
     async def handle(self, command: CancelOrderCommand) -> Order:
         async with self.uow:
@@ -223,11 +414,12 @@ class CancelOrderCommandHandler(CommandHandler[CancelOrderCommand, Order]):
                 raise NotUserOrderLogicException()
             order.cancel()
             await self.uow.orders.update(order)
+            schedule_ids = await self.uow.schedules.update_slots_occupancy(free_ids=[order.slot_id])
             logger.debug(f"{self.__class__.__name__}: uow.commit(); starting pulling events")
             events = order.pull_events()
             logger.debug(f"{self.__class__.__name__}: events: {events}, publushing ...")
-            await self.uow.outbox.bulk_add(events)
+            await self.add_events_to_outbox(events)
             logger.debug(f"{self.__class__.__name__}: after mediator publish")
             await self.uow.commit()
-
+        await self.cache.invalidate_schedule_slots(schedule_ids)
         return order
@@ -60,7 +60,7 @@ class AddUserCommandHandler(CommandHandler[AddUserCommand, User]):
                 last_name=user_from_repo.last_name.as_generic_type(),
             )
             events.append(created_event)
-            await self.uow.outbox.bulk_add(events)
+            await self.add_events_to_outbox(events)
             await self.uow.commit()
         return user_from_repo
 
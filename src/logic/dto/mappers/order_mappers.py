@@ -1,5 +1,5 @@
-from src.infrastructure.db.models.orders import OrderPayment, Promotion, UserPoint
-from src.logic.dto.order_dto import OrderPaymentDetailDTO, PromotionDetailDTO, UserPointDTO
+from src.infrastructure.db.models.orders import OrderPayment, Promotion, RevenueReport, UserPoint
+from src.logic.dto.order_dto import OrderPaymentDetailDTO, PromotionDetailDTO, RevenueReportDTO, UserPointDTO
 
 
 def promotion_to_detail_dto_mapper(promotion: Promotion) -> PromotionDetailDTO:
@@ -29,3 +29,16 @@ def order_payment_detail_dto_mapper(order_payment: OrderPayment) -> OrderPayment
         promotion_sale=order_payment.promotion_sale,
         is_payed=order_payment.is_payed,
     )
+
+
+def revenue_report_dto_mapper(report: RevenueReport) -> RevenueReportDTO:
+    return RevenueReportDTO(
+        dimension=report.dimension,
+        key_id=report.key_id,
+        year=report.year,
+        month=report.month,
+        payments_count=report.payments_count,
+        total_amount=report.total_amount,
+        point_uses=report.point_uses,
+        promotion_sale=report.promotion_sale,
+    )
@@ -1,3 +1,5 @@
+from datetime import date, time
+
 from src.infrastructure.db.models.schedules import Master, Service, Schedule, Slot, Order
 from src.logic.dto.mappers.user_mappers import user_to_detail_dto_mapper
 from src.logic.dto.schedule_dto import MasterDetailDTO, ServiceDTO, ScheduleDetailDTO, ScheduleShortDTO, SlotShortDTO, \
@@ -40,6 +42,20 @@ def slot_to_short_dto_mapper(slot: Slot) -> SlotShortDTO:
     )
 
 
+def schedule_short_dto_from_dict_mapper(data: dict) -> ScheduleShortDTO:
+    return ScheduleShortDTO(
+        id=data["id"],
+        day=date.fromisoformat(data["day"]),
+    )
+
+
+def slot_short_dto_from_dict_mapper(data: dict) -> SlotShortDTO:
+    return SlotShortDTO(
+        id=data["id"],
+        time_start=time.fromisoformat(data["time_start"]),
+    )
+
+
 def slot_to_detail_dto_mapper(slot: Slot) -> SlotDetailDTO:
     return SlotDetailDTO(id=slot.id, time_start=slot.time_start, schedule=schedule_to_detail_dto_mapper(slot.schedule))
 
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import Field
 
@@ -8,6 +8,7 @@ from src.logic.dto.base_dto import BaseDTO
 
 int_ge_0 = Annotated[int, Field(ge=0)]
 slot_type = Annotated[str, Field(pattern=r"^(?:[01][0-9]|2?[0-3]):[0-5]\d$")]
+RevenueDimension = Literal["master", "service", "promotion"]
 
 
 @dataclass(frozen=True)
@@ -59,3 +60,30 @@ class OrderShortDTO(BaseDTO):
     service_id: int
     user_id: int
     slot_id: int
+
+
+@dataclass(frozen=True)
+class RevenuePaymentDTO(BaseDTO):
+    id: int
+    master_id: int
+    service_id: int
+    promotion_id: int | None
+    year: int
+    month: int
+    total_amount: int
+    point_uses: int
+    promotion_sale: int
+    is_payed: bool = True
+    revision: int = 0
+
+
+@dataclass(frozen=True)
+class RevenueReportDTO(BaseDTO):
+    dimension: RevenueDimension
+    key_id: int
+    year: int
+    month: int
+    payments_count: int
+    total_amount: int
+    point_uses: int
+    promotion_sale: int
@@ -0,0 +1,28 @@
+from dataclasses import dataclass, field
+
+from src.logic.dto.base_dto import BaseDTO
+
+
+@dataclass(frozen=True)
+class HistogramDTO(BaseDTO):
+    count: int = 0
+    sum_ms: int = 0
+    buckets: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class EventTypeMetricsDTO(BaseDTO):
+    event_type: str
+    published: int
+    failed: int
+    published_per_second: float
+    failed_per_second: float
+    publish_latency: HistogramDTO
+    delivery_delay: HistogramDTO
+
+
+@dataclass(frozen=True)
+class OutboxMetricsDTO(BaseDTO):
+    unprocessed_count: int
+    oldest_unprocessed_age_seconds: float | None
+    event_types: list[EventTypeMetricsDTO]
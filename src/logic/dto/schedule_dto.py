@@ -23,10 +23,23 @@ class MasterDetailDTO(BaseDTO):
 
 @dataclass(frozen=True)
 class ScheduleShortDTO(BaseDTO):
-    id: int
+    # None у дня шаблона, расписание которого еще не создано
+    id: int | None
     day: date
 
 
+@dataclass(frozen=True)
+class ScheduleDayDTO(BaseDTO):
+    master_id: int
+    day: date
+
+
+@dataclass(frozen=True)
+class ScheduleGenerationDTO(BaseDTO):
+    created: list[ScheduleDayDTO]
+    skipped: list[ScheduleDayDTO]
+
+
 @dataclass(frozen=True)
 class ScheduleDetailDTO(BaseDTO):
     id: int
@@ -47,6 +60,26 @@ class SlotDetailDTO(BaseDTO):
     schedule: ScheduleDetailDTO
 
 
+@dataclass(frozen=True)
+class FreeSlotDTO(BaseDTO):
+    id: int
+    time_start: time
+    schedule_id: int
+    day: date
+    master_id: int
+
+
+@dataclass(frozen=True)
+class SlotBookingDTO(BaseDTO):
+    order_id: int | None
+    schedule_id: int
+    slot_time_start: time
+    service_name: str | None
+    service_price: int | None
+    service_is_valid: bool
+    slot_is_free: bool
+
+
 @dataclass(frozen=True)
 class OrderDetailDTO(BaseDTO):
     id: int
@@ -58,6 +91,18 @@ class OrderDetailDTO(BaseDTO):
     photo_after_path: str | None
 
 
+@dataclass(frozen=True)
+class OrderCursorDTO(BaseDTO):
+    date_add: datetime
+    id: int
+
+
+@dataclass(frozen=True)
+class OrderPageDTO(BaseDTO):
+    items: list[OrderDetailDTO]
+    next_cursor: OrderCursorDTO | None
+
+
 @dataclass(frozen=True)
 class ClientOrderDetailDTO(BaseDTO):
     id: int
@@ -74,7 +119,7 @@ class MasterReportDTO(BaseDTO):
     last_name: str
     first_name: str
     total_count: int
-    # total_sum: int
+    total_sum: int
 
 
 @dataclass(frozen=True)
@@ -83,4 +128,4 @@ class ServiceReportDTO(BaseDTO):
     name: str
     price: int
     total_count: int
-    # total_sum: int
+    total_sum: int
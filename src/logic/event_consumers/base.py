@@ -4,6 +4,14 @@ from typing import ClassVar
 
 import aio_pika
 
+from src.domain.base.events import BaseEvent
+from src.infrastructure.broker.converters import convert_broker_message_to_event
+from src.infrastructure.broker.rabbit.consumer import (
+    CONSUMER_CONCURRENCY,
+    CONSUMER_MESSAGE_TIMEOUT_SECONDS,
+    CONSUMER_PREFETCH_COUNT,
+)
+from src.infrastructure.broker.rabbit.consumer_host import ConsumerRegistration
 from src.logic.mediator.base import Mediator
 
 
@@ -13,6 +21,22 @@ class BaseEventConsumer(ABC):
     exchange_name: ClassVar[str]
     queue_name: ClassVar[str]
     routing_key: ClassVar[str]
+    event_cls: ClassVar[type[BaseEvent]]
+    prefetch_count: ClassVar[int] = CONSUMER_PREFETCH_COUNT
+    concurrency: ClassVar[int] = CONSUMER_CONCURRENCY
+    message_timeout: ClassVar[float] = CONSUMER_MESSAGE_TIMEOUT_SECONDS
+
+    def get_registration(self) -> ConsumerRegistration:
+        return ConsumerRegistration(
+            callback=self,
+            queue_name=self.queue_name,
+            prefetch_count=self.prefetch_count,
+            concurrency=self.concurrency,
+            message_timeout=self.message_timeout,
+        )
+
+    def decode_event(self, message: aio_pika.abc.AbstractIncomingMessage) -> BaseEvent:
+        return convert_broker_message_to_event(self.event_cls, message.body)
 
     async def __call__(
         self,
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 import aio_pika
 
-from src.infrastructure.broker.converters import convert_broker_message_to_dict
+from src.domain.schedules.events import OrderCancelledEvent
 from src.infrastructure.logger_adapter.logger import init_logger
 from src.logic.commands.order_commands import (
     AddOrderPaymentCommand,
@@ -11,6 +11,9 @@ from src.logic.commands.order_commands import (
     UpdateUserPointCommand,
 )
 from src.logic.event_consumers.base import BaseEventConsumer
+from src.logic.events.order_events import OrderPayedEvent, OrderPaymentCanceledEvent
+from src.logic.events.schedule_events import OrderCreatedEvent
+from src.logic.events.user_events import UserCreatedEvent
 
 logger = init_logger(__name__)
 
@@ -20,17 +23,17 @@ class UserCreatedEventConsumer(BaseEventConsumer):
     exchange_name = "user_create"
     queue_name = "user_create"
     routing_key = "user_create"
+    event_cls = UserCreatedEvent
 
     async def __call__(
         self,
         message: aio_pika.abc.AbstractIncomingMessage,
     ) -> None:
-        async with message.process():
-            data_dict = convert_broker_message_to_dict(message.body)
-            cmd = AddUserPointCommand(**data_dict)
-            logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
-            results: list = await self.mediator.handle_command(cmd)
-            logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
+        event: UserCreatedEvent = self.decode_event(message)
+        cmd = AddUserPointCommand(user_id=event.user_id)
+        logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
+        results: list = await self.mediator.handle_command(cmd)
+        logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
 
 
 @dataclass(frozen=True)
@@ -38,23 +41,21 @@ class OrderCreatedEventConsumer(BaseEventConsumer):
     exchange_name = "order_create"
     queue_name = "order_create"
     routing_key = "order_create"
+    event_cls = OrderCreatedEvent
+    # AddOrderPaymentCommand ходит в сервис расписаний по http, поэтому больше сообщений обрабатывается одновременно
+    prefetch_count = 40
+    concurrency = 20
 
     async def __call__(
         self,
         message: aio_pika.abc.AbstractIncomingMessage,
     ) -> None:
-        async with message.process():
-            print(f"properties: {message.properties.headers}")
-            data_dict = convert_broker_message_to_dict(message.body)
-            cmd = AddOrderPaymentCommand(**data_dict)
-            logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
-            # for test
-            import asyncio
-
-            await asyncio.sleep(15)
-            raise ValueError
-            # results: list = await self.mediator.handle_command(cmd)
-            # logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
+        logger.debug(f"{self.__class__.__name__}: headers {message.headers}")
+        event: OrderCreatedEvent = self.decode_event(message)
+        cmd = AddOrderPaymentCommand(order_id=event.order_id, service_price=event.service_price)
+        logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
+        results: list = await self.mediator.handle_command(cmd)
+        logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
 
 
 @dataclass(frozen=True)
@@ -62,22 +63,20 @@ class OrderPayedEventConsumer(BaseEventConsumer):
     exchange_name = "order_payed"
     queue_name = "order_payed"
     routing_key = "order_payed"
+    event_cls = OrderPayedEvent
 
     async def __call__(
         self,
         message: aio_pika.abc.AbstractIncomingMessage,
     ) -> None:
-        async with message.process():
-            data_dict = convert_broker_message_to_dict(message.body)
-            point_to_operation = data_dict.get("point_uses")
-            user_point_id = data_dict.get("user_point_id")
-            operation = "-"
-            cmd = UpdateUserPointCommand(
-                user_point_id=user_point_id, point_to_operation=point_to_operation, operation=operation
-            )
-            logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
-            results: list = await self.mediator.handle_command(cmd)
-            logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
+        event: OrderPayedEvent = self.decode_event(message)
+        operation = "-"
+        cmd = UpdateUserPointCommand(
+            user_point_id=event.user_point_id, point_to_operation=event.point_uses, operation=operation
+        )
+        logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
+        results: list = await self.mediator.handle_command(cmd)
+        logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
 
 
 @dataclass(frozen=True)
@@ -85,17 +84,17 @@ class OrderCancelledEventConsumer(BaseEventConsumer):
     exchange_name = "order_cancel"
     queue_name = "order_cancel"
     routing_key = "order_cancel"
+    event_cls = OrderCancelledEvent
 
     async def __call__(
         self,
         message: aio_pika.abc.AbstractIncomingMessage,
     ) -> None:
-        async with message.process():
-            data_dict = convert_broker_message_to_dict(message.body)
-            cmd = OrderPaymentCancelCommand(**data_dict)
-            logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
-            results: list = await self.mediator.handle_command(cmd)
-            logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
+        event: OrderCancelledEvent = self.decode_event(message)
+        cmd = OrderPaymentCancelCommand(order_id=event.order_id, user_id=event.user_id)
+        logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
+        results: list = await self.mediator.handle_command(cmd)
+        logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
 
 
 @dataclass(frozen=True)
@@ -103,19 +102,17 @@ class OrderPaymentCancelledEventConsumer(BaseEventConsumer):
     exchange_name = "order_payment_cancel"
     queue_name = "order_payment_cancel"
     routing_key = "order_payment_cancel"
+    event_cls = OrderPaymentCanceledEvent
 
     async def __call__(
         self,
         message: aio_pika.abc.AbstractIncomingMessage,
     ) -> None:
-        async with message.process():
-            data_dict = convert_broker_message_to_dict(message.body)
-            point_to_operation = data_dict.get("point_uses")
-            user_point_id = data_dict.get("user_point_id")
-            operation = "+"
-            cmd = UpdateUserPointCommand(
-                user_point_id=user_point_id, point_to_operation=point_to_operation, operation=operation
-            )
-            logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
-            results: list = await self.mediator.handle_command(cmd)
-            logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
+        event: OrderPaymentCanceledEvent = self.decode_event(message)
+        operation = "+"
+        cmd = UpdateUserPointCommand(
+            user_point_id=event.user_point_id, point_to_operation=event.point_uses, operation=operation
+        )
+        logger.debug(f"{self.__class__.__name__}: принял {self.routing_key} event: start cmd {cmd}")
+        results: list = await self.mediator.handle_command(cmd)
+        logger.debug(f"{self.__class__.__name__}: result after mediator: {results}")
@@ -3,8 +3,13 @@ from dataclasses import dataclass
 from typing import Any, ClassVar, Generic, TypeVar
 
 from src.domain.base.events import BaseEvent
-from src.infrastructure.broker.converters import convert_event_to_broker_message
-from src.infrastructure.broker.rabbit.producer import Producer
+from src.infrastructure.broker.converters import (
+    OCCURRED_AT_HEADER,
+    convert_event_to_broker_message,
+    get_event_type_name,
+)
+from src.infrastructure.broker.rabbit.connector import MessageNotConfirmedException
+from src.infrastructure.broker.rabbit.producer import OutgoingMessage, Producer
 from src.infrastructure.db.uows.base import AbstractUnitOfWork
 
 ET = TypeVar("ET", bound=BaseEvent)
@@ -25,11 +30,17 @@ class BrokerEventhandler(EventHandler, Generic[ET]):
     exchange_name: ClassVar[str]
     routing_key: ClassVar[str]
 
-    async def handle(self, event: ET) -> None:
-        converted_event = convert_event_to_broker_message(event)
-        await self.message_broker.declare_exchange(self.exchange_name)
-        await self.message_broker.publish_message(
-            message_data=converted_event,
+    def build_message(self, event: ET) -> OutgoingMessage:
+        return OutgoingMessage(
+            body=convert_event_to_broker_message(event),
             exchange_name=self.exchange_name,
             routing_key=self.routing_key,
+            message_type=get_event_type_name(event),
+            # по occurred_at консьюмер считает задержку доставки от возникновения события
+            headers={OCCURRED_AT_HEADER: event.occurred_at.timestamp()},
         )
+
+    async def handle(self, event: ET) -> None:
+        [confirmed] = await self.message_broker.publish_batch([self.build_message(event)])
+        if not confirmed:
+            raise MessageNotConfirmedException()
@@ -1,19 +1,21 @@
 from dataclasses import dataclass
 
-from dataclasses_json import dataclass_json
-
 from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
 from src.infrastructure.db.uows.order_uow import SQLAlchemyOrderUnitOfWork
 from src.logic.events.base import BrokerEventhandler
 
 
-@dataclass_json
+@event_registry.register("order_payment.payed")
 @dataclass(kw_only=True)
 class OrderPayedEvent(BaseEvent):
     order_payment_id: int
     user_point_id: int
     point_uses: int
 
+    def get_partition_key(self) -> str | None:
+        return f"order_payment:{self.order_payment_id}"
+
 
 @dataclass
 class OrderPayedEventHandler(BrokerEventhandler[OrderPayedEvent]):
@@ -22,13 +24,16 @@ class OrderPayedEventHandler(BrokerEventhandler[OrderPayedEvent]):
     routing_key = "order_payed"
 
 
-@dataclass_json
+@event_registry.register("order_payment.cancelled")
 @dataclass(kw_only=True)
 class OrderPaymentCanceledEvent(BaseEvent):
     order_payment_id: int
     user_point_id: int
     point_uses: int
 
+    def get_partition_key(self) -> str | None:
+        return f"order_payment:{self.order_payment_id}"
+
 
 @dataclass
 class OrderPaymentCanceledEventHandler(BrokerEventhandler[OrderPaymentCanceledEvent]):
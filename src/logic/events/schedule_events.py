@@ -1,17 +1,17 @@
 from dataclasses import dataclass
-
-from dataclasses_json import dataclass_json
+from typing import ClassVar
 
 from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
 from src.domain.schedules.events import OrderCancelledEvent
 from src.infrastructure.db.uows.schedule_uow import SQLAlchemyScheduleQueryUnitOfWork, SQLAlchemyScheduleUnitOfWork
 from src.infrastructure.logger_adapter.logger import init_logger
-from src.logic.events.base import BrokerEventhandler, EventHandler
+from src.logic.events.base import ET, BrokerEventhandler, EventHandler
 
 logger = init_logger(__name__)
 
 
-@dataclass_json
+@event_registry.register("order.created")
 @dataclass
 class OrderCreatedEvent(BaseEvent):
     order_id: int
@@ -21,6 +21,20 @@ class OrderCreatedEvent(BaseEvent):
     service_name: str
     service_price: int
 
+    def get_partition_key(self) -> str | None:
+        return f"order:{self.order_id}"
+
+
+@event_registry.register("order.rescheduled")
+@dataclass
+class OrderRescheduledEvent(BaseEvent):
+    order_id: int
+    previous_schedule_id: int
+    schedule_id: int
+
+    def get_partition_key(self) -> str | None:
+        return f"order:{self.order_id}"
+
 
 @dataclass
 class OrderCreatedEmailEventHandler(EventHandler[OrderCreatedEvent]):
@@ -43,3 +57,54 @@ class OrderCanceledBrokerEventHandler(BrokerEventhandler[OrderCancelledEvent]):
     uow: SQLAlchemyScheduleUnitOfWork
     exchange_name = "order_cancel"
     routing_key = "order_cancel"
+
+
+@dataclass
+class OrderReportEventHandler(EventHandler[ET]):
+    uow: SQLAlchemyScheduleUnitOfWork
+    sign: ClassVar[int]
+
+    async def handle(self, event: ET) -> None:
+        # события публикуются параллельно, поэтому у каждого обработчика своя сессия
+        async with self.uow.clone() as uow:
+            applied = await uow.reports.apply_order_event(
+                event_id=event.event_id,
+                order_id=event.order_id,
+                sign=self.sign,
+                schedule_id=self.get_schedule_id(event),
+            )
+            await uow.commit()
+        logger.debug(f"{self.__class__.__name__}: order {event.order_id} applied to reports: {applied}")
+
+    def get_schedule_id(self, event: ET) -> int | None:
+        return None
+
+
+@dataclass
+class OrderCreatedReportEventHandler(OrderReportEventHandler[OrderCreatedEvent]):
+    sign = 1
+
+    def get_schedule_id(self, event: OrderCreatedEvent) -> int | None:
+        # заказ мог быть перенесен до обработки события, перенос придет следующим событием того же ключа
+        return event.schedule_id
+
+
+@dataclass
+class OrderCanceledReportEventHandler(OrderReportEventHandler[OrderCancelledEvent]):
+    sign = -1
+
+
+@dataclass
+class OrderRescheduledReportEventHandler(EventHandler[OrderRescheduledEvent]):
+    uow: SQLAlchemyScheduleUnitOfWork
+
+    async def handle(self, event: OrderRescheduledEvent) -> None:
+        async with self.uow.clone() as uow:
+            applied = await uow.reports.apply_order_move(
+                event_id=event.event_id,
+                order_id=event.order_id,
+                previous_schedule_id=event.previous_schedule_id,
+                schedule_id=event.schedule_id,
+            )
+            await uow.commit()
+        logger.debug(f"{self.__class__.__name__}: order {event.order_id} moved in reports: {applied}")
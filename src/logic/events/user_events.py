@@ -1,13 +1,12 @@
 from dataclasses import dataclass
 
-from dataclasses_json import dataclass_json
-
 from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
 from src.infrastructure.db.uows.users_uow import SQLAlchemyUsersUnitOfWork
 from src.logic.events.base import BrokerEventhandler
 
 
-@dataclass_json
+@event_registry.register("user.created")
 @dataclass
 class UserCreatedEvent(BaseEvent):
     user_id: int
@@ -15,6 +14,9 @@ class UserCreatedEvent(BaseEvent):
     first_name: str
     last_name: str
 
+    def get_partition_key(self) -> str | None:
+        return f"user:{self.user_id}"
+
 
 @dataclass
 class UserCreatedEventHandler(BrokerEventhandler[UserCreatedEvent]):
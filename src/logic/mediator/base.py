@@ -1,11 +1,13 @@
 from collections import defaultdict
-from collections.abc import Iterable
-from dataclasses import dataclass, field
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field, replace
 from typing import Type
 
 from src.domain.base.events import BaseEvent
+from src.infrastructure.broker.rabbit.producer import OutgoingMessage, Producer
+from src.infrastructure.logger_adapter.logger import init_logger
 from src.logic.commands.base import CR, CT, BaseCommand, CommandHandler
-from src.logic.events.base import ET, EventHandler
+from src.logic.events.base import ET, BrokerEventhandler, EventHandler
 from src.logic.exceptions.mediator_exceptions import (
     CommandHandlersNotRegisteredException,
     QueryHandlersNotRegisteredException,
@@ -15,6 +17,8 @@ from src.logic.mediator.event import EventMediator
 from src.logic.mediator.query import QueryMediator
 from src.logic.queries.base import QR, QT, BaseQuery, QueryHandler
 
+logger = init_logger(__name__)
+
 
 @dataclass(eq=False)
 class Mediator(EventMediator, CommandMediator, QueryMediator):
@@ -46,6 +50,37 @@ class Mediator(EventMediator, CommandMediator, QueryMediator):
             handlers: Iterable[EventHandler] = self.events_map[event_type]
             [await handler.handle(event) for handler in handlers]  # type: ignore[func-returns-value]
 
+    async def publish_batch(self, events: Sequence[BaseEvent]) -> list[bool]:
+        """
+        Публикует события пачкой и возвращает успех по каждому событию.
+
+        Обработчики без брокера выполняются по очереди, сообщения в брокер уходят одной пачкой
+        на продюсер с общим ожиданием подтверждений. Событие успешно, если все его обработчики отработали
+        и брокер подтвердил все его сообщения. Порядок доставки внутри пачки не гарантирован,
+        события одного ключа порядка публикуются разными пачками (publish_in_key_order).
+        """
+        succeeded = [True] * len(events)
+        outgoing: dict[Producer, list[tuple[int, OutgoingMessage]]] = defaultdict(list)
+        for index, event in enumerate(events):
+            for handler in self.events_map[event.__class__]:
+                try:
+                    if isinstance(handler, BrokerEventhandler):
+                        outgoing[handler.message_broker].append((index, handler.build_message(event)))
+                    else:
+                        await handler.handle(event)
+                except Exception as err:
+                    logger.error(f"{handler.__class__.__name__}: cannot handle {event}: {err!r}")
+                    succeeded[index] = False
+        for producer, messages in outgoing.items():
+            try:
+                confirmed = await producer.publish_batch([message for _, message in messages])
+            except Exception as err:
+                logger.error(f"{producer.__class__.__name__}: cannot publish batch: {err!r}")
+                confirmed = [False] * len(messages)
+            for (index, _), is_confirmed in zip(messages, confirmed):
+                succeeded[index] = succeeded[index] and is_confirmed
+        return succeeded
+
     async def handle_command(self, command: BaseCommand) -> list[CR]:
         command_type = command.__class__
         handlers = self.commands_map.get(command_type)
@@ -53,7 +88,13 @@ class Mediator(EventMediator, CommandMediator, QueryMediator):
         if not handlers:
             raise CommandHandlersNotRegisteredException(command_type)
 
-        return [await handler.handle(command) for handler in handlers]
+        return [await self._with_own_uow(handler).handle(command) for handler in handlers]
+
+    @staticmethod
+    def _with_own_uow(handler: CommandHandler[CT, CR]) -> CommandHandler[CT, CR]:
+        # обработчики и их uow общие на приложение, а команды идут параллельно (запросы, пул консьюмера);
+        # uow хранит сессию в себе, поэтому каждая команда получает свой, чтобы не делить сессию с соседней
+        return replace(handler, uow=handler.uow.clone())
 
     async def handle_query(self, query: BaseQuery) -> QR:
         query_type = query.__class__
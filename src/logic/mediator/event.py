@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
 from typing import Type
 
 from src.domain.base.events import BaseEvent
+from src.domain.outbox.entities import OutboxMessage
 from src.logic.events.base import ET, EventHandler
+from src.logic.outbox_publisher import OutboxFastPathPublisher
 
 
 @dataclass(eq=False)
@@ -14,9 +16,18 @@ class EventMediator(ABC):
         default_factory=lambda: defaultdict(list),
         kw_only=True,
     )
+    outbox_publisher: OutboxFastPathPublisher | None = field(default=None, kw_only=True)
+
+    def publish_after_commit(self, messages: Sequence[OutboxMessage], events: Sequence[BaseEvent]) -> None:
+        """Отправляет записанные в outbox события сразу после коммита, если включен быстрый путь"""
+        if self.outbox_publisher is not None:
+            self.outbox_publisher.schedule(messages, events)
 
     @abstractmethod
     def register_event(self, event: Type[ET], event_handlers: Iterable[EventHandler[ET]]): ...
 
     @abstractmethod
     async def publish(self, events: Iterable[BaseEvent]): ...
+
+    @abstractmethod
+    async def publish_batch(self, events: Sequence[BaseEvent]) -> list[bool]: ...
@@ -1,56 +1,218 @@
+import argparse
 import asyncio
-import importlib
+import signal
+import time
 
-from typing import Type
+from collections.abc import Collection
+from dataclasses import asdict
+from datetime import datetime, timedelta
 
+import orjson
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
 from src.domain.outbox.entities import OutboxMessage
 from src.infrastructure.logger_adapter.logger import init_logger
 from src.presentation.api.dependencies import setup_container
 
 logger = init_logger(__name__)
 
-from src.domain.outbox.values import MessageType
+from src.infrastructure.db.listener import PostgresNotificationListener
+from src.infrastructure.db.repositories.outbox import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_CHANNEL,
+    OUTBOX_RELAY_LOCK_CLASS,
+    OUTBOX_SHARD_COUNT,
+    OUTBOX_SHARD_LOCK_CLASS,
+)
+from src.infrastructure.db.shards import AdvisoryShardOwnership
 from src.infrastructure.db.uows.outbox_uow import SQLAlchemyOutboxUnitOfWork
+from src.infrastructure.redis_adapter.outbox_metrics import OutboxMetrics
 from src.logic.mediator.base import Mediator
+from src.logic.outbox_publisher import publish_in_key_order
+from src.logic.queries.outbox_queries import GetOutboxMetricsQuery
+from src.presentation.api.settings import OutboxConfig, Settings
+
+
+OUTBOX_PUBLISH_TIMEOUT_SECONDS = 30
 
 
 class OutboxProcessor:
-    def __init__(self, uow: SQLAlchemyOutboxUnitOfWork, mediator: Mediator) -> None:
+    """
+    Публикует захваченную пачку outbox раундами с подтверждениями брокера.
+
+    Разные ключи порядка публикуются одним пакетом, сообщения одного ключа уходят по одному на раунд.
+    Обработанными помечаются только подтвержденные сообщения: в пределах ключа это подтвержденный префикс,
+    сообщения после неподтвержденного не отправляются и остаются в outbox вместе с ним.
+    """
+
+    def __init__(
+        self,
+        uow: SQLAlchemyOutboxUnitOfWork,
+        mediator: Mediator,
+        publish_timeout: float = OUTBOX_PUBLISH_TIMEOUT_SECONDS,
+        grace_seconds: float = 0,
+        metrics: OutboxMetrics | None = None,
+    ) -> None:
         self.uow = uow
         self.mediator = mediator
+        self.publish_timeout = publish_timeout
+        self.grace_seconds = grace_seconds
+        self.metrics = metrics
 
-    def _get_cls_for(self, message_type: MessageType) -> Type:
-        cls = None
-        try:
-            module = importlib.import_module(message_type.module_name)
-            cls = getattr(module, message_type.class_name)
-        except (AttributeError, ModuleNotFoundError) as err:
-            logger.error(err)
-        return cls
-
-    async def process_outbox_message(self) -> None:
+    async def process_outbox_message(
+        self, limit: int = OUTBOX_BATCH_SIZE, shards: Collection[int] | None = None
+    ) -> int:
+        """Публикует пачку сообщений и возвращает число подтвержденных"""
         async with self.uow:
-            messages: list[OutboxMessage] = await self.uow.outbox.get_messages_to_publish()
-            for message in messages:
-                await self._publish_message(message)
-                await self.uow.commit()
-
-    async def _publish_message(self, message):
-        event_cls = self._get_cls_for(message.type)
-        if not event_cls:
-            logger.error(f"not event_cls for message: {message}")
-            return
-        event = event_cls.from_json(message.data)
-        logger.info(f"Start publishing event: {event} ...")
-        publish_task = asyncio.create_task(self.mediator.publish([event]))
-        # publish_task = asyncio.create_task(asyncio.sleep(5))
+            messages: list[OutboxMessage] = await self.uow.outbox.get_messages_to_publish(
+                limit=limit,
+                shards=shards,
+                occurred_before=datetime.now() - timedelta(seconds=self.grace_seconds) if self.grace_seconds else None,
+            )
+            if not messages:
+                return 0
+            confirmed = await self._publish_batch(messages)
+            published_ids = [
+                message.id
+                for sequence in self._group_by_key(messages)
+                for message in self._confirmed_prefix(sequence, confirmed)
+            ]
+            # неопубликованные сообщения остаются в outbox и после коммита снова доступны для захвата
+            await self.uow.outbox.mark_as_published(published_ids)
+            await self.uow.commit()
+        logger.debug(f"{self.__class__.__name__}: published {len(published_ids)} of {len(messages)} messages")
+        return len(published_ids)
+
+    async def _publish_batch(self, messages: list[OutboxMessage]) -> set[str]:
+        decoded: list[tuple[OutboxMessage, BaseEvent]] = []
+        broken_keys = set()
+        for message in messages:
+            if message.partition_key in broken_keys:
+                # сообщение после нераскодированного обогнало бы его
+                continue
+            try:
+                decoded.append((message, event_registry.decode(message.type.as_generic_type(), message.data)))
+            except Exception as err:
+                logger.error(f"{self.__class__.__name__}: cannot decode message {message}: {err}")
+                if message.partition_key is not None:
+                    broken_keys.add(message.partition_key)
+        if not decoded:
+            return set()
+        started = time.perf_counter()
         try:
-            await asyncio.wait_for(publish_task, timeout=30)
+            results = await asyncio.wait_for(
+                publish_in_key_order(
+                    self.mediator.publish_batch,
+                    [message.partition_key for message, _ in decoded],
+                    [event for _, event in decoded],
+                ),
+                timeout=self.publish_timeout,
+            )
         except TimeoutError:
-            return
-        message.update_process_at()
-        logger.debug(f"After update_process_at: {message} ...")
-        await self.uow.outbox.mark_as_published(message)
+            logger.error(f"{self.__class__.__name__}: publish timeout for {len(decoded)} messages")
+            results = [False] * len(decoded)
+        except Exception as err:
+            logger.error(f"{self.__class__.__name__}: publish error for {len(decoded)} messages: {err}")
+            results = [False] * len(decoded)
+        elapsed = time.perf_counter() - started
+        for (message, _), success in zip(decoded, results):
+            self._record(message, elapsed, success)
+        return {message.id for (message, _), success in zip(decoded, results) if success}
+
+    @staticmethod
+    def _group_by_key(messages: list[OutboxMessage]) -> list[list[OutboxMessage]]:
+        sequences: dict[str, list[OutboxMessage]] = {}
+        unordered = []
+        for message in messages:
+            if message.partition_key is None:
+                unordered.append([message])
+            else:
+                sequences.setdefault(message.partition_key, []).append(message)
+        return [*sequences.values(), *unordered]
+
+    @staticmethod
+    def _confirmed_prefix(sequence: list[OutboxMessage], confirmed: set[str]) -> list[OutboxMessage]:
+        prefix = []
+        for message in sequence:
+            if message.id not in confirmed:
+                break
+            prefix.append(message)
+        return prefix
+
+    def _record(self, message: OutboxMessage, elapsed: float, success: bool) -> None:
+        if self.metrics is not None:
+            self.metrics.record_publish(message.type.as_generic_type(), elapsed, success)
+
+
+class OutboxRelay:
+    """
+    Непрерывная доставка outbox: выбирает сообщения пачками, пока они есть, затем ждет NOTIFY от вставки.
+
+    Без уведомлений (нет подписки или сообщение пропущено) опрашивает таблицу с растущим интервалом.
+    С shards релей берет только сообщения своих шардов, поэтому события одного агрегата не обгоняют друг друга
+    при любом числе релеев.
+    """
+
+    def __init__(
+        self,
+        processor: OutboxProcessor,
+        listener: PostgresNotificationListener,
+        config: OutboxConfig,
+        shards: AdvisoryShardOwnership | None = None,
+    ) -> None:
+        self.processor = processor
+        self.listener = listener
+        self.config = config
+        self.shards = shards
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        logger.info(f"{self.__class__.__name__}: stopping")
+        self._stopping.set()
+        self.listener.notify()
+
+    async def _rebalance(self) -> frozenset[int] | None:
+        if self.shards is None:
+            return None
+        return await self.shards.rebalance()
+
+    def _get_wait_timeout(self, delay: float) -> float:
+        # без уведомлений воркер все равно просыпается, чтобы отдать или забрать шарды при смене состава
+        if self.shards is None:
+            return delay
+        return min(delay, self.config.OUTBOX_REBALANCE_SECONDS)
+
+    async def run(self) -> None:
+        try:
+            await self._run()
+        finally:
+            if self.shards is not None:
+                await self.shards.close()
+        logger.info(f"{self.__class__.__name__}: stopped")
+
+    async def _run(self) -> None:
+        delay = self.config.OUTBOX_POLL_MIN_SECONDS
+        async with self.listener:
+            while not self._stopping.is_set():
+                try:
+                    processed = await self.processor.process_outbox_message(
+                        limit=self.config.OUTBOX_BATCH_SIZE, shards=await self._rebalance()
+                    )
+                except Exception as err:
+                    logger.error(f"{self.__class__.__name__}: ошибка обработки outbox: {err}")
+                    processed = 0
+                if processed >= self.config.OUTBOX_BATCH_SIZE:
+                    delay = self.config.OUTBOX_POLL_MIN_SECONDS
+                    continue
+                if processed:
+                    delay = self.config.OUTBOX_POLL_MIN_SECONDS
+                if await self.listener.wait(timeout=self._get_wait_timeout(delay)):
+                    delay = self.config.OUTBOX_POLL_MIN_SECONDS
+                else:
+                    delay = min(delay * 2, self.config.OUTBOX_POLL_MAX_SECONDS)
 
 
 async def start_outbox_process():
@@ -61,5 +223,60 @@ async def start_outbox_process():
     await processor.process_outbox_message()
 
 
+async def start_outbox_relay():
+    container = setup_container()
+    mediator = await container.get(Mediator)
+    uow = await container.get(SQLAlchemyOutboxUnitOfWork)
+    engine = await container.get(AsyncEngine)
+    settings = await container.get(Settings)
+    metrics = await container.get(OutboxMetrics)
+    # пока идет grace-период, свежие сообщения отправляет быстрый путь в процессе, выполнившем команду
+    grace_seconds = settings.outbox.OUTBOX_FAST_PATH_GRACE_SECONDS if settings.outbox.OUTBOX_FAST_PATH_ENABLED else 0
+    relay = OutboxRelay(
+        processor=OutboxProcessor(
+            uow=uow,
+            mediator=mediator,
+            publish_timeout=settings.outbox.OUTBOX_PUBLISH_TIMEOUT_SECONDS,
+            grace_seconds=grace_seconds,
+            metrics=metrics,
+        ),
+        listener=PostgresNotificationListener(engine=engine, channel=OUTBOX_CHANNEL),
+        config=settings.outbox,
+        shards=AdvisoryShardOwnership(
+            engine=engine,
+            shard_count=OUTBOX_SHARD_COUNT,
+            membership_class=OUTBOX_RELAY_LOCK_CLASS,
+            shard_class=OUTBOX_SHARD_LOCK_CLASS,
+        ),
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, relay.stop)
+    metrics.start()
+    try:
+        await relay.run()
+    finally:
+        await metrics.close()
+        await container.close()
+
+
+async def print_outbox_metrics():
+    container = setup_container()
+    mediator = await container.get(Mediator)
+    try:
+        metrics = await mediator.handle_query(GetOutboxMetricsQuery())
+    finally:
+        await container.close()
+    print(orjson.dumps(asdict(metrics), option=orjson.OPT_INDENT_2).decode())
+
+
 if __name__ == "__main__":
-    asyncio.run(start_outbox_process())
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="обработать одну пачку и выйти")
+    mode.add_argument("--metrics", action="store_true", help="вывести метрики outbox и выйти")
+    args = parser.parse_args()
+    if args.metrics:
+        asyncio.run(print_outbox_metrics())
+    else:
+        asyncio.run(start_outbox_process() if args.once else start_outbox_relay())
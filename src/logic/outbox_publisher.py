@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+
+from src.domain.base.events import BaseEvent
+from src.domain.base.registry import event_registry
+from src.domain.outbox.entities import OutboxMessage
+from src.infrastructure.db.uows.outbox_uow import SQLAlchemyOutboxUnitOfWork
+from src.infrastructure.logger_adapter.logger import init_logger
+from src.infrastructure.redis_adapter.outbox_metrics import OutboxMetrics
+
+logger = init_logger(__name__)
+
+OUTBOX_FAST_PATH_TIMEOUT_SECONDS = 10
+
+
+async def publish_in_key_order(
+    publish_batch: Callable[[Sequence[BaseEvent]], Awaitable[list[bool]]],
+    keys: Sequence[str | None],
+    events: Sequence[BaseEvent],
+) -> list[bool]:
+    """
+    Публикует события раундами: в раунд попадает очередное событие каждого ключа, разные ключи идут одной пачкой.
+
+    Внутри пачки брокер может подтвердить и доставить сообщения в любом порядке, поэтому следующее событие ключа
+    отправляется только после подтверждения предыдущего, а после неподтвержденного ключ дальше не публикуется.
+    События без ключа порядка не ждут друг друга и уходят в первом раунде.
+    """
+    results = [False] * len(events)
+    sequences: dict[str | int, deque[int]] = {}
+    for index, key in enumerate(keys):
+        sequences.setdefault(key if key is not None else index, deque()).append(index)
+    while sequences:
+        heads = {key: sequence.popleft() for key, sequence in sequences.items()}
+        confirmed = await publish_batch([events[index] for index in heads.values()])
+        for (key, index), success in zip(heads.items(), confirmed):
+            results[index] = success
+            if not success or not sequences[key]:
+                del sequences[key]
+    return results
+
+
+class OutboxFastPathPublisher:
+    """
+    Публикация событий сразу после коммита команды, не дожидаясь релея.
+
+    Сообщение помечается обработанным только после подтверждения публикации; все, что не удалось отправить
+    (ошибка, таймаут, остановка процесса), остается в outbox и уходит через релей после grace-периода.
+    """
+
+    def __init__(
+        self,
+        publish_batch: Callable[[Sequence[BaseEvent]], Awaitable[list[bool]]],
+        uow: SQLAlchemyOutboxUnitOfWork,
+        timeout: float = OUTBOX_FAST_PATH_TIMEOUT_SECONDS,
+        metrics: OutboxMetrics | None = None,
+    ) -> None:
+        self.publish_batch = publish_batch
+        self.uow = uow
+        self.timeout = timeout
+        self.metrics = metrics
+        self._tasks: set[asyncio.Task] = set()
+
+    def schedule(self, messages: Sequence[OutboxMessage], events: Sequence[BaseEvent]) -> None:
+        task = asyncio.create_task(self._publish(messages, events))
+        # ссылка держит задачу от сборщика мусора до ее завершения
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish(self, messages: Sequence[OutboxMessage], events: Sequence[BaseEvent]) -> None:
+        started = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(
+                publish_in_key_order(self.publish_batch, [message.partition_key for message in messages], events),
+                timeout=self.timeout,
+            )
+        except Exception as err:
+            logger.error(f"{self.__class__.__name__}: {len(events)} events left to the relay: {err!r}")
+            results = [False] * len(events)
+        elapsed = time.perf_counter() - started
+        published_ids = []
+        for message, event, success in zip(messages, events, results):
+            self._record(event, elapsed, success)
+            if not success:
+                # после неподтвержденного события его ключ не публикуется, релей отправит остаток по порядку
+                logger.error(f"{self.__class__.__name__}: {event} left to the relay")
+                continue
+            published_ids.append(message.id)
+        if not published_ids:
+            return
+        try:
+            async with self.uow.clone() as uow:
+                await uow.outbox.mark_as_published(published_ids)
+                await uow.commit()
+        except Exception as err:
+            # релей повторит отправку, обработчики должны переносить повторную доставку
+            logger.error(f"{self.__class__.__name__}: cannot mark messages {published_ids} as published: {err}")
+
+    def _record(self, event: BaseEvent, elapsed: float, success: bool) -> None:
+        if self.metrics is not None:
+            self.metrics.record_publish(event_registry.get_type_name(event), elapsed, success)
+
+    async def close(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,12 +1,20 @@
+from typing import AsyncIterator
+
 from dishka import Provider, Scope, provide
 
 from src.domain.schedules.events import OrderCancelledEvent
 from src.infrastructure.broker.rabbit.consumer import RabbitConsumer
+from src.infrastructure.broker.rabbit.consumer_host import RabbitConsumerHost
 from src.infrastructure.broker.rabbit.producer import Producer
+from src.infrastructure.broker.rabbit.topology import RabbitTopology
 from src.infrastructure.db.uows.order_uow import SQLAlchemyOrderQueryUnitOfWork, SQLAlchemyOrderUnitOfWork
+from src.infrastructure.db.uows.outbox_uow import SQLAlchemyOutboxUnitOfWork
 from src.infrastructure.db.uows.schedule_uow import SQLAlchemyScheduleQueryUnitOfWork, SQLAlchemyScheduleUnitOfWork
 from src.infrastructure.db.uows.users_uow import SQLAlchemyUsersQueryUnitOfWork, SQLAlchemyUsersUnitOfWork
 from src.infrastructure.other_service_integration.schedule_service import ScheduleServiceIntegration
+from src.infrastructure.redis_adapter.availability_cache import AvailabilityCache
+from src.infrastructure.redis_adapter.outbox_metrics import OutboxMetrics
+from src.logic.broker_topology import EVENT_CONSUMERS, build_topology
 from src.logic.commands.order_commands import (
     AddOrderPaymentCommand,
     AddOrderPaymentCommandHandler,
@@ -14,6 +22,8 @@ from src.logic.commands.order_commands import (
     AddPromotionCommandHandler,
     AddUserPointCommand,
     AddUserPointCommandHandler,
+    BuildRevenueReportCommand,
+    BuildRevenueReportCommandHandler,
     CalculateOrderCommand,
     CalculateOrderCommandHandler,
     DeletePromotionCommand,
@@ -27,6 +37,10 @@ from src.logic.commands.order_commands import (
     UpdateUserPointCommand,
     UpdateUserPointCommandHandler,
 )
+from src.logic.commands.outbox_commands import (
+    MaintainOutboxPartitionsCommand,
+    MaintainOutboxPartitionsCommandHandler,
+)
 from src.logic.commands.schedule_commands import (
     AddMasterCommand,
     AddMasterCommandHandler,
@@ -36,6 +50,14 @@ from src.logic.commands.schedule_commands import (
     AddScheduleCommandHandler,
     CancelOrderCommand,
     CancelOrderCommandHandler,
+    GenerateSchedulesCommand,
+    GenerateSchedulesCommandHandler,
+    MaterializeScheduleDayCommand,
+    MaterializeScheduleDayCommandHandler,
+    RebuildSlotsOccupancyCommand,
+    RebuildSlotsOccupancyCommandHandler,
+    SetScheduleTemplateCommand,
+    SetScheduleTemplateCommandHandler,
     StartOrderCommand,
     StartOrderCommandHandler,
     UpdateOrderCommand,
@@ -49,13 +71,6 @@ from src.logic.commands.user_commands import (
     VerifyUserCredentialsCommand,
     VerifyUserCredentialsCommandHandler,
 )
-from src.logic.event_consumers.orders_consumers import (
-    OrderCancelledEventConsumer,
-    OrderCreatedEventConsumer,
-    OrderPayedEventConsumer,
-    OrderPaymentCancelledEventConsumer,
-    UserCreatedEventConsumer,
-)
 from src.logic.events.order_events import (
     OrderPayedEvent,
     OrderPayedEventHandler,
@@ -64,21 +79,35 @@ from src.logic.events.order_events import (
 )
 from src.logic.events.schedule_events import (
     OrderCanceledBrokerEventHandler,
+    OrderCanceledReportEventHandler,
     OrderCreatedBrokerEventHandler,
     OrderCreatedEmailEventHandler,
     OrderCreatedEvent,
+    OrderCreatedReportEventHandler,
+    OrderRescheduledEvent,
+    OrderRescheduledReportEventHandler,
 )
 from src.logic.events.user_events import UserCreatedEvent, UserCreatedEventHandler
 from src.logic.mediator.base import Mediator
 from src.logic.queries.order_queries import (
     GetAllPromotionsQuery,
     GetAllPromotionsQueryHandler,
+    GetRevenueReportQuery,
+    GetRevenueReportQueryHandler,
     OrderPaymentDetailQuery,
     OrderPaymentDetailQueryHandler,
     UserPointQuery,
     UserPointQueryHandler,
 )
 from src.logic.queries.schedule_queries import (
+    ExportMasterReportQuery,
+    ExportMasterReportQueryHandler,
+    ExportOrdersQuery,
+    ExportOrdersQueryHandler,
+    ExportServiceReportQuery,
+    ExportServiceReportQueryHandler,
+    FindEarliestSlotsQuery,
+    FindEarliestSlotsQueryHandler,
     GetAllMasterQuery,
     GetAllMasterQueryHandler,
     GetAllOrdersQuery,
@@ -91,6 +120,8 @@ from src.logic.queries.schedule_queries import (
     GetAllUsersToAddMasterQueryHandler,
     GetMasterByUserQuery,
     GetMasterByUserQueryHandler,
+    GetMasterDaySlotsQuery,
+    GetMasterDaySlotsQueryHandler,
     GetMasterForServiceQuery,
     GetMasterForServiceQueryHandler,
     GetMasterReportQuery,
@@ -108,20 +139,30 @@ from src.logic.queries.schedule_queries import (
     GetUserOrdersQuery,
     GetUserOrdersQueryHandler,
 )
+from src.logic.outbox_publisher import OutboxFastPathPublisher
+from src.logic.queries.outbox_queries import GetOutboxMetricsQuery, GetOutboxMetricsQueryHandler
 from src.logic.queries.user_queries import GetUserByIdQuery, GetUserByIdQueryHandler
+from src.presentation.api.settings import Settings
 
 
 class LogicProvider(Provider):
     scope = Scope.APP
 
     consumer = provide(RabbitConsumer, scope=Scope.APP)
-    user_created_consumer = provide(UserCreatedEventConsumer, scope=Scope.APP)
-    order_created_consumer = provide(OrderCreatedEventConsumer, scope=Scope.APP)
-    order_canceled_consumer = provide(OrderCancelledEventConsumer, scope=Scope.APP)
-    order_payed_consumer = provide(OrderPayedEventConsumer, scope=Scope.APP)
-    order_payment_canceled_consumer = provide(OrderPaymentCancelledEventConsumer, scope=Scope.APP)
     schedule_service_integration = provide(ScheduleServiceIntegration, scope=Scope.APP)
 
+    @provide(scope=Scope.APP)
+    def broker_topology(self) -> RabbitTopology:
+        return build_topology()
+
+    @provide(scope=Scope.APP)
+    async def consumer_host(self, consumer: RabbitConsumer, mediator: Mediator) -> AsyncIterator[RabbitConsumerHost]:
+        host = RabbitConsumerHost(consumer)
+        for consumer_cls in EVENT_CONSUMERS:
+            host.register(consumer_cls(mediator=mediator).get_registration())
+        yield host
+        await host.stop()
+
     @provide(scope=Scope.APP)
     def init_mediator(
         self,
@@ -131,11 +172,22 @@ class LogicProvider(Provider):
         user_query_uow: SQLAlchemyUsersQueryUnitOfWork,
         schedule_query_uow: SQLAlchemyScheduleQueryUnitOfWork,
         order_query_uow: SQLAlchemyOrderQueryUnitOfWork,
+        outbox_uow: SQLAlchemyOutboxUnitOfWork,
+        settings: Settings,
         publisher: Producer,
         schedule_service_integration: ScheduleServiceIntegration,
+        availability_cache: AvailabilityCache,
+        outbox_metrics: OutboxMetrics,
         # connector: RabbitConnector,
     ) -> Mediator:
         mediator = Mediator()
+        if settings.outbox.OUTBOX_FAST_PATH_ENABLED:
+            mediator.outbox_publisher = OutboxFastPathPublisher(
+                publish_batch=mediator.publish_batch,
+                uow=outbox_uow,
+                timeout=settings.outbox.OUTBOX_FAST_PATH_TIMEOUT_SECONDS,
+                metrics=outbox_metrics,
+            )
 
         # commands
         mediator.register_command(AddUserCommand, [AddUserCommandHandler(mediator=mediator, uow=user_uow)])
@@ -144,14 +196,40 @@ class LogicProvider(Provider):
         )
 
         mediator.register_command(AddMasterCommand, [AddMasterCommandHandler(mediator=mediator, uow=schedule_uow)])
-        mediator.register_command(AddScheduleCommand, [AddScheduleCommandHandler(mediator=mediator, uow=schedule_uow)])
-        mediator.register_command(AddOrderCommand, [AddOrderCommandHandler(mediator=mediator, uow=schedule_uow)])
-        mediator.register_command(UpdateOrderCommand, [UpdateOrderCommandHandler(mediator=mediator, uow=schedule_uow)])
+        mediator.register_command(
+            AddScheduleCommand,
+            [AddScheduleCommandHandler(mediator=mediator, uow=schedule_uow, cache=availability_cache)],
+        )
+        mediator.register_command(
+            GenerateSchedulesCommand,
+            [GenerateSchedulesCommandHandler(mediator=mediator, uow=schedule_uow, cache=availability_cache)],
+        )
+        mediator.register_command(
+            SetScheduleTemplateCommand, [SetScheduleTemplateCommandHandler(mediator=mediator, uow=schedule_uow)]
+        )
+        mediator.register_command(
+            MaterializeScheduleDayCommand,
+            [MaterializeScheduleDayCommandHandler(mediator=mediator, uow=schedule_uow, cache=availability_cache)],
+        )
+        mediator.register_command(
+            AddOrderCommand, [AddOrderCommandHandler(mediator=mediator, uow=schedule_uow, cache=availability_cache)]
+        )
+        mediator.register_command(
+            UpdateOrderCommand,
+            [UpdateOrderCommandHandler(mediator=mediator, uow=schedule_uow, cache=availability_cache)],
+        )
         mediator.register_command(
             UpdatePhotoOrderCommand, [UpdatePhotoOrderCommandHandler(mediator=mediator, uow=schedule_uow)]
         )
         mediator.register_command(StartOrderCommand, [StartOrderCommandHandler(mediator=mediator, uow=schedule_uow)])
-        mediator.register_command(CancelOrderCommand, [CancelOrderCommandHandler(mediator=mediator, uow=schedule_uow)])
+        mediator.register_command(
+            CancelOrderCommand,
+            [CancelOrderCommandHandler(mediator=mediator, uow=schedule_uow, cache=availability_cache)],
+        )
+        mediator.register_command(
+            RebuildSlotsOccupancyCommand,
+            [RebuildSlotsOccupancyCommandHandler(mediator=mediator, uow=schedule_uow, cache=availability_cache)],
+        )
 
         mediator.register_command(
             AddPromotionCommand,
@@ -191,6 +269,13 @@ class LogicProvider(Provider):
         mediator.register_command(
             OrderPaymentCancelCommand, [OrderPaymentCancelCommandHandler(mediator=mediator, uow=order_uow)]
         )
+        mediator.register_command(
+            BuildRevenueReportCommand, [BuildRevenueReportCommandHandler(mediator=mediator, uow=order_uow)]
+        )
+        mediator.register_command(
+            MaintainOutboxPartitionsCommand,
+            [MaintainOutboxPartitionsCommandHandler(mediator=mediator, uow=outbox_uow)],
+        )
 
         # query
         mediator.register_query(GetUserByIdQuery, GetUserByIdQueryHandler(uow=user_query_uow))
@@ -200,19 +285,36 @@ class LogicProvider(Provider):
         mediator.register_query(GetAllSchedulesQuery, GetAllSchedulesQueryHandler(uow=schedule_query_uow))
         mediator.register_query(GetAllOrdersQuery, GetAllOrdersQueryHandler(uow=schedule_query_uow))
         mediator.register_query(GetAllUsersToAddMasterQuery, GetAllUsersToAddMasterQueryHandler(uow=schedule_query_uow))
-        mediator.register_query(GetMasterScheduleQuery, GetMasterScheduleQueryHandler(uow=schedule_query_uow))
+        mediator.register_query(
+            GetMasterScheduleQuery, GetMasterScheduleQueryHandler(uow=schedule_query_uow, cache=availability_cache)
+        )
         mediator.register_query(GetMasterForServiceQuery, GetMasterForServiceQueryHandler(uow=schedule_query_uow))
         mediator.register_query(GetServiceForMasterQuery, GetServiceForMasterQueryHandler(uow=schedule_query_uow))
-        mediator.register_query(GetScheduleSlotsQuery, GetScheduleSlotsQueryHandler(uow=schedule_query_uow))
+        mediator.register_query(
+            GetScheduleSlotsQuery, GetScheduleSlotsQueryHandler(uow=schedule_query_uow, cache=availability_cache)
+        )
+        mediator.register_query(
+            GetMasterDaySlotsQuery, GetMasterDaySlotsQueryHandler(uow=schedule_query_uow, mediator=mediator)
+        )
+        mediator.register_query(
+            FindEarliestSlotsQuery, FindEarliestSlotsQueryHandler(uow=schedule_query_uow, mediator=mediator)
+        )
         mediator.register_query(GetUserOrdersQuery, GetUserOrdersQueryHandler(uow=schedule_query_uow))
         mediator.register_query(GetOrderDetailQuery, GetOrderDetailQueryHandler(uow=schedule_query_uow))
         mediator.register_query(GetMasterReportQuery, GetMasterReportQueryHandler(uow=schedule_query_uow))
         mediator.register_query(GetServiceReportQuery, GetServiceReportQueryHandler(uow=schedule_query_uow))
         mediator.register_query(GetMasterByUserQuery, GetMasterByUserQueryHandler(uow=schedule_query_uow))
+        mediator.register_query(ExportOrdersQuery, ExportOrdersQueryHandler(uow=schedule_query_uow))
+        mediator.register_query(ExportMasterReportQuery, ExportMasterReportQueryHandler(uow=schedule_query_uow))
+        mediator.register_query(ExportServiceReportQuery, ExportServiceReportQueryHandler(uow=schedule_query_uow))
 
         mediator.register_query(GetAllPromotionsQuery, GetAllPromotionsQueryHandler(uow=order_query_uow))
         mediator.register_query(UserPointQuery, UserPointQueryHandler(uow=order_query_uow))
         mediator.register_query(OrderPaymentDetailQuery, OrderPaymentDetailQueryHandler(uow=order_query_uow))
+        mediator.register_query(GetRevenueReportQuery, GetRevenueReportQueryHandler(uow=order_query_uow))
+        mediator.register_query(
+            GetOutboxMetricsQuery, GetOutboxMetricsQueryHandler(uow=outbox_uow, metrics=outbox_metrics)
+        )
 
         # events
         mediator.register_event(
@@ -221,15 +323,20 @@ class LogicProvider(Provider):
         )
         mediator.register_event(
             OrderCancelledEvent,
-            [OrderCanceledBrokerEventHandler(uow=schedule_uow, message_broker=publisher)],
+            [
+                OrderCanceledReportEventHandler(uow=schedule_uow),
+                OrderCanceledBrokerEventHandler(uow=schedule_uow, message_broker=publisher),
+            ],
         )
         mediator.register_event(
             OrderCreatedEvent,
             [
+                OrderCreatedReportEventHandler(uow=schedule_uow),
                 OrderCreatedBrokerEventHandler(uow=schedule_uow, message_broker=publisher),
                 OrderCreatedEmailEventHandler(uow=schedule_query_uow),
             ],
         )
+        mediator.register_event(OrderRescheduledEvent, [OrderRescheduledReportEventHandler(uow=schedule_uow)])
         mediator.register_event(OrderPayedEvent, [OrderPayedEventHandler(uow=order_uow, message_broker=publisher)])
         mediator.register_event(
             OrderPaymentCanceledEvent, [OrderPaymentCanceledEventHandler(uow=order_uow, message_broker=publisher)]
@@ -1,9 +1,15 @@
 from dataclasses import dataclass
 
-from pydantic import PositiveInt
+from pydantic import Field, PositiveInt
 
 from src.infrastructure.db.uows.order_uow import SQLAlchemyOrderQueryUnitOfWork
-from src.logic.dto.order_dto import OrderPaymentDetailDTO, PromotionDetailDTO, UserPointDTO
+from src.logic.dto.order_dto import (
+    OrderPaymentDetailDTO,
+    PromotionDetailDTO,
+    RevenueDimension,
+    RevenueReportDTO,
+    UserPointDTO,
+)
 from src.logic.exceptions.schedule_exceptions import OrderNotFoundLogicException
 from src.logic.queries.base import BaseQuery, QueryHandler
 
@@ -19,6 +25,12 @@ class OrderPaymentDetailQuery(BaseQuery):
     order_id: PositiveInt
 
 
+class GetRevenueReportQuery(BaseQuery):
+    dimension: RevenueDimension
+    year: int | None = Field(None, ge=2000)
+    month: int | None = Field(None, ge=1, le=12)
+
+
 @dataclass(frozen=True)
 class GetAllPromotionsQueryHandler(QueryHandler[GetAllPromotionsQuery, list[PromotionDetailDTO]]):
     uow: SQLAlchemyOrderQueryUnitOfWork
@@ -49,3 +61,15 @@ class OrderPaymentDetailQueryHandler(QueryHandler[OrderPaymentDetailQuery, Order
         if not result:
             raise OrderNotFoundLogicException(id=query.order_id)
         return result
+
+
+@dataclass(frozen=True)
+class GetRevenueReportQueryHandler(QueryHandler[GetRevenueReportQuery, list[RevenueReportDTO]]):
+    uow: SQLAlchemyOrderQueryUnitOfWork
+
+    async def handle(self, query: GetRevenueReportQuery) -> list[RevenueReportDTO]:
+        async with self.uow:
+            results = await self.uow.revenue_reports.find_all(
+                dimension=query.dimension, year=query.year, month=query.month
+            )
+        return results
@@ -0,0 +1,60 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.infrastructure.db.uows.outbox_uow import SQLAlchemyOutboxUnitOfWork
+from src.infrastructure.redis_adapter.outbox_metrics import (
+    DELIVERY_DELAY,
+    FAILED,
+    PUBLISH_LATENCY,
+    PUBLISHED,
+    OutboxMetrics,
+)
+from src.logic.dto.outbox_dto import EventTypeMetricsDTO, HistogramDTO, OutboxMetricsDTO
+from src.logic.queries.base import BaseQuery, QueryHandler
+
+
+class GetOutboxMetricsQuery(BaseQuery): ...
+
+
+def get_histogram(totals: dict[str, int], metric: str, event_type: str) -> HistogramDTO:
+    prefix = f"{metric}|{event_type}|"
+    buckets = {field.removeprefix(prefix): value for field, value in totals.items() if field.startswith(prefix)}
+    return HistogramDTO(
+        count=sum(buckets.values()),
+        sum_ms=totals.get(f"{metric}_sum_ms|{event_type}", 0),
+        buckets=buckets,
+    )
+
+
+@dataclass(frozen=True)
+class GetOutboxMetricsQueryHandler(QueryHandler[GetOutboxMetricsQuery, OutboxMetricsDTO]):
+    uow: SQLAlchemyOutboxUnitOfWork
+    metrics: OutboxMetrics
+
+    async def handle(self, query: GetOutboxMetricsQuery) -> OutboxMetricsDTO:
+        async with self.uow.clone() as uow:
+            unprocessed_count, oldest = await uow.outbox.get_lag()
+        totals = await self.metrics.read_totals()
+        rates = await self.metrics.read_rates()
+        counters: dict[str, dict[str, int]] = defaultdict(dict)
+        for field, value in totals.items():
+            metric, event_type, *_ = field.split("|")
+            counters[event_type][metric] = value
+        event_types = [
+            EventTypeMetricsDTO(
+                event_type=event_type,
+                published=values.get(PUBLISHED, 0),
+                failed=values.get(FAILED, 0),
+                published_per_second=rates.get(f"{PUBLISHED}|{event_type}", 0),
+                failed_per_second=rates.get(f"{FAILED}|{event_type}", 0),
+                publish_latency=get_histogram(totals, PUBLISH_LATENCY, event_type),
+                delivery_delay=get_histogram(totals, DELIVERY_DELAY, event_type),
+            )
+            for event_type, values in sorted(counters.items())
+        ]
+        return OutboxMetricsDTO(
+            unprocessed_count=unprocessed_count,
+            oldest_unprocessed_age_seconds=(datetime.now() - oldest).total_seconds() if oldest else None,
+            event_types=event_types,
+        )
@@ -1,12 +1,25 @@
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
+from datetime import date, timedelta
 
-from pydantic import PositiveInt
+from pydantic import Field, PositiveInt
 
+from src.domain.schedules.entities import OrderStatus, Schedule, ScheduleTemplate
 from src.infrastructure.db.uows.schedule_uow import SQLAlchemyScheduleQueryUnitOfWork
+from src.infrastructure.redis_adapter.availability_cache import (
+    MASTER_SCHEDULES_KIND,
+    SCHEDULE_SLOTS_KIND,
+    AvailabilityCache,
+)
+from src.logic.commands.schedule_commands import SCHEDULE_HORIZON_DAYS, MaterializeScheduleDayCommand
+from src.logic.dto.mappers.schedule_mappers import schedule_short_dto_from_dict_mapper, slot_short_dto_from_dict_mapper
 from src.logic.dto.schedule_dto import (
+    FreeSlotDTO,
     MasterDetailDTO,
     MasterReportDTO,
+    OrderCursorDTO,
     OrderDetailDTO,
+    OrderPageDTO,
     ScheduleDetailDTO,
     ScheduleShortDTO,
     ServiceDTO,
@@ -15,6 +28,7 @@ from src.logic.dto.schedule_dto import (
 )
 from src.logic.dto.user_dto import UserDetailDTO
 from src.logic.exceptions.schedule_exceptions import OrderNotFoundLogicException
+from src.logic.mediator.command import CommandMediator
 from src.logic.queries.base import BaseQuery, QueryHandler
 
 
@@ -28,16 +42,43 @@ class GetAllMasterQuery(BaseQuery): ...
 class GetAllSchedulesQuery(BaseQuery): ...
 
 
-class GetAllOrdersQuery(BaseQuery): ...
+class OrderFilterQuery(BaseQuery):
+    status: OrderStatus | None = None
+    master_id: PositiveInt | None = None
+    service_id: PositiveInt | None = None
+    date_from: date | None = None
+    date_to: date | None = None
+
+
+class OrderListQuery(OrderFilterQuery):
+    limit: PositiveInt = Field(20, le=100)
+    after: OrderCursorDTO | None = None
+
+
+class GetAllOrdersQuery(OrderListQuery): ...
+
+
+class ExportOrdersQuery(OrderFilterQuery): ...
+
+
+class ReportPeriodQuery(BaseQuery):
+    year: int | None = Field(None, ge=2000)
+    month: int | None = Field(None, ge=1, le=12)
+
+
+class ExportMasterReportQuery(ReportPeriodQuery): ...
+
+
+class ExportServiceReportQuery(ReportPeriodQuery): ...
 
 
 class GetAllUsersToAddMasterQuery(BaseQuery): ...
 
 
-class GetMasterReportQuery(BaseQuery): ...
+class GetMasterReportQuery(ReportPeriodQuery): ...
 
 
-class GetServiceReportQuery(BaseQuery): ...
+class GetServiceReportQuery(ReportPeriodQuery): ...
 
 
 class GetMasterForServiceQuery(BaseQuery):
@@ -56,7 +97,20 @@ class GetScheduleSlotsQuery(BaseQuery):
     schedule_id: PositiveInt
 
 
-class GetUserOrdersQuery(BaseQuery):
+class GetMasterDaySlotsQuery(BaseQuery):
+    master_id: PositiveInt
+    day: date
+
+
+class FindEarliestSlotsQuery(BaseQuery):
+    service_id: PositiveInt
+    date_from: date
+    date_to: date
+    masters_id: list[PositiveInt] | None = None
+    limit: PositiveInt = Field(10, le=100)
+
+
+class GetUserOrdersQuery(OrderListQuery):
     user_id: PositiveInt
 
 
@@ -68,6 +122,67 @@ class GetMasterByUserQuery(BaseQuery):
     user_id: PositiveInt
 
 
+def get_missing_template_days(
+    templates: list[ScheduleTemplate],
+    existing_days: set[tuple[int, date]],
+    date_from: date,
+    date_to: date,
+    limit: int,
+    cutoff: tuple[date, str] | None = None,
+) -> list[tuple[int, date]]:
+    """
+    Несозданные дни шаблонов по порядку начала дня, пока их слотов хватает на limit.
+
+    День несозданного расписания свободен целиком, поэтому его слоты начинаются с первого слота сетки;
+    дни, начинающиеся не раньше cutoff, ответ не изменят.
+    """
+    candidates = sorted(
+        (
+            (day, template.grid.time_at(0), template)
+            for template in templates
+            for day in Schedule.get_days(date_from=date_from, date_to=date_to, weekdays=[template.weekday])
+            if (template.master_id, day) not in existing_days
+        ),
+        key=lambda candidate: (candidate[0], candidate[1], candidate[2].master_id),
+    )
+    missing_days = []
+    slots_count = 0
+    for day, first_time, template in candidates:
+        if slots_count >= limit or (cutoff is not None and (day, first_time) >= cutoff):
+            break
+        missing_days.append((template.master_id, day))
+        slots_count += template.grid.slots_count
+    return missing_days
+
+
+def get_order_filters(query: OrderFilterQuery) -> dict:
+    return {
+        "status": query.status,
+        "master_id": query.master_id,
+        "service_id": query.service_id,
+        "date_from": query.date_from,
+        "date_to": query.date_to,
+    }
+
+
+def get_order_page_filters(query: OrderListQuery) -> dict:
+    # на страницу берем на один заказ больше, чтобы понять, есть ли следующая
+    return {"limit": query.limit + 1, "after": query.after, **get_order_filters(query)}
+
+
+def get_master_report_period(query: ReportPeriodQuery) -> dict:
+    # отчет по мастерам строится за один месяц, по умолчанию за текущий
+    today = date.today()
+    return {"year": query.year or today.year, "month": query.month or today.month}
+
+
+def get_order_page(orders: list[OrderDetailDTO], limit: int) -> OrderPageDTO:
+    if len(orders) <= limit:
+        return OrderPageDTO(items=orders, next_cursor=None)
+    items = orders[:limit]
+    return OrderPageDTO(items=items, next_cursor=OrderCursorDTO(date_add=items[-1].date_add, id=items[-1].id))
+
+
 @dataclass(frozen=True)
 class GetAllServiceQueryHandler(QueryHandler[GetAllServiceQuery, list[ServiceDTO]]):
     uow: SQLAlchemyScheduleQueryUnitOfWork
@@ -99,13 +214,13 @@ class GetAllSchedulesQueryHandler(QueryHandler[GetAllSchedulesQuery, list[Schedu
 
 
 @dataclass(frozen=True)
-class GetAllOrdersQueryHandler(QueryHandler[GetAllOrdersQuery, list[OrderDetailDTO]]):
+class GetAllOrdersQueryHandler(QueryHandler[GetAllOrdersQuery, OrderPageDTO]):
     uow: SQLAlchemyScheduleQueryUnitOfWork
 
-    async def handle(self, query: GetAllOrdersQuery) -> list[OrderDetailDTO]:
+    async def handle(self, query: GetAllOrdersQuery) -> OrderPageDTO:
         async with self.uow:
-            results = await self.uow.orders.find_all()
-        return results
+            results = await self.uow.orders.find_page(**get_order_page_filters(query))
+        return get_order_page(results, limit=query.limit)
 
 
 @dataclass(frozen=True)
@@ -121,10 +236,36 @@ class GetAllUsersToAddMasterQueryHandler(QueryHandler[GetAllUsersToAddMasterQuer
 @dataclass(frozen=True)
 class GetMasterScheduleQueryHandler(QueryHandler[GetMasterScheduleQuery, list[ScheduleShortDTO]]):
     uow: SQLAlchemyScheduleQueryUnitOfWork
+    cache: AvailabilityCache
 
     async def handle(self, query: GetMasterScheduleQuery) -> list[ScheduleShortDTO]:
+        schedules = await self.cache.get_or_compute(
+            MASTER_SCHEDULES_KIND,
+            query.master_id,
+            compute=lambda: self._find_schedules(query.master_id),
+            loader=schedule_short_dto_from_dict_mapper,
+        )
+        return await self._add_template_days(query.master_id, schedules)
+
+    async def _add_template_days(self, master_id: int, schedules: list[ScheduleShortDTO]) -> list[ScheduleShortDTO]:
+        # дни шаблона без расписания отдаются без id: строки появятся при первом запросе слотов дня или записи
+        today = date.today()
+        async with self.uow:
+            templates = await self.uow.schedules.find_templates(master_ids=[master_id])
+        existing_days = {schedule.day for schedule in schedules}
+        template_days = [
+            ScheduleShortDTO(id=None, day=day)
+            for template in templates
+            for day in Schedule.get_days(
+                date_from=today, date_to=today + timedelta(days=SCHEDULE_HORIZON_DAYS), weekdays=[template.weekday]
+            )
+            if day not in existing_days
+        ]
+        return sorted([*schedules, *template_days], key=lambda schedule: schedule.day)
+
+    async def _find_schedules(self, master_id: int) -> list[ScheduleShortDTO]:
         async with self.uow:
-            results = await self.uow.schedules.get_schedule_for_master(master_id=query.master_id)
+            results = await self.uow.schedules.get_schedule_for_master(master_id=master_id)
         return results
 
 
@@ -151,23 +292,93 @@ class GetServiceForMasterQueryHandler(QueryHandler[GetServiceForMasterQuery, lis
 @dataclass(frozen=True)
 class GetScheduleSlotsQueryHandler(QueryHandler[GetScheduleSlotsQuery, list[SlotShortDTO]]):
     uow: SQLAlchemyScheduleQueryUnitOfWork
+    cache: AvailabilityCache
 
     async def handle(self, query: GetScheduleSlotsQuery) -> list[SlotShortDTO]:
+        return await self.cache.get_or_compute(
+            SCHEDULE_SLOTS_KIND,
+            query.schedule_id,
+            compute=lambda: self._find_free_slots(query.schedule_id),
+            loader=slot_short_dto_from_dict_mapper,
+        )
+
+    async def _find_free_slots(self, schedule_id: int) -> list[SlotShortDTO]:
         async with self.uow:
-            results = await self.uow.schedules.find_free_slots(schedule_id=query.schedule_id)
+            results = await self.uow.schedules.find_free_slots(schedule_id=schedule_id)
         return results
 
 
 @dataclass(frozen=True)
-class GetUserOrdersQueryHandler(QueryHandler[GetUserOrdersQuery, list[OrderDetailDTO]]):
+class GetMasterDaySlotsQueryHandler(QueryHandler[GetMasterDaySlotsQuery, list[SlotShortDTO]]):
     uow: SQLAlchemyScheduleQueryUnitOfWork
+    mediator: CommandMediator
 
-    async def handle(self, query: GetUserOrdersQuery) -> list[OrderDetailDTO]:
+    async def handle(self, query: GetMasterDaySlotsQuery) -> list[SlotShortDTO]:
+        # день по шаблону создается при первом запросе, дальше команда только находит его расписание
+        await self.mediator.handle_command(MaterializeScheduleDayCommand(master_id=query.master_id, day=query.day))
         async with self.uow:
-            results = await self.uow.orders.find_all(user_id=query.user_id)
+            results = await self.uow.schedules.find_free_slots_for_day(master_id=query.master_id, day=query.day)
         return results
 
 
+@dataclass(frozen=True)
+class FindEarliestSlotsQueryHandler(QueryHandler[FindEarliestSlotsQuery, list[FreeSlotDTO]]):
+    uow: SQLAlchemyScheduleQueryUnitOfWork
+    mediator: CommandMediator
+
+    async def handle(self, query: FindEarliestSlotsQuery) -> list[FreeSlotDTO]:
+        results = await self._find_slots(query)
+        # создаются только дни по шаблону, которые попадают в ответ раньше уже найденных слотов
+        missing_days = await self._find_missing_days(query, results)
+        if not missing_days:
+            return results
+        for master_id, day in missing_days:
+            await self.mediator.handle_command(MaterializeScheduleDayCommand(master_id=master_id, day=day))
+        return await self._find_slots(query)
+
+    async def _find_slots(self, query: FindEarliestSlotsQuery) -> list[FreeSlotDTO]:
+        async with self.uow:
+            results = await self.uow.schedules.find_earliest_free_slots(
+                service_id=query.service_id,
+                date_from=query.date_from,
+                date_to=query.date_to,
+                masters_id=query.masters_id,
+                limit=query.limit,
+            )
+        return results
+
+    async def _find_missing_days(
+        self, query: FindEarliestSlotsQuery, results: list[FreeSlotDTO]
+    ) -> list[tuple[int, date]]:
+        today = date.today()
+        date_from = max(query.date_from, today)
+        date_to = min(query.date_to, today + timedelta(days=SCHEDULE_HORIZON_DAYS))
+        if date_from > date_to:
+            return []
+        async with self.uow:
+            templates = await self.uow.schedules.find_templates(
+                master_ids=query.masters_id, service_id=query.service_id
+            )
+            if not templates:
+                return []
+            existing_days = await self.uow.schedules.find_existing_days(
+                master_ids=list({template.master_id for template in templates}), date_from=date_from, date_to=date_to
+            )
+        # слоты дальше последнего найденного в полный ответ уже не попадут
+        cutoff = (results[-1].day, f"{results[-1].time_start:%H:%M}") if len(results) >= query.limit else None
+        return get_missing_template_days(templates, existing_days, date_from, date_to, limit=query.limit, cutoff=cutoff)
+
+
+@dataclass(frozen=True)
+class GetUserOrdersQueryHandler(QueryHandler[GetUserOrdersQuery, OrderPageDTO]):
+    uow: SQLAlchemyScheduleQueryUnitOfWork
+
+    async def handle(self, query: GetUserOrdersQuery) -> OrderPageDTO:
+        async with self.uow:
+            results = await self.uow.orders.find_page(user_id=query.user_id, **get_order_page_filters(query))
+        return get_order_page(results, limit=query.limit)
+
+
 @dataclass(frozen=True)
 class GetOrderDetailQueryHandler(QueryHandler[GetOrderDetailQuery, OrderDetailDTO | None]):
     uow: SQLAlchemyScheduleQueryUnitOfWork
@@ -186,7 +397,7 @@ class GetMasterReportQueryHandler(QueryHandler[GetMasterReportQuery, list[Master
 
     async def handle(self, query: GetMasterReportQuery) -> list[MasterReportDTO]:
         async with self.uow:
-            results = await self.uow.masters.get_order_report_by_master(month=1)
+            results = await self.uow.masters.get_order_report_by_master(**get_master_report_period(query))
         return results
 
 
@@ -196,7 +407,7 @@ class GetServiceReportQueryHandler(QueryHandler[GetServiceReportQuery, list[Serv
 
     async def handle(self, query: GetServiceReportQuery) -> list[ServiceReportDTO]:
         async with self.uow:
-            results = await self.uow.orders.get_order_report_by_service()
+            results = await self.uow.orders.get_order_report_by_service(year=query.year, month=query.month)
         return results
 
 
@@ -208,3 +419,43 @@ class GetMasterByUserQueryHandler(QueryHandler[GetMasterByUserQuery, MasterDetai
         async with self.uow:
             results = await self.uow.masters.find_one_or_none(user_id=query.user_id)
         return results
+
+
+# стриминг держит сессию дольше обычного запроса, поэтому каждая выгрузка работает в своем uow
+@dataclass(frozen=True)
+class ExportOrdersQueryHandler(QueryHandler[ExportOrdersQuery, AsyncIterator[list[dict]]]):
+    uow: SQLAlchemyScheduleQueryUnitOfWork
+
+    async def handle(self, query: ExportOrdersQuery) -> AsyncIterator[list[dict]]:
+        return self._stream(query)
+
+    async def _stream(self, query: ExportOrdersQuery) -> AsyncIterator[list[dict]]:
+        async with self.uow.clone() as uow:
+            async for rows in uow.orders.stream_export(**get_order_filters(query)):
+                yield rows
+
+
+@dataclass(frozen=True)
+class ExportMasterReportQueryHandler(QueryHandler[ExportMasterReportQuery, AsyncIterator[list[dict]]]):
+    uow: SQLAlchemyScheduleQueryUnitOfWork
+
+    async def handle(self, query: ExportMasterReportQuery) -> AsyncIterator[list[dict]]:
+        return self._stream(query)
+
+    async def _stream(self, query: ExportMasterReportQuery) -> AsyncIterator[list[dict]]:
+        async with self.uow.clone() as uow:
+            async for rows in uow.masters.stream_order_report_by_master(**get_master_report_period(query)):
+                yield rows
+
+
+@dataclass(frozen=True)
+class ExportServiceReportQueryHandler(QueryHandler[ExportServiceReportQuery, AsyncIterator[list[dict]]]):
+    uow: SQLAlchemyScheduleQueryUnitOfWork
+
+    async def handle(self, query: ExportServiceReportQuery) -> AsyncIterator[list[dict]]:
+        return self._stream(query)
+
+    async def _stream(self, query: ExportServiceReportQuery) -> AsyncIterator[list[dict]]:
+        async with self.uow.clone() as uow:
+            async for rows in uow.orders.stream_order_report_by_service(year=query.year, month=query.month):
+                yield rows
@@ -0,0 +1,26 @@
+import base64
+import binascii
+
+from datetime import datetime
+
+from src.logic.dto.schedule_dto import OrderCursorDTO
+from src.presentation.api.exceptions import NotCorrectDataHTTPException
+
+CURSOR_SEPARATOR = "|"
+
+
+def encode_order_cursor(cursor: OrderCursorDTO | None) -> str | None:
+    if not cursor:
+        return None
+    raw = f"{cursor.date_add.isoformat()}{CURSOR_SEPARATOR}{cursor.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_order_cursor(value: str | None) -> OrderCursorDTO | None:
+    if not value:
+        return None
+    try:
+        date_add, order_id = base64.urlsafe_b64decode(value.encode()).decode().split(CURSOR_SEPARATOR)
+        return OrderCursorDTO(date_add=datetime.fromisoformat(date_add), id=int(order_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise NotCorrectDataHTTPException(detail="Некорректный курсор страницы")
@@ -0,0 +1,45 @@
+import csv
+import io
+
+from collections.abc import AsyncIterator
+from typing import Literal
+
+import orjson
+
+from fastapi.responses import StreamingResponse
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def ndjson_chunks(partitions: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+async def csv_chunks(partitions: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer: csv.DictWriter | None = None
+    async for rows in partitions:
+        if not rows:
+            continue
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def export_response(partitions: AsyncIterator[list[dict]], export_format: ExportFormat, name: str) -> StreamingResponse:
+    chunks = csv_chunks(partitions) if export_format == "csv" else ndjson_chunks(partitions)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'},
+    )
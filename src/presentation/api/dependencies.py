@@ -6,6 +6,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from src.infrastructure.broker.rabbit.provider import RabbitProvider
 from src.infrastructure.db.provider import DBProvider
 from src.infrastructure.other_service_integration.provider import OtherServiceProvider
+from src.infrastructure.redis_adapter.provider import RedisProvider
 from src.logic.mediator.base import Mediator
 from src.logic.provider import LogicProvider
 from src.logic.queries.schedule_queries import GetMasterByUserQuery
@@ -91,6 +92,7 @@ def setup_container() -> AsyncContainer:
     container = make_async_container(
         DBProvider(),
         RabbitProvider(),
+        RedisProvider(),
         LogicProvider(),
         MyFastapiProvider(),
         OtherServiceProvider(),
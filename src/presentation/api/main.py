@@ -1,9 +1,6 @@
-import asyncio
-
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
-from dishka import AsyncContainer
 from dishka.integrations.fastapi import setup_dishka
 from fastapi import FastAPI
 from fastapi_cache import FastAPICache
@@ -12,17 +9,13 @@ from sqladmin import Admin
 from sqlalchemy.ext.asyncio import AsyncEngine
 from starlette.staticfiles import StaticFiles
 
-from src.infrastructure.broker.rabbit.consumer import RabbitConsumer
+from src.infrastructure.broker.rabbit.channel_pool import RabbitChannelPool
+from src.infrastructure.broker.rabbit.consumer_host import RabbitConsumerHost
 from src.infrastructure.db.utils import media_dir
+from src.infrastructure.redis_adapter.outbox_metrics import OutboxMetrics
 from src.infrastructure.redis_adapter.redis_connector import RedisConnectorFactory
 from src.infrastructure.tkq.broker import taskiq_broker
-from src.logic.event_consumers.orders_consumers import (
-    OrderCancelledEventConsumer,
-    OrderCreatedEventConsumer,
-    OrderPayedEventConsumer,
-    OrderPaymentCancelledEventConsumer,
-    UserCreatedEventConsumer,
-)
+from src.logic.mediator.base import Mediator
 from src.presentation.api.admin.auth import authentication_backend
 from src.presentation.api.admin.views import (
     MasterAdmin,
@@ -36,6 +29,7 @@ from src.presentation.api.admin.views import (
 )
 from src.presentation.api.dependencies import setup_container
 from src.presentation.api.orders.router import router as order_router
+from src.presentation.api.outbox.router import router as outbox_router
 from src.presentation.api.schedules.router import router as schedule_router
 from src.presentation.api.users.router import router_auth, router_users
 
@@ -46,6 +40,7 @@ def create_fastapi_app() -> FastAPI:
     app.include_router(router_users)
     app.include_router(schedule_router)
     app.include_router(order_router)
+    app.include_router(outbox_router)
     setup_dishka(container, app)
     return app
 
@@ -63,36 +58,6 @@ async def add_sql_admin(app: FastAPI):
     admin.add_view(OrderAdmin)
 
 
-async def start_consumer(container: AsyncContainer):
-    user_created_consumer = await container.get(UserCreatedEventConsumer)
-    order_created_consumer = await container.get(OrderCreatedEventConsumer)
-    order_payed_consumer = await container.get(OrderPayedEventConsumer)
-    order_payment_canceled_consumer = await container.get(OrderPaymentCancelledEventConsumer)
-    order_canceled_consumer = await container.get(OrderCancelledEventConsumer)
-    base_consumer: RabbitConsumer = await container.get(RabbitConsumer)
-
-    consumers = [
-        user_created_consumer,
-        order_created_consumer,
-        order_payed_consumer,
-        order_payment_canceled_consumer,
-        order_canceled_consumer,
-    ]
-    tasks = []
-    for consumer in consumers:
-        # create task in loop
-        coro = asyncio.create_task(
-            base_consumer.consume_messages(
-                consumer,
-                queue_name=consumer.queue_name,
-                exchange_name=consumer.exchange_name,
-                routing_key=consumer.routing_key,
-            )
-        )
-        tasks.append(coro)
-    return tasks
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     redis_connector = RedisConnectorFactory.create()
@@ -100,8 +65,14 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     FastAPICache.init(RedisBackend(redis_connection), prefix="cache")
     await add_sql_admin(app)
 
-    consumer_tasks = await start_consumer(app.state.dishka_container)
-    app.state.consumer_tasks = consumer_tasks
+    # соединение с брокером, топология и каналы публикации готовы до первого запроса, а не к первой публикации
+    await app.state.dishka_container.get(RabbitChannelPool)
+
+    outbox_metrics = await app.state.dishka_container.get(OutboxMetrics)
+    outbox_metrics.start()
+
+    consumer_host = await app.state.dishka_container.get(RabbitConsumerHost)
+    await consumer_host.start()
 
     if not taskiq_broker.is_worker_process:
         await taskiq_broker.startup()
@@ -111,12 +82,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     if not taskiq_broker.is_worker_process:
         await taskiq_broker.shutdown()
 
-    for task in app.state.consumer_tasks:
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+    await consumer_host.stop()
+
+    # неотправленное быстрым путем все равно доставит релей, ожидание только сокращает задержку
+    mediator = await app.state.dishka_container.get(Mediator)
+    if mediator.outbox_publisher is not None:
+        await mediator.outbox_publisher.close()
+    await outbox_metrics.close()
 
     if redis_connection:
         await redis_connection.close()
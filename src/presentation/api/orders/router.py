@@ -1,13 +1,15 @@
 from dataclasses import asdict
+from typing import Annotated
 
 from dishka import FromDishka
 from dishka.integrations.fastapi import DishkaRoute
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from starlette import status
 
 from src.domain.orders.entities import Promotion
 from src.domain.orders.exceptions import OrderIsPayedException
 from src.infrastructure.db.exceptions import InsertException
+from src.infrastructure.tkq.tasks import build_revenue_report
 from src.logic.commands.order_commands import (
     AddPromotionCommand,
     CalculateOrderCommand,
@@ -15,10 +17,15 @@ from src.logic.commands.order_commands import (
     OrderPayCommand,
     UpdatePromotionCommand,
 )
-from src.logic.dto.order_dto import PromotionDetailDTO
+from src.logic.dto.order_dto import PromotionDetailDTO, RevenueDimension, RevenueReportDTO
 from src.logic.exceptions.base_exception import NotFoundLogicException
 from src.logic.mediator.base import Mediator
-from src.logic.queries.order_queries import GetAllPromotionsQuery, OrderPaymentDetailQuery, UserPointQuery
+from src.logic.queries.order_queries import (
+    GetAllPromotionsQuery,
+    GetRevenueReportQuery,
+    OrderPaymentDetailQuery,
+    UserPointQuery,
+)
 from src.presentation.api.exceptions import (
     NotCorrectDataHTTPException,
     NotFoundHTTPException,
@@ -30,6 +37,7 @@ from src.presentation.api.orders.schema import (
     PromotionAddSchema,
     PromotionDetailSchema,
     PromotionSchema,
+    RevenueReportSchema,
     TotalAmountInputSchema,
     TotalAmountSchema,
     UserPointSchema,
@@ -112,6 +120,28 @@ async def order_pay(
     return order_payment_schema
 
 
+@router.get("/revenue_report/{dimension}/", description="выручка по мастерам, услугам или промокодам за месяц")
+async def get_revenue_report(
+    dimension: RevenueDimension,
+    # admin: FromDishka[CurrentAdmin],
+    mediator: FromDishka[Mediator],
+    year: Annotated[int | None, Query(ge=2000)] = None,
+    month: Annotated[int | None, Query(ge=1, le=12)] = None,
+) -> list[RevenueReportSchema]:
+    results: list[RevenueReportDTO] = await mediator.handle_query(
+        GetRevenueReportQuery(dimension=dimension, year=year, month=month)
+    )
+    return [RevenueReportSchema.model_validate(result) for result in results]
+
+
+@router.post("/revenue_report/build/", status_code=status.HTTP_202_ACCEPTED)
+async def build_revenue_report_now(
+    # admin: FromDishka[CurrentAdmin],
+) -> dict:
+    task = await build_revenue_report.kiq()
+    return {"task_id": task.task_id}
+
+
 @router.post("/promotion/add/", status_code=status.HTTP_201_CREATED)
 async def add_promotion(
     promotion_data: PromotionAddSchema,
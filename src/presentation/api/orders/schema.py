@@ -59,3 +59,13 @@ class OrderPaymentDetailSchema(BaseSchema):
     point_uses: int
     promotion_sale: int
     is_payed: bool
+
+
+class RevenueReportSchema(BaseSchema):
+    key_id: int
+    year: int
+    month: int
+    payments_count: int
+    total_amount: int
+    point_uses: int
+    promotion_sale: int
@@ -0,0 +1,19 @@
+from dishka import FromDishka
+from dishka.integrations.fastapi import DishkaRoute
+from fastapi import APIRouter
+
+from src.logic.dto.outbox_dto import OutboxMetricsDTO
+from src.logic.mediator.base import Mediator
+from src.logic.queries.outbox_queries import GetOutboxMetricsQuery
+from src.presentation.api.outbox.schema import OutboxMetricsSchema
+
+router = APIRouter(route_class=DishkaRoute, prefix="/api", tags=["outbox"])
+
+
+@router.get("/outbox/metrics/", description="отставание outbox, скорость и задержки публикации событий")
+async def get_outbox_metrics(
+    # admin: FromDishka[CurrentAdmin],
+    mediator: FromDishka[Mediator],
+) -> OutboxMetricsSchema:
+    metrics: OutboxMetricsDTO = await mediator.handle_query(GetOutboxMetricsQuery())
+    return OutboxMetricsSchema.model_validate(metrics)
@@ -0,0 +1,23 @@
+from src.presentation.api.base.base_schema import BaseSchema
+
+
+class HistogramSchema(BaseSchema):
+    count: int
+    sum_ms: int
+    buckets: dict[str, int]
+
+
+class EventTypeMetricsSchema(BaseSchema):
+    event_type: str
+    published: int
+    failed: int
+    published_per_second: float
+    failed_per_second: float
+    publish_latency: HistogramSchema
+    delivery_delay: HistogramSchema
+
+
+class OutboxMetricsSchema(BaseSchema):
+    unprocessed_count: int
+    oldest_unprocessed_age_seconds: float | None
+    event_types: list[EventTypeMetricsSchema]
@@ -1,31 +1,42 @@
+from datetime import date, timedelta
 from typing import Annotated
 
 from dishka import FromDishka
 from dishka.integrations.fastapi import DishkaRoute
 from fastapi import APIRouter, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 
-from src.domain.schedules.entities import Master, Order, Schedule
+from src.domain.schedules.entities import Master, Order, OrderStatus, Schedule, ScheduleTemplate
 from src.domain.schedules.exceptions import (
     OrderNotInProgressException,
     OrderNotReceivedException,
+    ScheduleTemplateInvalidException,
     SlotOccupiedException,
+    SlotServiceInvalidException,
 )
 from src.infrastructure.db.exceptions import InsertException, UpdateException
+from src.infrastructure.tkq.tasks import rebuild_slots_occupancy
 from src.logic.commands.schedule_commands import (
+    SCHEDULE_HORIZON_DAYS,
     AddMasterCommand,
     AddOrderCommand,
     AddScheduleCommand,
     CancelOrderCommand,
+    GenerateSchedulesCommand,
     PhotoType,
+    SetScheduleTemplateCommand,
     StartOrderCommand,
     UpdateOrderCommand,
     UpdatePhotoOrderCommand,
 )
 from src.logic.dto.schedule_dto import (
+    FreeSlotDTO,
     MasterDetailDTO,
     MasterReportDTO,
     OrderDetailDTO,
+    OrderPageDTO,
     ScheduleDetailDTO,
+    ScheduleGenerationDTO,
     ScheduleShortDTO,
     ServiceDTO,
     ServiceReportDTO,
@@ -36,11 +47,16 @@ from src.logic.exceptions.base_exception import NotFoundLogicException
 from src.logic.exceptions.order_exceptions import NotUserOrderLogicException
 from src.logic.mediator.base import Mediator
 from src.logic.queries.schedule_queries import (
+    ExportMasterReportQuery,
+    ExportOrdersQuery,
+    ExportServiceReportQuery,
+    FindEarliestSlotsQuery,
     GetAllMasterQuery,
     GetAllOrdersQuery,
     GetAllSchedulesQuery,
     GetAllServiceQuery,
     GetAllUsersToAddMasterQuery,
+    GetMasterDaySlotsQuery,
     GetMasterForServiceQuery,
     GetMasterReportQuery,
     GetMasterScheduleQuery,
@@ -50,6 +66,8 @@ from src.logic.queries.schedule_queries import (
     GetServiceReportQuery,
     GetUserOrdersQuery,
 )
+from src.presentation.api.base.pagination import decode_order_cursor, encode_order_cursor
+from src.presentation.api.base.streaming import ExportFormat, export_response
 from src.presentation.api.dependencies import CurrentMaster, CurrentUser
 from src.presentation.api.exceptions import (
     CannotUpdateDataToDatabase,
@@ -60,6 +78,8 @@ from src.presentation.api.exceptions import (
 )
 from src.presentation.api.schedules.schema import (
     AllOrderDetailSchema,
+    AllOrderPageSchema,
+    FreeSlotSchema,
     MasterAddSchema,
     MasterDetailSchema,
     MasterReportSchema,
@@ -67,20 +87,41 @@ from src.presentation.api.schedules.schema import (
     MasterWithoutServiceSchema,
     OrderCreateSchema,
     OrderDetailSchema,
+    OrderFilterSchema,
+    OrderListSchema,
+    OrderPageSchema,
     OrderReportSchema,
     OrderSchema,
     OrderUpdateSchema,
+    ReportPeriodSchema,
     ScheduleAddSchema,
     ScheduleDay,
     ScheduleDetailSchema,
+    ScheduleGenerateSchema,
+    ScheduleGenerationSchema,
     ScheduleSchema,
+    ScheduleTemplateAddSchema,
+    ScheduleTemplateSchema,
     ServiceSchema,
+    SlotsOccupancyRebuildSchema,
     SlotTimeSchema,
 )
 from src.presentation.api.users.schema import AllUserSchema
 
 router = APIRouter(route_class=DishkaRoute, prefix="/api", tags=["schedule"])
 
+def get_order_filter_params(filters: OrderFilterSchema) -> dict:
+    params = filters.model_dump(include=set(OrderFilterSchema.model_fields), exclude={"status"})
+    params["status"] = OrderStatus(filters.status) if filters.status else None
+    return params
+
+
+def get_order_list_params(filters: OrderListSchema) -> dict:
+    params = get_order_filter_params(filters)
+    params["limit"] = filters.limit
+    params["after"] = decode_order_cursor(filters.cursor)
+    return params
+
 
 @router.get("/services/")
 # @cache(expire=60)
@@ -126,17 +167,16 @@ async def get_schedules(
 
 
 @router.get("/all_orders/", description="все заказы для просмотра мастером")
-# @cache(expire=60)
 async def get_all_orders(
     mediator: FromDishka[Mediator],
-) -> list[AllOrderDetailSchema]:
-    results: list[OrderDetailDTO] = await mediator.handle_query(GetAllOrdersQuery())
-    order_schemas = [AllOrderDetailSchema.model_validate(result) for result in results]
-    return order_schemas
+    filters: Annotated[OrderListSchema, Query()],
+) -> AllOrderPageSchema:
+    page: OrderPageDTO = await mediator.handle_query(GetAllOrdersQuery(**get_order_list_params(filters)))
+    order_schemas = [AllOrderDetailSchema.model_validate(result) for result in page.items]
+    return AllOrderPageSchema(items=order_schemas, next_cursor=encode_order_cursor(page.next_cursor))
 
 
 @router.get("/master_schedules/")
-# @cache(expire=60)
 async def get_master_schedules(
     master: FromDishka[CurrentMaster],
     mediator: FromDishka[Mediator],
@@ -177,7 +217,6 @@ async def get_schedules_for_master(
 
 
 @router.get("/slots/{schedule_pk}/", description="Все свободное время на день")
-# @cache(expire=60)
 async def get_slot_for_day(
     schedule_pk: int,
     mediator: FromDishka[Mediator],
@@ -187,15 +226,48 @@ async def get_slot_for_day(
     return slot_schemas
 
 
+@router.get("/master/{master_pk}/days/{day}/slots/", description="Все свободное время мастера на день")
+async def get_master_slots_for_day(
+    master_pk: int,
+    day: date,
+    mediator: FromDishka[Mediator],
+) -> list[SlotTimeSchema]:
+    results: list[SlotShortDTO] = await mediator.handle_query(GetMasterDaySlotsQuery(master_id=master_pk, day=day))
+    slot_schemas = [SlotTimeSchema.model_validate(result) for result in results]
+    return slot_schemas
+
+
+@router.get("/service/{service_pk}/earliest_slots/", description="ближайшее свободное время у всех мастеров услуги")
+async def get_earliest_slots_for_service(
+    service_pk: int,
+    mediator: FromDishka[Mediator],
+    date_from: date | None = None,
+    date_to: date | None = None,
+    masters_id: Annotated[list[int] | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+) -> list[FreeSlotSchema]:
+    date_from = date_from or date.today()
+    date_to = date_to or date_from + timedelta(days=SCHEDULE_HORIZON_DAYS)
+    results: list[FreeSlotDTO] = await mediator.handle_query(
+        FindEarliestSlotsQuery(
+            service_id=service_pk, date_from=date_from, date_to=date_to, masters_id=masters_id, limit=limit
+        )
+    )
+    slot_schemas = [FreeSlotSchema.model_validate(result) for result in results]
+    return slot_schemas
+
+
 @router.get("/orders/", description="все заказы клиента")
-# @cache(expire=60)
 async def get_client_orders(
     user: FromDishka[CurrentUser],
     mediator: FromDishka[Mediator],
-) -> list[OrderDetailSchema]:
-    results: list[OrderDetailDTO] = await mediator.handle_query(GetUserOrdersQuery(user_id=user.id))
-    order_schemas = [OrderDetailSchema.model_validate(result) for result in results]
-    return order_schemas
+    filters: Annotated[OrderListSchema, Query()],
+) -> OrderPageSchema:
+    page: OrderPageDTO = await mediator.handle_query(
+        GetUserOrdersQuery(user_id=user.id, **get_order_list_params(filters))
+    )
+    order_schemas = [OrderDetailSchema.model_validate(result) for result in page.items]
+    return OrderPageSchema(items=order_schemas, next_cursor=encode_order_cursor(page.next_cursor))
 
 
 @router.get("/order/{order_id}/", description="детальный просмотр заказа")
@@ -218,8 +290,9 @@ async def get_order_detial(
 async def get_master_report(
     # admin: FromDishka[CurrentAdmin],
     mediator: FromDishka[Mediator],
+    period: Annotated[ReportPeriodSchema, Query()],
 ) -> list[MasterReportSchema]:
-    results: list[MasterReportDTO] = await mediator.handle_query(GetMasterReportQuery())
+    results: list[MasterReportDTO] = await mediator.handle_query(GetMasterReportQuery(**period.model_dump()))
     master_schemas = [MasterReportSchema.model_validate(result) for result in results]
     return master_schemas
 
@@ -229,12 +302,43 @@ async def get_master_report(
 async def get_service_report(
     # admin: FromDishka[CurrentAdmin],
     mediator: FromDishka[Mediator],
+    period: Annotated[ReportPeriodSchema, Query()],
 ) -> list[OrderReportSchema]:
-    results: list[ServiceReportDTO] = await mediator.handle_query(GetServiceReportQuery())
+    results: list[ServiceReportDTO] = await mediator.handle_query(GetServiceReportQuery(**period.model_dump()))
     order_schema = [OrderReportSchema.model_validate(result) for result in results]
     return order_schema
 
 
+@router.get("/export/orders/", description="выгрузка заказов в ndjson или csv")
+async def export_orders(
+    mediator: FromDishka[Mediator],
+    filters: Annotated[OrderFilterSchema, Query()],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    partitions = await mediator.handle_query(ExportOrdersQuery(**get_order_filter_params(filters)))
+    return export_response(partitions, export_format, name="orders")
+
+
+@router.get("/export/master_report/")
+async def export_master_report(
+    mediator: FromDishka[Mediator],
+    period: Annotated[ReportPeriodSchema, Query()],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    partitions = await mediator.handle_query(ExportMasterReportQuery(**period.model_dump()))
+    return export_response(partitions, export_format, name="master_report")
+
+
+@router.get("/export/service_report/")
+async def export_service_report(
+    mediator: FromDishka[Mediator],
+    period: Annotated[ReportPeriodSchema, Query()],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    partitions = await mediator.handle_query(ExportServiceReportQuery(**period.model_dump()))
+    return export_response(partitions, export_format, name="service_report")
+
+
 @router.post("/schedule/add/", status_code=status.HTTP_201_CREATED)
 async def add_schedule(
     schedule_data: ScheduleAddSchema,
@@ -253,6 +357,48 @@ async def add_schedule(
     return schedule_schema
 
 
+@router.put("/master/{master_pk}/templates/")
+async def set_schedule_template(
+    master_pk: int,
+    template_data: ScheduleTemplateAddSchema,
+    mediator: FromDishka[Mediator],
+) -> ScheduleTemplateSchema:
+    try:
+        template: ScheduleTemplate = (
+            await mediator.handle_command(SetScheduleTemplateCommand(master_id=master_pk, **template_data.model_dump()))
+        )[0]
+    except NotFoundLogicException as err:
+        raise NotFoundHTTPException(detail=err.title)
+    except ScheduleTemplateInvalidException as err:
+        raise NotCorrectDataHTTPException(detail=err.title)
+    template_schema = ScheduleTemplateSchema.model_validate(template.to_dict())
+    return template_schema
+
+
+@router.post("/schedules/generate/", status_code=status.HTTP_201_CREATED)
+async def generate_schedules(
+    schedule_data: ScheduleGenerateSchema,
+    mediator: FromDishka[Mediator],
+) -> ScheduleGenerationSchema:
+    try:
+        generation: ScheduleGenerationDTO = (
+            await mediator.handle_command(GenerateSchedulesCommand(**schedule_data.model_dump(exclude_unset=True)))
+        )[0]
+    except NotFoundLogicException as err:
+        raise NotFoundHTTPException(detail=err.title)
+    generation_schema = ScheduleGenerationSchema.model_validate(generation)
+    return generation_schema
+
+
+@router.post("/schedules/slots/rebuild/", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_schedule_slots(
+    rebuild_data: SlotsOccupancyRebuildSchema,
+    # admin: FromDishka[CurrentAdmin],
+) -> dict:
+    task = await rebuild_slots_occupancy.kiq(schedule_ids=rebuild_data.schedule_ids)
+    return {"task_id": task.task_id}
+
+
 @router.post("/order/add/", status_code=status.HTTP_201_CREATED)
 async def add_order(
     order_data: OrderCreateSchema,
@@ -264,6 +410,9 @@ async def add_order(
             await mediator.handle_command(
                 AddOrderCommand(
                     slot_id=order_data.slot_id,
+                    master_id=order_data.master_id,
+                    day=order_data.day,
+                    time_start=order_data.time_start,
                     service_id=order_data.service_id,
                     user_id=user.id,
                 ),
@@ -271,7 +420,7 @@ async def add_order(
         )[0]
     except NotFoundLogicException as err:
         raise NotFoundHTTPException(detail=err.title)
-    except SlotOccupiedException as err:
+    except (SlotOccupiedException, SlotServiceInvalidException) as err:
         raise NotCorrectDataHTTPException(detail=err.title)
     order_schema = OrderSchema.model_validate(order.to_dict())
     # order_create_send_mail_task.delay(order_dict)
@@ -1,10 +1,14 @@
 from datetime import date, datetime, time
+from typing import Annotated, Self
 
-from pydantic import PositiveInt, field_serializer
+from pydantic import Field, PositiveInt, field_serializer, model_validator
 
 from src.presentation.api.base.base_schema import BaseSchema, int_ge_0
 from src.presentation.api.users.schema import AllUserSchema, UserFIOSchema
 
+# одна генерация создает расписания максимум на квартал вперед
+SCHEDULE_GENERATE_MAX_DAYS = 92
+
 # slot_type = Annotated[str, Field(pattern=r"^(?:[01][0-9]|2?[0-3]):[0-5]{1}\d{1}$")]
 
 
@@ -62,7 +66,12 @@ class MasterReportSchema(BaseSchema):
     last_name: str
     first_name: str
     total_count: int
-    # total_sum: int
+    total_sum: int
+
+
+class ReportPeriodSchema(BaseSchema):
+    year: int | None = Field(None, ge=2000)
+    month: int | None = Field(None, ge=1, le=12)
 
 
 class ScheduleAddSchema(BaseSchema):
@@ -70,6 +79,47 @@ class ScheduleAddSchema(BaseSchema):
     master_id: int
 
 
+class ScheduleTemplateAddSchema(BaseSchema):
+    weekday: Annotated[int, Field(ge=0, le=6)]
+    start_hour: Annotated[int, Field(ge=0, le=23)]
+    end_hour: Annotated[int, Field(ge=0, le=23)]
+    slot_delta: PositiveInt
+
+
+class ScheduleTemplateSchema(ScheduleTemplateAddSchema):
+    id: int
+    master_id: int
+
+
+class ScheduleGenerateSchema(BaseSchema):
+    master_ids: list[PositiveInt] = Field(..., min_length=1)
+    date_from: date
+    date_to: date
+    weekdays: list[Annotated[int, Field(ge=0, le=6)]] | None = None
+
+    @model_validator(mode="after")
+    def check_date_range(self) -> Self:
+        if self.date_to < self.date_from:
+            raise ValueError("date_to must be greater than or equal to date_from")
+        if (self.date_to - self.date_from).days >= SCHEDULE_GENERATE_MAX_DAYS:
+            raise ValueError(f"Date range must not exceed {SCHEDULE_GENERATE_MAX_DAYS} days")
+        return self
+
+
+class SlotsOccupancyRebuildSchema(BaseSchema):
+    schedule_ids: list[PositiveInt] = Field(..., min_length=1)
+
+
+class ScheduleMasterDaySchema(BaseSchema):
+    master_id: int
+    day: date
+
+
+class ScheduleGenerationSchema(BaseSchema):
+    created: list[ScheduleMasterDaySchema]
+    skipped: list[ScheduleMasterDaySchema]
+
+
 class ScheduleSchema(BaseSchema):
     id: int
     day: date
@@ -91,8 +141,20 @@ class SlotTimeSchema(BaseSchema):
     time_start: time
 
 
-class ScheduleDay(BaseSchema):
+class FreeSlotSchema(BaseSchema):
     id: int
+    time_start: time
+    schedule_id: int
+    day: date
+    master_id: int
+
+    @field_serializer("time_start")
+    def serialize_time_start(self, time_start: time, _info):
+        return time_start.strftime("%H:%M")
+
+
+class ScheduleDay(BaseSchema):
+    id: int | None
     day: date
 
 
@@ -113,8 +175,18 @@ class OrderUpdateSchema(BaseSchema):
 class OrderCreateSchema(BaseSchema):
     # point: int_ge_0 | None = 0
     # promotion_code: str | None = "0"
-    slot_id: PositiveInt
     service_id: PositiveInt
+    # слот созданного расписания либо мастер, день и время дня шаблона
+    slot_id: PositiveInt | None = None
+    master_id: PositiveInt | None = None
+    day: date | None = None
+    time_start: time | None = None
+
+    @model_validator(mode="after")
+    def check_slot(self) -> Self:
+        if self.slot_id is None and None in (self.master_id, self.day, self.time_start):
+            raise ValueError("slot_id or master_id, day and time_start are required")
+        return self
 
 
 class OrderUpdatePhotoSchema(BaseSchema):
@@ -153,9 +225,32 @@ class AllOrderDetailSchema(OrderDetailSchema):
     user: AllUserSchema
 
 
+class OrderFilterSchema(BaseSchema):
+    status: Annotated[int, Field(ge=1, le=4)] | None = None
+    master_id: PositiveInt | None = None
+    service_id: PositiveInt | None = None
+    date_from: date | None = None
+    date_to: date | None = None
+
+
+class OrderListSchema(OrderFilterSchema):
+    limit: Annotated[int, Field(ge=1, le=100)] = 20
+    cursor: str | None = None
+
+
+class OrderPageSchema(BaseSchema):
+    items: list[OrderDetailSchema]
+    next_cursor: str | None
+
+
+class AllOrderPageSchema(BaseSchema):
+    items: list[AllOrderDetailSchema]
+    next_cursor: str | None
+
+
 class OrderReportSchema(BaseSchema):
     id: int
     name: str
     price: int
     total_count: int_ge_0
-    # total_sum: int_ge_0
+    total_sum: int_ge_0
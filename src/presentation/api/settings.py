@@ -60,6 +60,9 @@ class RabbitConfig(BaseSettings):
     RABBIT_PORT: int
     RABBIT_USER: str
     RABBIT_PASS: str
+    RABBIT_PUBLISH_CHANNELS: int = 4
+    # без подтверждений релей не отличит доставленное сообщение от потерянного брокером
+    RABBIT_PUBLISHER_CONFIRMS: bool = True
 
 
 class EmailConfig(BaseSettings):
@@ -91,6 +94,25 @@ class OtherServiceConfig(BaseSettings):
     ORDER_SERVICE_PORT: str
 
 
+class OutboxConfig(BaseSettings):
+    model_config = SettingsConfigDict(env_file=env_file, extra="ignore")
+
+    # пачка публикуется целиком с общим ожиданием подтверждений, поэтому ее размер равен числу сообщений в полете
+    OUTBOX_BATCH_SIZE: int = 1000
+    OUTBOX_PUBLISH_TIMEOUT_SECONDS: float = 30
+    OUTBOX_POLL_MIN_SECONDS: float = 0.5
+    OUTBOX_POLL_MAX_SECONDS: float = 30
+    OUTBOX_REBALANCE_SECONDS: float = 5
+    OUTBOX_FAST_PATH_ENABLED: bool = True
+    OUTBOX_FAST_PATH_TIMEOUT_SECONDS: float = 10
+    # релей не трогает свежие сообщения, пока их отправляет быстрый путь
+    OUTBOX_FAST_PATH_GRACE_SECONDS: float = 15
+    OUTBOX_PARTITIONS_AHEAD_WEEKS: int = 4
+    OUTBOX_RETENTION_DAYS: int = 14
+    # без каталога обработанные партиции удаляются без архива
+    OUTBOX_ARCHIVE_DIR: Path | None = None
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=env_file, extra="ignore")
 
@@ -102,6 +124,7 @@ class Settings(BaseSettings):
     email: EmailConfig = EmailConfig()
     auth: AuthConfig = AuthConfig()
     rabbit: RabbitConfig = RabbitConfig()
+    outbox: OutboxConfig = OutboxConfig()
 
     # model_config = SettingsConfigDict(env_file=".env.docker")
     # model_config = SettingsConfigDict()
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+import orjson
+import pytest
+
+from src.domain.base.events import BaseEvent
+from src.domain.base.registry import EventRegistry, decode_datetime, event_registry
+from src.domain.schedules.events import OrderCancelledEvent
+
+
+@dataclass
+class SampleEvent(BaseEvent):
+    sample_id: int
+    day: datetime | None = None
+
+
+def test_decode_datetime_accepts_iso_string():
+    assert decode_datetime("2026-10-17T12:30:00") == datetime(2026, 10, 17, 12, 30)
+
+
+def test_decode_datetime_accepts_legacy_timestamp():
+    moment = datetime(2026, 10, 17, 12, 30)
+
+    assert decode_datetime(moment.timestamp()) == moment
+    assert decode_datetime(int(moment.timestamp())) == moment
+
+
+def test_registered_event_round_trip():
+    event = OrderCancelledEvent(order_id=1, user_id=2)
+
+    type_name = event_registry.get_type_name(event)
+    decoded = event_registry.decode(type_name, event_registry.encode(event))
+
+    assert type_name == "order.cancelled.v1"
+    assert decoded == event
+
+
+def test_decode_legacy_type_name_and_payload():
+    # так сообщения записывал dataclasses_json до реестра: путь к классу и дата в виде timestamp
+    event_id = "1b4e28ba-2fa1-11d2-883f-0016d3cca427"
+    occurred_at = datetime(2026, 10, 17, 12, 30)
+    data = orjson.dumps(
+        {"order_id": 1, "user_id": 2, "event_id": event_id, "occurred_at": occurred_at.timestamp(), "extra": 1}
+    )
+
+    decoded = event_registry.decode("src.domain.schedules.events.OrderCancelledEvent", data)
+
+    assert decoded == OrderCancelledEvent(order_id=1, user_id=2, event_id=UUID(event_id), occurred_at=occurred_at)
+
+
+def test_optional_field_decoder_skips_missing_value():
+    registry = EventRegistry()
+    registry.register("sample.happened", version=2)(SampleEvent)
+    event = SampleEvent(sample_id=1, day=datetime(2026, 10, 17))
+
+    assert registry.get_type_name(event) == "sample.happened.v2"
+    assert registry.decode("sample.happened.v2", registry.encode(event)) == event
+    assert registry.decode("sample.happened.v2", orjson.dumps({"sample_id": 1})).day is None
+
+
+def test_register_same_name_twice_fails():
+    registry = EventRegistry()
+    registry.register("sample.happened")(SampleEvent)
+
+    with pytest.raises(ValueError):
+        registry.register("sample.happened")(SampleEvent)
+
+
+def test_unregistered_event_encodes_under_class_path_only():
+    registry = EventRegistry()
+    event = SampleEvent(sample_id=1)
+
+    assert registry.get_type_name(event) == f"{SampleEvent.__module__}.SampleEvent"
+    with pytest.raises(KeyError):
+        registry.decode(registry.get_type_name(event), registry.encode(event))
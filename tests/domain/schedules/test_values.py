@@ -0,0 +1,81 @@
+from datetime import time
+
+import pytest
+
+from src.domain.schedules.exceptions import SlotInvalidException, SlotOccupancyInvalidException
+from src.domain.schedules.values import DEFAULT_SLOT_GRID, SlotGrid, SlotOccupancy
+
+
+def test_grid_indexes_slots_from_start_hour():
+    grid = SlotGrid(start_hour=9, end_hour=17, slot_delta=2)
+
+    assert grid.slots_count == 5
+    assert grid.index_of("09:00") == 0
+    assert grid.index_of(time(13, 0)) == 2
+    assert grid.time_at(4) == "17:00"
+
+
+@pytest.mark.parametrize("value", ["08:00", "10:00", "19:00", "11:30"])
+def test_grid_rejects_time_outside_of_grid(value):
+    assert SlotGrid(start_hour=9, end_hour=17, slot_delta=2).index_of(value) is None
+
+
+def test_grid_from_times_restores_template_grid():
+    grid = SlotGrid.from_times(["15:00", "09:00", time(12, 0), "18:00"])
+
+    assert grid == SlotGrid(start_hour=9, end_hour=18, slot_delta=3)
+
+
+def test_grid_from_single_time_uses_default_delta():
+    assert SlotGrid.from_times(["14:00"]) == SlotGrid(start_hour=14, end_hour=14)
+
+
+def test_grid_from_no_times_is_default():
+    assert SlotGrid.from_times([]) == DEFAULT_SLOT_GRID
+
+
+def test_occupancy_from_times_ignores_unknown_times():
+    occupancy = SlotOccupancy.from_times(["10:00", "12:00", "21:00", "12:30"])
+
+    assert occupancy.value == 0b101
+    assert occupancy.occupied_count == 2
+
+
+def test_occupancy_checks_slots():
+    occupancy = SlotOccupancy.from_times(["11:00"])
+
+    assert occupancy.is_occupied("11:00")
+    assert not occupancy.is_free("11:00")
+    assert occupancy.is_free(time(12, 0))
+    assert not occupancy.is_free("21:00")
+    assert not occupancy.is_occupied("21:00")
+
+
+def test_occupancy_occupy_and_release_return_new_value():
+    occupancy = SlotOccupancy()
+
+    occupied = occupancy.occupy("10:00").occupy("20:00")
+
+    assert occupancy.value == 0
+    assert list(occupied.free_indexes()) == list(range(1, DEFAULT_SLOT_GRID.slots_count - 1))
+    assert occupied.release("10:00").value == 1 << DEFAULT_SLOT_GRID.slots_count - 1
+
+
+def test_occupancy_free_indexes_follow_grid():
+    grid = SlotGrid(start_hour=9, end_hour=17, slot_delta=2)
+    occupancy = SlotOccupancy.from_times(["09:00", "13:00"], grid)
+
+    assert [grid.time_at(index) for index in occupancy.free_indexes()] == ["11:00", "15:00", "17:00"]
+    assert list(SlotOccupancy(grid.full_mask, grid).free_indexes()) == []
+
+
+@pytest.mark.parametrize("method", ["occupy", "release"])
+def test_occupancy_rejects_time_outside_of_grid(method):
+    with pytest.raises(SlotInvalidException):
+        getattr(SlotOccupancy(), method)("09:00")
+
+
+@pytest.mark.parametrize("value", [-1, 1 << DEFAULT_SLOT_GRID.slots_count])
+def test_occupancy_rejects_mask_outside_of_grid(value):
+    with pytest.raises(SlotOccupancyInvalidException):
+        SlotOccupancy(value)
@@ -0,0 +1,64 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from src.domain.base.events import BaseEvent
+from src.logic.outbox_publisher import publish_in_key_order
+
+
+@dataclass
+class SampleEvent(BaseEvent):
+    name: str
+
+
+class FakeBroker:
+    def __init__(self, failing: set[str] | None = None):
+        self.failing = failing or set()
+        self.batches: list[list[str]] = []
+
+    async def publish_batch(self, events: Sequence[SampleEvent]) -> list[bool]:
+        self.batches.append([event.name for event in events])
+        return [event.name not in self.failing for event in events]
+
+
+def make_events(*names: str) -> list[SampleEvent]:
+    return [SampleEvent(name=name) for name in names]
+
+
+async def test_publishes_next_event_of_key_after_previous_is_confirmed():
+    broker = FakeBroker()
+
+    results = await publish_in_key_order(
+        broker.publish_batch, ["a", "a", "b", None, "a", None], make_events("a1", "a2", "b1", "n1", "a3", "n2")
+    )
+
+    assert results == [True] * 6
+    assert broker.batches == [["a1", "b1", "n1", "n2"], ["a2"], ["a3"]]
+
+
+async def test_stops_key_after_unconfirmed_event():
+    broker = FakeBroker(failing={"a2"})
+
+    results = await publish_in_key_order(
+        broker.publish_batch,
+        ["a", "a", "b", None, "a", "b", None],
+        make_events("a1", "a2", "b1", "n1", "a3", "b2", "n2"),
+    )
+
+    assert results == [True, False, True, True, False, True, True]
+    assert broker.batches == [["a1", "b1", "n1", "n2"], ["a2", "b2"]]
+
+
+async def test_failed_event_without_key_does_not_block_others():
+    broker = FakeBroker(failing={"n1"})
+
+    results = await publish_in_key_order(broker.publish_batch, [None, None], make_events("n1", "n2"))
+
+    assert results == [False, True]
+    assert broker.batches == [["n1", "n2"]]
+
+
+async def test_nothing_to_publish():
+    broker = FakeBroker()
+
+    assert await publish_in_key_order(broker.publish_batch, [], []) == []
+    assert broker.batches == []
@@ -0,0 +1,36 @@
+import base64
+
+from datetime import datetime
+
+import pytest
+
+from src.logic.dto.schedule_dto import OrderCursorDTO
+from src.presentation.api.base.pagination import decode_order_cursor, encode_order_cursor
+from src.presentation.api.exceptions import NotCorrectDataHTTPException
+
+
+def test_order_cursor_round_trip():
+    cursor = OrderCursorDTO(date_add=datetime(2026, 10, 17, 12, 30, 15, 123456), id=42)
+
+    assert decode_order_cursor(encode_order_cursor(cursor)) == cursor
+
+
+def test_empty_order_cursor():
+    assert encode_order_cursor(None) is None
+    assert decode_order_cursor(None) is None
+    assert decode_order_cursor("") is None
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"2026-10-17T12:30:00").decode(),
+        base64.urlsafe_b64encode(b"yesterday|42").decode(),
+        base64.urlsafe_b64encode(b"2026-10-17T12:30:00|42|1").decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    ],
+)
+def test_invalid_order_cursor(value):
+    with pytest.raises(NotCorrectDataHTTPException):
+        decode_order_cursor(value)